@@ -0,0 +1,56 @@
+import sys
+import time
+import numpy as np
+
+from src.model.EnsembleModel import EnsembleForagerModel
+from src.model.Model import ForagerModel
+from src.model.config.ModelConfig import ModelConfig
+from src.model.util.Backend import Backend
+import src.model.util.ModelBuilder as ModelBuilder
+from src.sweep.Sweep import REPORTERS, default_layout
+
+# Number of replicates of the benchmarked cell, the default number of repeats of a sweep
+N_REPLICAS = 32
+
+# Number of steps of each run
+N_STEPS = 500
+
+# Representations of the bees of the single runs the ensemble is compared to
+BACKENDS = [Backend.NUMPY, Backend.AGENTS]
+
+def run_single(backend, seed, layout):
+    """Recorded time series of one run of the default configuration, by ensemble series name."""
+    model = ForagerModel(backend=backend, seed=seed, reporters=[REPORTERS[name] for name in EnsembleForagerModel.SERIES])
+    ModelBuilder.build_layout(model, layout)
+    model.run(N_STEPS)
+    return {name: model.datacollector.get(REPORTERS[name]) for name in EnsembleForagerModel.SERIES}
+
+if __name__ == '__main__':
+    layout = default_layout(ModelConfig())
+
+    start = time.perf_counter()
+    ensemble = EnsembleForagerModel(N_REPLICAS, layout=layout, seed=0)
+    ensemble.run(N_STEPS)
+    ensemble_time = time.perf_counter() - start
+
+    print(f"One cell of {N_REPLICAS} replicas of the default configuration, {N_STEPS} steps")
+    print(f"{'engine':>10} {'seconds':>10} {'s/run':>10} {'speedup':>8}")
+    print(f"{'ensemble':>10} {ensemble_time:>10.2f} {ensemble_time / N_REPLICAS:>10.3f} {1:>8.1f}")
+
+    mismatches = []
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        runs = [run_single(backend, seed, layout) for seed in ensemble.seeds]
+        single_time = time.perf_counter() - start
+        print(f"{backend.value:>10} {single_time:>10.2f} {single_time / N_REPLICAS:>10.3f} {single_time / ensemble_time:>8.1f}")
+
+        # Replicas run the same as single runs of the array-backed colony seeded with their seeds
+        if backend == Backend.NUMPY:
+            mismatches = [(r, name) for r, run in enumerate(runs) for name in EnsembleForagerModel.SERIES
+                          if not np.array_equal(run[name], ensemble.get_series(name)[r])]
+
+    if mismatches:
+        print(f"\nReplicas differ from their single runs for {mismatches}")
+
+    # Non-zero exit status when a replica does not reproduce its single run, for use in scripts
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,82 @@
+import gc
+import sys
+import tracemalloc
+
+from src.model.Model import ForagerModel
+from src.model.agents.Resource import Resource
+from src.model.config.HiveConfig import HiveConfig
+from src.model.util.Backend import Backend
+import src.model.util.ModelBuilder as ModelBuilder
+
+# Number of agents created for each measurement
+N_AGENTS = 20000
+
+# Number of bees of the running colony
+N_COLONY = 2000
+
+# Number of model steps over which live allocations are measured
+N_STEPS = 200
+
+# Layouts of the bees of a running colony: one Mesa agent object per bee, or the struct-of-arrays `BeeColony`
+LAYOUTS = {'agents': Backend.AGENTS, 'arrays': Backend.NUMPY}
+
+def measure(create):
+    """Traced bytes and live memory blocks per agent created by `create`, including the model's indices of the agent."""
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    agents = [create() for _ in range(N_AGENTS)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks
+    return size / len(agents), blocks / len(agents)
+
+def object_size(agent):
+    """Shallow size of the agent object with its attribute dictionary and position, in bytes."""
+    size = sys.getsizeof(agent) + sys.getsizeof(agent.pos) + sum(sys.getsizeof(x) for x in agent.pos)
+    if hasattr(agent, '__dict__') and agent.__dict__:
+        size += sys.getsizeof(agent.__dict__)
+    return size
+
+if __name__ == '__main__':
+    model = ForagerModel(hive_config=HiveConfig(N_BEES=0), seed=0)
+
+    bee_bytes, bee_blocks = measure(lambda: model.create_bee(model.hive))
+    resource_bytes, resource_blocks = measure(lambda: ModelBuilder.add_random_resource(model, quantity=1))
+
+    bee = model.create_bee(model.hive)
+    resource = next(iter(model.get_agents_of_type(Resource)))
+
+    print(f"{'agent':>10} {'object B':>10} {'total B':>10} {'blocks':>8}")
+    print(f"{'bee':>10} {object_size(bee):>10} {bee_bytes:>10.0f} {bee_blocks:>8.1f}")
+    print(f"{'resource':>10} {object_size(resource):>10} {resource_bytes:>10.0f} {resource_blocks:>8.1f}")
+
+    print(f"\n{'layout':>10} {'colony B/bee':>13} {'live blocks/step':>17}")
+    for layout, backend in LAYOUTS.items():
+        # Memory of a whole running colony per bee, with bees spread over the hive and the landscape
+        gc.collect()
+        tracemalloc.start()
+        model = ForagerModel(hive_config=HiveConfig(N_BEES=N_COLONY), backend=backend, seed=0)
+        for _ in range(10):
+            ModelBuilder.add_random_resource(model, quantity=5)
+        for _ in range(5):
+            model.step()
+        gc.collect()
+        colony_bytes = tracemalloc.get_traced_memory()[0] / model.bee_count
+        tracemalloc.stop()
+        del model
+
+        # Live memory blocks allocated per step by a running colony, once it settled
+        model = ForagerModel(backend=backend, seed=0)
+        for _ in range(10):
+            ModelBuilder.add_random_resource(model, quantity=5)
+        for _ in range(N_STEPS):
+            model.step()
+
+        gc.collect()
+        blocks = sys.getallocatedblocks()
+        for _ in range(N_STEPS):
+            model.step()
+        gc.collect()
+        print(f"{layout:>10} {colony_bytes:>13.0f} {(sys.getallocatedblocks() - blocks) / N_STEPS:>17.1f}")
+        del model
@@ -0,0 +1,105 @@
+import sys
+import numpy as np
+import time
+
+from src.model.Model import ForagerModel
+from src.model.agents.Resource import Resource
+from src.model.config.ModelConfig import ModelConfig
+from src.model.config.ResourceConfig import ResourceConfig as RC
+from src.model.util.ScentMode import ScentMode
+
+# Numbers of resources in the benchmarked landscapes
+N_RESOURCES = [10, 100, 1000, 10000]
+
+# Number of positions queried at once, i.e. current and proposed positions of 1000 exploring bees
+N_QUERIES = 2000
+
+# Minimum number of queries a row is evaluated on, below which its timings and errors are not representative
+MIN_QUERIES = 1000
+
+# Number of timed repetitions of each query batch
+N_REPEATS = 5
+
+# Benchmarked approximations of the exact scent
+SCENT_MODES = [ScentMode.RASTER, ScentMode.QUADTREE]
+
+def build_model(scent_mode, res_positions, quantities):
+    model = ForagerModel(model_config=ModelConfig(SCENT_MODE=scent_mode), seed=0)
+    for pos, quantity in zip(res_positions.tolist(), quantities.tolist()):
+        model.create_agent(Resource, tuple(pos), quantity=quantity)
+    return model
+
+def deplete_half(model):
+    """Depletes every other resource, as foraging does over a run."""
+    for resource in list(model.get_agents_of_type(Resource))[::2]:
+        resource.quantity = 0
+
+def outside_resources(positions, res_positions, chunk=256):
+    """Mask of the positions outside all resources, where bees follow the scent."""
+    outside = np.empty(len(positions), dtype=bool)
+    for start in range(0, len(positions), chunk):
+        deltas = positions[start:start + chunk, None, :] - res_positions[None, :, :]
+        outside[start:start + chunk] = (np.einsum('ijk,ijk->ij', deltas, deltas) > RC.RADIUS**2).all(axis=1)
+    return outside
+
+def random_resources(rng, n_resources, queries, batch=8192):
+    """Random resource positions and quantities, keeping resources off the query positions.
+
+    Dense landscapes cover almost all of the space, so queries drawn independently of them would nearly all fall
+    inside resources. Placing resources around a fixed set of query positions keeps every query outside them.
+    """
+    positions = []
+    while sum(map(len, positions)) < n_resources:
+        candidates = rng.uniform(0, ModelConfig.SIZE, size=(batch, 2))
+        positions.append(candidates[outside_resources(candidates, queries)])
+    return np.concatenate(positions)[:n_resources], rng.uniform(1, 10, size=n_resources)
+
+def time_queries(scent, positions):
+    """Best time per query over `N_REPEATS` batches, in microseconds."""
+    scent.at(positions)
+    timings = []
+    for _ in range(N_REPEATS):
+        start = time.perf_counter()
+        scent.at(positions)
+        timings.append(time.perf_counter() - start)
+    return 1e6 * min(timings) / len(positions)
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, ModelConfig.SIZE, size=(N_QUERIES, 2))
+    tolerance = ModelConfig().SCENT_TOLERANCE
+    failures = []
+
+    print(f"{'resources':>10} {'landscape':>10} {'mode':>10} {'queries':>8} {'us/query':>10} {'speedup':>8} {'max rel err':>12} {'mean rel err':>12}")
+    for n_resources in N_RESOURCES:
+        res_positions, quantities = random_resources(rng, n_resources, positions)
+        for landscape in ('full', 'depleted'):
+            exact_model = build_model(ScentMode.EXACT, res_positions, quantities)
+            if landscape == 'depleted':
+                deplete_half(exact_model)
+
+            # Errors are measured outside resources, where the scent guides exploring bees
+            queries = positions[outside_resources(positions, exact_model.scent.positions)]
+            assert len(queries) >= MIN_QUERIES, f"Only {len(queries)} queries outside {n_resources} resources"
+            exact = exact_model.scent.at(queries)
+            exact_time = time_queries(exact_model.scent, queries)
+            print(f"{n_resources:>10} {landscape:>10} {'exact':>10} {len(queries):>8} {exact_time:>10.3f} {1:>8.1f} {0:>12.2e} {0:>12.2e}")
+
+            for scent_mode in SCENT_MODES:
+                model = build_model(scent_mode, res_positions, quantities)
+                if landscape == 'depleted':
+                    deplete_half(model)
+
+                error = np.abs(model.scent.at(queries) - exact) / exact
+                mode_time = time_queries(model.scent, queries)
+                print(f"{n_resources:>10} {landscape:>10} {scent_mode.value:>10} {len(queries):>8} {mode_time:>10.3f} {exact_time / mode_time:>8.1f} {error.max():>12.2e} {error.mean():>12.2e}")
+
+                # The raster promises its tolerance, the quadtree's accuracy is set by its opening angle
+                if scent_mode == ScentMode.RASTER and error.max() > tolerance:
+                    failures.append((n_resources, landscape))
+
+    if failures:
+        print(f"\nRaster error exceeds SCENT_TOLERANCE={tolerance} for {failures}")
+
+    # Non-zero exit status when the raster is less accurate than promised, for use in scripts
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,167 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+from src.model.Model import ForagerModel
+from src.model.config.ModelConfig import ModelConfig
+from src.model.config.HiveConfig import HiveConfig
+from src.model.util.Backend import Backend
+from src.model.util.Collector import Collector
+from src.model.util.RunCache import RunCache
+import src.model.util.ModelBuilder as ModelBuilder
+from src.sweep.Sweep import Sweep
+from src.sweep.SweepRunner import run_sweeps
+
+# Numbers of bees of the colony size grid, with the default resources and weather
+N_BEES = [200, 1000, 10000, 100000]
+
+# Bee representations of the colony size grid
+BACKENDS = [Backend.AGENTS, Backend.NUMPY]
+
+# Numbers of random resources of the landscape grid, with the default colony and weather
+N_RESOURCES = [1, 10, 100, 1000, 10000]
+
+# Weather regimes, with the default colony and resources
+WEATHER = {
+    'calm': {'P_STORM': 0.0},
+    'default': {},
+    'stormy': {'P_STORM': 0.01, 'STORM_DURATION': 35}
+}
+
+# Steps run before timing, so that bees have left the hive, and timed steps
+N_WARMUP_STEPS = 20
+N_TIMED_STEPS = 20
+
+# Number of timed calls of the collector
+N_COLLECTS = 200
+
+# Runs and steps of the end-to-end experiment cell
+N_CELL_REPEATS = 4
+N_CELL_STEPS = 200
+
+# Default paths of the results and of the baseline they are compared to
+RESULTS = os.path.join('data', 'benchmarks', 'step.json')
+BASELINE = os.path.join('data', 'benchmarks', 'step_baseline.json')
+
+def cases():
+    """Benchmarked models by name, as keyword arguments of `build_model`."""
+    cases = {}
+    for backend in BACKENDS:
+        for n_bees in N_BEES:
+            cases[f'bees={n_bees}/{backend.value}'] = dict(n_bees=n_bees, backend=backend)
+    for n_resources in N_RESOURCES:
+        cases[f'resources={n_resources}'] = dict(n_resources=n_resources)
+    for regime, params in WEATHER.items():
+        cases[f'weather={regime}'] = dict(weather=params)
+    return cases
+
+def build_model(n_bees=None, n_resources=None, weather=None, backend=Backend.AGENTS):
+    hive_config = HiveConfig(N_BEES=n_bees) if n_bees is not None else HiveConfig()
+    model = ForagerModel(model_config=ModelConfig(**(weather or {})), hive_config=hive_config, backend=backend, seed=0)
+    if n_resources is None:
+        ModelBuilder.build_layout(model, [('add_resource_in_distance', model.model_config.RESOURCE_DISTANCE_DEFAULT)] * model.model_config.N_RESOURCES_DEFAULT)
+    else:
+        for _ in range(n_resources):
+            ModelBuilder.add_random_resource(model, quantity=model.layout_rng.uniform(1, 10))
+    return model
+
+def time_case(**kwargs):
+    """Construction time, median step time and median collection time of a benchmarked model."""
+    start = time.perf_counter()
+    model = build_model(**kwargs)
+    construction = time.perf_counter() - start
+
+    for _ in range(N_WARMUP_STEPS):
+        model.step()
+
+    steps = []
+    for _ in range(N_TIMED_STEPS):
+        start = time.perf_counter()
+        model.step()
+        steps.append(time.perf_counter() - start)
+
+    # A separate collector records all reporters, so the model's own records are left untouched
+    collector = Collector(model.datacollector.reporters, capacity=N_COLLECTS)
+    collects = []
+    for _ in range(N_COLLECTS):
+        start = time.perf_counter()
+        collector.collect(model)
+        collects.append(time.perf_counter() - start)
+
+    return {'construct_s': construction, 'step_ms': 1e3 * np.median(steps), 'collect_us': 1e6 * np.median(collects)}
+
+def time_cell():
+    """Wall time of one default experiment cell through the sweep runner, on one process and an empty cache."""
+    with tempfile.TemporaryDirectory() as directory:
+        sweep = Sweep('benchmark_cell', n_repeats=N_CELL_REPEATS, n_steps=N_CELL_STEPS, directory=os.path.join(directory, 'cell'))
+        start = time.perf_counter()
+        run_sweeps([sweep], processes=1, cache=RunCache(os.path.join(directory, 'cache')))
+        return {'cell_s': time.perf_counter() - start}
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+
+def compare(results, baseline, threshold):
+    """Ratios of each timing to the baseline, and the timings slower than the baseline by more than the threshold."""
+    ratios, regressions = {}, []
+    for case, timings in results.items():
+        for metric, value in timings.items():
+            reference = baseline.get(case, {}).get(metric)
+            if reference:
+                ratios[case, metric] = value / reference
+                if value / reference > 1 + threshold:
+                    regressions.append((case, metric))
+    return ratios, regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Times construction, steps and data collection of ForagerModel over colony sizes, resource counts and weather regimes, and an experiment cell.')
+    parser.add_argument('--cases', default='.', help='regular expression of the benchmarked cases, all by default')
+    parser.add_argument('--max-bees', type=int, default=None, help='skips colony sizes above this number of bees')
+    parser.add_argument('--output', default=RESULTS, help=f'results file, {RESULTS} by default')
+    parser.add_argument('--baseline', default=BASELINE, help=f'baseline file the results are compared to, {BASELINE} by default')
+    parser.add_argument('--save-baseline', action='store_true', help='saves the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown reported as a regression, 0.1 by default')
+    args = parser.parse_args()
+
+    selected = {name: kwargs for name, kwargs in cases().items()
+                if re.search(args.cases, name) and (args.max_bees is None or kwargs.get('n_bees', 0) <= args.max_bees)}
+
+    results = {}
+    print(f"{'case':>22} {'construct s':>12} {'step ms':>10} {'collect us':>11}")
+    for name, kwargs in selected.items():
+        results[name] = time_case(**kwargs)
+        print(f"{name:>22} {results[name]['construct_s']:>12.3f} {results[name]['step_ms']:>10.3f} {results[name]['collect_us']:>11.1f}")
+    if re.search(args.cases, 'cell'):
+        results['cell'] = time_cell()
+        print(f"{'cell':>22} {N_CELL_REPEATS} runs of {N_CELL_STEPS} steps in {results['cell']['cell_s']:.2f} s")
+
+    report = {'environment': environment(), 'results': results}
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        ratios, regressions = compare(results, baseline, args.threshold)
+
+        print(f"\n{'case':>22} {'metric':>12} {'vs baseline':>12}")
+        for (case, metric), ratio in ratios.items():
+            flag = '  REGRESSION' if (case, metric) in regressions else ''
+            print(f"{case:>22} {metric:>12} {ratio:>11.2f}x{flag}")
+
+        # Non-zero exit status on regressions, for use in scripts
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,255 @@
+import numpy as np
+from mesa.space import ContinuousSpace
+
+from .agents.BeePopulation import BeePopulation, EXPLORING, FOLLOWING
+
+from .config.ModelConfig import ModelConfig
+from .config.BeeSwarmConfig import BeeSwarmConfig
+from .config.HiveConfig import HiveConfig
+from .config.ResourceConfig import ResourceConfig
+from .config.ResourceConfig import ResourceConfig as RC
+
+from .util import ModelBuilder
+from .util.RandomService import RandomService, ReplicaRandomService, replica_seeds
+from .util.Scent import metropolis_moves
+from .util.ScentMode import ScentMode
+from .util.SpatialHash import CellList
+
+class ReplicaLayout:
+    """
+    Stands in for the model of one replica while the `ModelBuilder` functions of a layout place its resources,
+    recording their positions and quantities.
+    """
+
+    class Hive:
+        def __init__(self, pos):
+            self.pos = pos
+
+    def __init__(self, ensemble, layout_rng: RandomService):
+        self.size = ensemble.size
+        self.space = ContinuousSpace(self.size, self.size, False)
+        self.hive = ReplicaLayout.Hive(tuple(ensemble.hive_pos.tolist()))
+        self.resource_config = ensemble.resource_config
+        self.layout_rng = layout_rng
+
+        # Positions and quantities of the placed resources, in order of placement
+        self.positions = []
+        self.quantities = []
+
+    def create_agent(self, agent_type, location, quantity):
+        self.positions.append((float(location[0]), float(location[1])))
+        self.quantities.append(quantity)
+
+class EnsembleForagerModel(BeePopulation):
+    """
+    Independent replicates of the forager model with one configuration, advanced together in one vectorized model.
+
+    The bees of all replicas are kept in one struct-of-arrays population, the replica of each bee acting as a leading
+    replica axis, so every state handler of `BeePopulation` advances the bees of all replicas with one batch of array
+    operations. Hive nectar, resources, weather and statistics are kept per replica, and bees only meet the bees,
+    hive and resources of their own replica.
+
+    Each replica draws from its own agent, layout and weather streams, derived from its seed as in `ForagerModel`, and
+    its seed is drawn from its own child of the ensemble seed (see `replica_seeds`). A replica thus runs the same
+    whatever the number of replicas, and the same as `ForagerModel(backend=Backend.NUMPY, seed=model.seeds[r])`
+    with the same layout.
+    """
+
+    # Per-bee arrays, with the replica of each bee
+    FIELDS = {**BeePopulation.FIELDS, 'replicas': (np.int64, ())}
+
+    # Recorded time series, named as the outputs of a `Sweep`
+    SERIES = ('nectar', 'recruited', 'explorers', 'bee_count')
+
+    def __init__(self, n_replicas: int, model_config=ModelConfig(), bee_config=BeeSwarmConfig(), hive_config=HiveConfig(),
+                 resource_config=ResourceConfig(), layout=(), seed=None):
+        """
+        Args:
+            n_replicas (int): number of replicates advanced together
+            model_config (ModelConfig, optional): global model parameters. Defaults to ModelConfig().
+            bee_config (BeeSwarmConfig, optional): bee parameters. Defaults to BeeSwarmConfig().
+            hive_config (HiveConfig, optional): hive parameters. Defaults to HiveConfig().
+            resource_config (ResourceConfig, optional): resource parameters. Defaults to ResourceConfig().
+            layout (List[Tuple], optional): resource layout of every replica as `ModelBuilder` calls, see
+                `ModelBuilder.build_layout`. Defaults to (), no resources.
+            seed (optional): seed of the ensemble, anything accepted by `np.random.SeedSequence`. Defaults to None.
+        """
+        assert ScentMode(model_config.SCENT_MODE) == ScentMode.EXACT, "Replicas smell the exact scent of their resources."
+        assert not model_config.STOPPING_CRITERIA, "Replicas run all steps, stopping criteria are not supported."
+
+        # Number of replicates advanced together
+        self.n_replicas = n_replicas
+
+        # Configurations shared by all replicates
+        self.model_config = model_config
+        self.bee_config = bee_config
+        self.hive_config = hive_config
+        self.resource_config = resource_config
+
+        # Side length of the square-shaped continuous space of each replica
+        self.size = ModelConfig.SIZE
+
+        # Seed of each replica, and its streams for the agents, the resource layout and the weather as in `ForagerModel`
+        self.seeds = replica_seeds(seed, n_replicas)
+        streams = [np.random.SeedSequence(replica_seed).spawn(3) for replica_seed in self.seeds]
+        self.rng = ReplicaRandomService([RandomService(agent_seed) for agent_seed, _, _ in streams])
+        self.weather_rngs = [RandomService(weather_seed) for _, _, weather_seed in streams]
+
+        # Hive in the center of the space of every replica, with its nectar stock
+        self.hive_pos = np.array((self.size // 2, self.size // 2), dtype=float)
+        self.nectar = np.full(n_replicas, float(hive_config.DEFAULT_INIT_NECTAR))
+
+        # Weather state and time duration of the current storm event of each replica
+        self.raining = np.zeros(n_replicas, dtype=bool)
+        self.storm_time_passed = np.zeros(n_replicas, dtype=np.int64)
+
+        # Positions and quantities of the resources of each replica, the same number of resources in every replica
+        layouts = [ReplicaLayout(self, RandomService(layout_seed)) for _, layout_seed, _ in streams]
+        for replica_layout in layouts:
+            ModelBuilder.build_layout(replica_layout, layout)
+        self.res_positions = np.array([replica_layout.positions for replica_layout in layouts], dtype=float).reshape(n_replicas, -1, 2)
+        self.quantities = np.array([replica_layout.quantities for replica_layout in layouts], dtype=float).reshape(n_replicas, -1)
+
+        # Recorded values of each time series, one array over the replicas per step
+        self._series = {name: [] for name in self.SERIES}
+
+        self._allocate(max(16, n_replicas * hive_config.N_BEES))
+        self._add_bees(n_replicas * hive_config.N_BEES, self.hive_pos, replicas=np.repeat(np.arange(n_replicas), hive_config.N_BEES))
+        self._n_active = self.n
+
+    # ---| Replicas |---
+
+    def rng_for(self, idx):
+        return self.rng.of(self.replicas[idx])
+
+    def raining_over(self, idx):
+        return self.raining[self.replicas[idx]]
+
+    def cell_list(self) -> CellList:
+        return CellList(self.positions[:self.n], self.bee_config.FOV, groups=self.replicas[:self.n])
+
+    def resource_contacts(self, foragers, res_positions):
+        """Contacts of the given foragers with the resources of their replica, as indices into the resources of all
+        replicas, ordered by resource and by forager within a resource."""
+        n_resources = self.res_positions.shape[1]
+        replicas = self.replicas[foragers]
+
+        # Same distance computation as `Contacts.resource_contacts`, over the resources of each forager's replica
+        deltas = self.positions[foragers][:, None, :] - self.res_positions[replicas]
+        dist_squared = deltas[..., 0] ** 2 + deltas[..., 1] ** 2
+        f, r = np.nonzero((dist_squared <= RC.RADIUS**2) & (dist_squared > 0))
+
+        contact_resources = replicas[f] * n_resources + r
+        order = np.lexsort((f, contact_resources))
+        return contact_resources[order], f[order]
+
+    def replica_counts(self, mask=None) -> np.ndarray:
+        """Number of bees of each replica, among those of the given mask over the live bees if any."""
+        replicas = self.replicas[:self.n]
+        return np.bincount(replicas if mask is None else replicas[mask], minlength=self.n_replicas)
+
+    # ---| Hives |---
+
+    def home_positions(self, idx) -> np.ndarray:
+        return self.hive_pos
+
+    def home_nectar(self, idx):
+        return self.nectar[self.replicas[idx]]
+
+    def deposit(self, idx):
+        self.nectar += np.bincount(self.replicas[idx], minlength=self.n_replicas) * self.bee_config.CARRYING_CAPACITY
+
+    # ---| Movement |---
+
+    def scent(self, positions, replicas) -> np.ndarray:
+        """Exact scent of the resources of each position's replica, as `scent_strength` of a single model."""
+        scent = np.empty(len(positions))
+        chunk = max(1, 2**20 // max(1, self.res_positions.shape[1]))
+        for start in range(0, len(positions), chunk):
+            rows = replicas[start:start + chunk]
+            deltas = positions[start:start + chunk, None, :] - self.res_positions[rows]
+            dist_squared = np.einsum('ijk,ijk->ij', deltas, deltas) + 1e-24
+            scent[start:start + chunk] = (self.quantities[rows] / dist_squared).sum(axis=1)
+        return scent
+
+    def move_random_exploration(self, idx):
+        """
+        Moves given bees in a random direction, accepting each move with the Metropolis rule on their replica's scent.
+        """
+        replicas = np.tile(self.replicas[idx], 2)
+        new_positions, accept = metropolis_moves(self.rng_for(idx), self.bee_config.SPEED_FORAGING, self.size,
+                                                 lambda positions: self.scent(positions, replicas), self.positions[idx])
+        self.positions[idx[accept]] = new_positions[accept]
+        self.update_hive_membership(idx[accept])
+
+    # ---| Step |---
+
+    def step(self):
+        """Advances all replicates by one step, in the order of `ForagerModel`: hives, bees and resources, then weather."""
+        self.step_hives()
+
+        self.act(self._n_active, self.res_positions.reshape(-1, 2))
+        self.extract_resources()
+        self._n_active = self.n
+
+        self.manage_weather_events()
+        self.record()
+
+    def run(self, n_steps: int):
+        """Advances all replicates by `n_steps` steps."""
+        for _ in range(n_steps):
+            self.step()
+
+    def step_hives(self):
+        """Hives feed the bees within them and give birth to a new bee with fixed probability."""
+        bees_in_hive = self.replica_counts(self.inside[:self.n])
+        self.nectar = np.maximum(0, self.nectar - bees_in_hive * self.bee_config.FOOD_CONSUMPTION)
+
+        births = np.array([self.rng[r].random() for r in range(self.n_replicas)]) < self.bee_config.P_BIRTH
+        born = np.flatnonzero(births)
+        if len(born):
+            self._add_bees(len(born), self.hive_pos, replicas=born)
+
+    def extract_resources(self):
+        """
+        Foragers within reach of a resource of their replica extract it, each resource serving nearby foragers in order.
+        """
+        quantities = self.quantities.reshape(-1).tolist()
+        self.forage(self.res_positions.reshape(-1, 2), quantities)
+        self.quantities = np.array(quantities, dtype=float).reshape(self.n_replicas, -1)
+
+    def manage_weather_events(self):
+        """
+        Manages the weather of each replica. Turns rain on and off.
+        """
+        # Keep raining until storm duration passed
+        self.storm_time_passed[self.raining] += 1
+        ending = self.raining & (self.storm_time_passed >= self.model_config.STORM_DURATION)
+        self.raining[ending] = False
+        self.storm_time_passed[ending] = 0
+
+        # Start raining
+        self.raining |= np.array([rng.random() for rng in self.weather_rngs]) < self.model_config.P_STORM
+
+    def record(self):
+        """Records the time series of every replica, the same as the reporters of `ForagerModel`."""
+        bee_count = self.replica_counts()
+        states = self.states[:self.n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            recruited = np.where(bee_count > 0, self.replica_counts(states == FOLLOWING) / bee_count, 0)
+            explorers = np.where(bee_count > 0, self.replica_counts(states == EXPLORING) / bee_count, 0)
+
+        self._series['nectar'].append(self.nectar.copy())
+        self._series['recruited'].append(recruited)
+        self._series['explorers'].append(explorers)
+        self._series['bee_count'].append(bee_count)
+
+    def get_series(self, name: str) -> np.ndarray:
+        """Recorded time series of every replica, as a (replicas, steps) array.
+
+        Args:
+            name (str): one of `SERIES`, the hive nectar stock, the proportions of recruited and of exploring bees,
+                or the bee count
+        """
+        assert name in self.SERIES, f"Unknown time series {name}, expected one of {self.SERIES}."
+        return np.array(self._series[name], dtype=float).reshape(-1, self.n_replicas).T
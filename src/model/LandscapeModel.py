@@ -0,0 +1,525 @@
+import os
+import numpy as np
+from multiprocess import Pipe, Process, Queue
+
+from .agents.BeePopulation import BeePopulation, EXPLORING, CARRYING, FOLLOWING
+
+from .config.ModelConfig import ModelConfig
+from .config.BeeSwarmConfig import BeeSwarmConfig
+from .config.HiveConfig import HiveConfig
+from .config.ResourceConfig import ResourceConfig
+from .config.LandscapeConfig import LandscapeConfig
+
+from .util.BeeState import BeeState
+from .util.Collector import Collector
+from .util.RandomService import RandomService
+from .util.Scent import scent_strength
+
+def adjacent_tiles(index: int, n_tiles: int):
+    """Indices of the tiles sharing a side or a corner with the given tile."""
+    i, j = divmod(index, n_tiles)
+    return [a * n_tiles + b for a in range(max(i - 1, 0), min(i + 2, n_tiles)) for b in range(max(j - 1, 0), min(j + 2, n_tiles))
+            if (a, b) != (i, j)]
+
+class Tile(BeePopulation):
+    """
+    Square part of a landscape, advancing the bees within it and owning the hives and resources it contains.
+
+    Bees follow the state machine of `BeePopulation`, each flying back to its own home hive and sharing information
+    only with bees of the same hive. Hives and resources lie entirely within their tile, together with the field of
+    view around the hive area, so that all in-hive interactions, hive feeding and deposits and all resource contacts
+    are resolved by the owning tile alone. Bees that leave the tile are handed over to the tile they moved into at
+    the end of each step. Exploring bees are guided by the exact scent of all resources of the landscape, whose
+    quantities are exchanged every step.
+    """
+
+    # Per-bee arrays, exchanged as rows when bees migrate between tiles
+    FIELDS = {**BeePopulation.FIELDS, 'homes': (np.int64, ())}
+
+    def __init__(self, index: int, bounds, landscape_size: float, hive_positions, res_positions, quantities, n_tiles: int,
+                 bee_config, hive_config, seed):
+        """
+        Args:
+            index (int): index of the tile in the landscape
+            bounds (Tuple[float, float, float, float]): lower x, lower y, upper x and upper y of the tile
+            landscape_size (float): side length of the landscape
+            hive_positions (np.ndarray): (n_hives, 2) positions of all hives of the landscape
+            res_positions (np.ndarray): (n_resources, 2) positions of all resources of the landscape
+            quantities (np.ndarray): initial quantities of all resources
+            n_tiles (int): number of tiles along each side of the landscape
+            bee_config (BeeSwarmConfig): bee parameters
+            hive_config (HiveConfig): hive parameters
+            seed (np.random.SeedSequence): seed of the tile's random stream
+        """
+        self.index = index
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.size = landscape_size
+        self.n_tiles = n_tiles
+        self.bee_config = bee_config
+        self.hive_config = hive_config
+        self.rng = RandomService(seed)
+
+        # Positions of all hives and resources, with the hives and resources owned by this tile
+        self.hive_positions = np.asarray(hive_positions, dtype=float).reshape(-1, 2)
+        self.res_positions = np.asarray(res_positions, dtype=float).reshape(-1, 2)
+        self.hives = np.flatnonzero(self.tile_of(self.hive_positions) == index)
+        self.resources = np.flatnonzero(self.tile_of(self.res_positions) == index)
+
+        # Nectar stock of all hives, only those of owned hives are kept up to date, and last known resource quantities
+        self.nectar = np.full(len(self.hive_positions), float(hive_config.DEFAULT_INIT_NECTAR))
+        self.quantities = np.array(quantities, dtype=float)
+
+        # Whether it is raining over the landscape in the current step
+        self.raining = False
+
+        self._allocate(max(16, len(self.hives) * hive_config.N_BEES))
+        for hive in self.hives.tolist():
+            self.add_bees(hive, hive_config.N_BEES)
+
+    # ---| Geometry |---
+
+    def tile_of(self, positions) -> np.ndarray:
+        """Index of the tile containing each position."""
+        width = self.size / self.n_tiles
+        cells = np.clip(np.floor(np.asarray(positions, dtype=float).reshape(-1, 2) / width).astype(np.int64), 0, self.n_tiles - 1)
+        return cells[:, 0] * self.n_tiles + cells[:, 1]
+
+    # ---| Hives |---
+
+    def home_positions(self, idx) -> np.ndarray:
+        return self.hive_positions[self.homes[idx]]
+
+    def home_nectar(self, idx):
+        return self.nectar[self.homes[idx]]
+
+    def deposit(self, idx):
+        np.add.at(self.nectar, self.homes[idx], self.bee_config.CARRYING_CAPACITY)
+
+    def same_colony(self, senders, receivers):
+        return self.homes[senders] == self.homes[receivers]
+
+    def scent(self, positions) -> np.ndarray:
+        return scent_strength(positions, self.res_positions, self.quantities)
+
+    # ---| Bee arrays |---
+
+    def add_bees(self, hive: int, n_bees: int):
+        """Adds new resting bees at the position of an owned hive, each inspecting the hive on creation."""
+        if n_bees > 0:
+            self._add_bees(n_bees, self.hive_positions[hive], homes=hive)
+
+    def receive(self, batches):
+        """Appends bees handed over by other tiles, as rows of `FIELDS`, in the given order of batches."""
+        n_bees = sum(len(bees['states']) for bees in batches)
+        if n_bees == 0:
+            return
+
+        start, end = self.n, self.n + n_bees
+        if end > len(self.states):
+            self._grow(end)
+        for name in self.FIELDS:
+            getattr(self, name)[start:end] = np.concatenate([bees[name] for bees in batches])
+        self.n = end
+
+    def emigrate(self):
+        """Removes the bees that left the tile, grouped by the tile they moved into.
+
+        Returns:
+            Dict[int, Dict[str, np.ndarray]]: rows of `FIELDS` of the leaving bees, by destination tile
+        """
+        destinations = self.tile_of(self.positions[:self.n])
+        leaving = destinations != self.index
+
+        emigrants = {}
+        for tile in np.unique(destinations[leaving]).tolist():
+            rows = np.flatnonzero(destinations == tile)
+            emigrants[tile] = {name: getattr(self, name)[rows].copy() for name in self.FIELDS}
+        self._compact(~leaving)
+        return emigrants
+
+    # ---| Step |---
+
+    def advance(self, quantities, raining):
+        """Advances the tile by one step: owned hives feed their bees and give birth, then bees present at the start
+        of the step act, die, forage the owned resources and leave the tile.
+
+        Args:
+            quantities (np.ndarray): quantities of all resources at the end of the previous step
+            raining (bool): whether it is raining
+
+        Returns:
+            Dict[int, Dict[str, np.ndarray]]: bees that left the tile by destination tile, see `emigrate`
+        """
+        self.quantities[:] = quantities
+        self.raining = raining
+        self._n_active = self.n
+
+        self.step_hives()
+        self.act(self._n_active, self.res_positions)
+        self.extract_resources()
+
+        return self.emigrate()
+
+    def statistics(self):
+        """Bee count of each hive and whole-tile state counts and perceived nectar sum, over the bees in this tile,
+        and the nectar of owned hives and quantities of owned resources."""
+        return {
+            'bee_count': np.bincount(self.homes[:self.n], minlength=len(self.hive_positions)),
+            'state_counts': np.bincount(self.states[:self.n], minlength=len(BeeState)),
+            'perceived_nectar_sum': float(self.perceived_nectar[:self.n].sum()),
+            'hives': self.hives,
+            'nectar': self.nectar[self.hives],
+            'resources': self.resources,
+            'quantities': self.quantities[self.resources]
+        }
+
+    def step_hives(self):
+        """Owned hives feed the bees within them and give birth to a new bee with fixed probability."""
+        in_hive = np.bincount(self.homes[:self.n][self.inside[:self.n]], minlength=len(self.hive_positions))
+        self.nectar[self.hives] = np.maximum(0, self.nectar[self.hives] - in_hive[self.hives] * self.bee_config.FOOD_CONSUMPTION)
+
+        births = self.rng.random(len(self.hives)) < self.bee_config.P_BIRTH
+        for hive in self.hives[births].tolist():
+            self.add_bees(hive, 1)
+
+    def extract_resources(self):
+        """
+        Foragers within reach of an owned resource extract it, each resource serving nearby foragers in order.
+        """
+        quantities = self.quantities[self.resources].tolist()
+        self.forage(self.res_positions[self.resources], quantities, self.resources)
+        self.quantities[self.resources] = quantities
+
+def step_tiles(tiles, quantities, raining, exchange=None):
+    """Advances a group of tiles by one step and hands the bees that left a tile over to the tile they moved into.
+
+    Args:
+        tiles (List[Tile]): tiles of the group
+        quantities (np.ndarray): quantities of all resources at the end of the previous step
+        raining (bool): whether it is raining
+        exchange (Callable, optional): sends the bees bound for tiles outside the group and returns those bound for
+            the group, both as {destination tile: {source tile: bees}}. Defaults to None, the group is the landscape.
+
+    Returns:
+        List[Dict[str, np.ndarray]]: statistics of each tile once the bees were handed over, see `Tile.statistics`
+    """
+    arriving = {tile.index: {} for tile in tiles}
+    outgoing = {}
+    for tile in tiles:
+        for destination, bees in tile.advance(quantities, raining).items():
+            if destination in arriving:
+                arriving[destination][tile.index] = bees
+            else:
+                outgoing.setdefault(destination, {})[tile.index] = bees
+
+    if exchange is not None:
+        for destination, batches in exchange(outgoing).items():
+            arriving[destination].update(batches)
+
+    # Bees join in order of the tiles they left, however tiles are grouped
+    for tile in tiles:
+        tile.receive([arriving[tile.index][source] for source in sorted(arriving[tile.index])])
+    return [tile.statistics() for tile in tiles]
+
+def tile_worker(connection, tiles, owners, inbox, neighbours):
+    """Steps a group of tiles in its own process, on each message of resource quantities and weather, until None.
+
+    Bees leaving the group are put straight into the inboxes of the workers owning the tiles they moved into, and
+    every step each worker takes one batch, possibly empty, from each neighbouring worker out of its own inbox.
+
+    Args:
+        connection (Connection): pipe to the parent, receiving the messages and sending the statistics of the tiles
+        tiles (List[Tile]): tiles of the group
+        owners (List[int]): index of the worker owning each tile of the landscape
+        inbox (Queue): batches of bees sent to this worker
+        neighbours (Dict[int, Queue]): inboxes of the workers owning tiles adjacent to the group, by worker index
+    """
+    def exchange(outgoing):
+        batches = {worker: {} for worker in neighbours}
+        for destination, bees in outgoing.items():
+            batches[owners[destination]][destination] = bees
+        for worker, batch in batches.items():
+            neighbours[worker].put(batch)
+
+        arriving = {}
+        for _ in neighbours:
+            for destination, bees in inbox.get().items():
+                arriving.setdefault(destination, {}).update(bees)
+        return arriving
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        connection.send(step_tiles(tiles, *message, exchange=exchange))
+    connection.close()
+
+class LandscapeModel:
+    """
+    Forager model of many hives on a large landscape, split into square tiles advanced in parallel processes.
+
+    Each tile is a `Tile` owning the hives and resources within it and the bees currently flying over it. Tiles are
+    split into `processes` contiguous groups, each stepped by its own worker process. Every step the parent sends
+    each worker the quantities of all resources and the weather and receives the statistics of its tiles, while
+    bees that crossed into a tile of another group are sent by the worker directly to the worker owning that tile
+    (the halo exchange). Bees fly less than a tile width per step, so workers only exchange with the workers of
+    adjacent tiles. Tiles draw from independent random streams and take in bees in order of the tiles they left,
+    so results are reproducible for a given seed and tiling, and the same for any number of processes or with all
+    tiles in the parent (`processes=0`). Hives and resources are placed before the first step, away from tile
+    borders and hives away from each other, see `add_hive` and `add_resource`.
+    """
+
+    def __init__(self, landscape_config=LandscapeConfig(), model_config=ModelConfig(), bee_config=BeeSwarmConfig(),
+                 hive_config=HiveConfig(), resource_config=ResourceConfig(), seed=None, processes=None):
+        """
+        Args:
+            landscape_config (LandscapeConfig, optional): size and tiling of the landscape. Defaults to LandscapeConfig().
+            model_config (ModelConfig, optional): weather parameters. Defaults to ModelConfig().
+            bee_config (BeeSwarmConfig, optional): bee parameters. Defaults to BeeSwarmConfig().
+            hive_config (HiveConfig, optional): hive parameters, the same for all hives. Defaults to HiveConfig().
+            resource_config (ResourceConfig, optional): resource parameters. Defaults to ResourceConfig().
+            seed (optional): seed of the layout, weather and tile random streams. Defaults to None.
+            processes (int, optional): number of worker processes, at most one per tile, or 0 to step all tiles in
+                this process. Defaults to None, as many as available cores.
+        """
+        self.landscape_config = landscape_config
+        self.model_config = model_config
+        self.bee_config = bee_config
+        self.hive_config = hive_config
+        self.resource_config = resource_config
+
+        self.size = landscape_config.SIZE
+        self.n_tiles = landscape_config.N_TILES
+        self.tile_width = self.size / self.n_tiles
+        assert self.tile_width > bee_config.SPEED_FORAGING, "Tiles should be wider than bees fly in one step, so that bees only move into adjacent tiles."
+
+        if processes is None:
+            processes = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+        self.processes = min(processes, self.n_tiles ** 2)
+
+        # Independent random streams for the layout, the weather and each tile
+        layout_seed, weather_seed, tiles_seed = np.random.SeedSequence(seed).spawn(3)
+        self.layout_rng = np.random.default_rng(layout_seed)
+        self.weather_rng = np.random.default_rng(weather_seed)
+        self.tile_seeds = tiles_seed.spawn(self.n_tiles ** 2)
+
+        # Hives and resources of the landscape, fixed once the first step is taken
+        self.hive_positions = []
+        self.res_positions = []
+        self.quantities = []
+
+        # Weather state
+        self.raining = False
+        self.storm_time_passed = 0
+
+        # Tiles stepped in this process, or the connections to the worker processes stepping them
+        self.tiles = None
+        self.connections = None
+        self.workers = None
+
+        # Statistics of each tile in the last step and number of steps taken
+        self.statistics = None
+        self.steps = 0
+
+        # Landscape-wide time series and the bee count and nectar stock of each hive over time
+        self.datacollector = Collector({
+            'Bee count 🐝': lambda model: model.bee_count,
+            'Hive stock 🍯': lambda model: model.hive_nectar.mean(),
+            'Foragers': lambda model: model.forager_ratio
+        })
+        self.hive_series = {'bee_count': [], 'nectar': []}
+
+    # ---| Layout |---
+
+    def margin(self, position, radius: float) -> bool:
+        """Whether a circle of the given radius around a position lies within one tile."""
+        x, y = position
+        offsets = np.array([x, y]) - np.floor(np.array([x, y]) / self.tile_width) * self.tile_width
+        return bool(np.all(offsets >= radius) and np.all(self.tile_width - offsets >= radius))
+
+    def clear_of_hives(self, position) -> bool:
+        """Whether no bee within the area of a hive at the given position would see a bee within another hive."""
+        spacing = 2 * HiveConfig.RADIUS + self.bee_config.FOV
+        return all(np.hypot(position[0] - x, position[1] - y) > spacing for x, y in self.hive_positions)
+
+    def add_hive(self, position):
+        """Adds a hive, whose area and the field of view around it should lie within one tile and clear of other hives."""
+        assert self.tiles is None and self.connections is None, "Hives should be added before the first step."
+        assert self.margin(position, HiveConfig.RADIUS + self.bee_config.FOV), "Hives should not be closer to a tile border than their radius and the bees' field of view."
+        assert self.clear_of_hives(position), "Hives should be further apart than their diameter and the bees' field of view."
+        self.hive_positions.append(tuple(float(c) for c in position))
+
+    def add_resource(self, position, quantity=None):
+        """Adds a resource, whose area should lie within one tile."""
+        assert self.tiles is None and self.connections is None, "Resources should be added before the first step."
+        assert self.margin(position, ResourceConfig.RADIUS), "Resources should not be closer to a tile border than their radius."
+        self.res_positions.append(tuple(float(c) for c in position))
+        self.quantities.append(float(self.resource_config.QUANTITY if quantity is None else quantity))
+
+    def add_random_hives(self, n_hives: int, max_attempts=10000):
+        """
+        Adds hives at random positions away from tile borders and from each other, drawing at most `max_attempts` positions.
+        """
+        reach = HiveConfig.RADIUS + self.bee_config.FOV
+        assert self.tile_width > 2 * reach, "Tiles should be wider than a hive area and the field of view on both sides."
+
+        for _ in range(max_attempts):
+            if n_hives == 0:
+                return
+            position = self.layout_rng.uniform(0, self.size, size=2)
+            if self.margin(position, reach) and self.clear_of_hives(position):
+                self.add_hive(position)
+                n_hives -= 1
+        assert n_hives == 0, f"Could not place {n_hives} more hives apart from each other and from tile borders."
+
+    def add_resources_around_hives(self, n_resources: int, distance: float, quantity=None, max_attempts=10000):
+        """
+        Adds `n_resources` resources in random directions at a given distance from each hive, away from tile borders,
+        drawing at most `max_attempts` directions per hive.
+        """
+        assert distance > (HiveConfig.RADIUS + ResourceConfig.RADIUS), "Resources should not overlap with the hive."
+
+        for hive in list(self.hive_positions):
+            added = 0
+            for _ in range(max_attempts):
+                if added == n_resources:
+                    break
+                angle = self.layout_rng.uniform(0, 2 * np.pi)
+                position = np.array(hive) + distance * np.array((np.cos(angle), np.sin(angle)))
+                if np.all((position >= 0) & (position < self.size)) and self.margin(position, ResourceConfig.RADIUS):
+                    self.add_resource(position, quantity)
+                    added += 1
+            assert added == n_resources, f"Could not place {n_resources} resources at distance {distance} of the hive at {hive} away from tile borders."
+
+    def build_default_layout(self):
+        """Random hives of the landscape config, each with its resources around it."""
+        self.add_random_hives(self.landscape_config.N_HIVES)
+        self.add_resources_around_hives(self.landscape_config.N_RESOURCES_PER_HIVE, self.landscape_config.RESOURCE_DISTANCE)
+
+    # ---| Tiles |---
+
+    def start(self):
+        """Creates the tiles, split into contiguous groups stepped by worker processes unless `processes` is 0."""
+        hive_positions = np.array(self.hive_positions, dtype=float).reshape(-1, 2)
+        res_positions = np.array(self.res_positions, dtype=float).reshape(-1, 2)
+        self.quantities = np.array(self.quantities, dtype=float)
+
+        tiles = []
+        for index in range(self.n_tiles ** 2):
+            i, j = divmod(index, self.n_tiles)
+            bounds = (i * self.tile_width, j * self.tile_width, (i + 1) * self.tile_width, (j + 1) * self.tile_width)
+            tiles.append(Tile(index, bounds, self.size, hive_positions, res_positions, self.quantities, self.n_tiles,
+                              self.bee_config, self.hive_config, self.tile_seeds[index]))
+
+        if self.processes == 0:
+            self.tiles = tiles
+            return
+
+        # Worker owning each tile, and the workers owning tiles adjacent to those of each worker
+        owners = [index * self.processes // len(tiles) for index in range(len(tiles))]
+        neighbours = [{owners[adjacent] for tile in range(len(tiles)) if owners[tile] == worker for adjacent in adjacent_tiles(tile, self.n_tiles)} - {worker}
+                      for worker in range(self.processes)]
+
+        inboxes = [Queue() for _ in range(self.processes)]
+        pipes = [Pipe() for _ in range(self.processes)]
+        self.connections = [parent for parent, _ in pipes]
+        self.workers = [Process(target=tile_worker, daemon=True, args=(child, [tile for tile in tiles if owners[tile.index] == worker], owners,
+                                                                      inboxes[worker], {other: inboxes[other] for other in sorted(neighbours[worker])}))
+                        for worker, (_, child) in enumerate(pipes)]
+        for worker in self.workers:
+            worker.start()
+
+    def close(self):
+        """Stops the worker processes."""
+        if self.connections is not None:
+            for connection in self.connections:
+                connection.send(None)
+            for worker in self.workers:
+                worker.join()
+            self.connections = None
+            self.workers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ---| Step |---
+
+    def step(self):
+        """Advances all tiles by one step and hands the bees that left a tile over to the tile they moved into."""
+        if self.tiles is None and self.connections is None:
+            self.start()
+
+        if self.tiles is not None:
+            self.statistics = step_tiles(self.tiles, self.quantities, self.raining)
+        else:
+            for connection in self.connections:
+                connection.send((self.quantities, self.raining))
+            self.statistics = [statistics for connection in self.connections for statistics in connection.recv()]
+
+        for statistics in self.statistics:
+            self.quantities[statistics['resources']] = statistics['quantities']
+
+        self.manage_weather_events()
+        self.steps += 1
+        self.record()
+
+    def run(self, n_steps: int):
+        """Advances the landscape by `n_steps` steps."""
+        self.datacollector.reserve(self.datacollector.records(self.steps + n_steps))
+        for _ in range(n_steps):
+            self.step()
+
+    def manage_weather_events(self):
+        """
+        Manages the weather of the whole landscape. Turns rain on and off.
+        """
+        # Keep raining until storm duration passed
+        if self.raining:
+            self.storm_time_passed += 1
+            if self.storm_time_passed >= self.model_config.STORM_DURATION:
+                self.raining = False
+                self.storm_time_passed = 0
+
+        # Start raining
+        if self.weather_rng.random() < self.model_config.P_STORM:
+            self.raining = True
+
+    # ---| Statistics |---
+
+    @property
+    def hive_bee_counts(self) -> np.ndarray:
+        """Number of bees of each hive, wherever they are."""
+        return sum(statistics['bee_count'] for statistics in self.statistics)
+
+    @property
+    def hive_nectar(self) -> np.ndarray:
+        nectar = np.empty(len(self.hive_positions))
+        for statistics in self.statistics:
+            nectar[statistics['hives']] = statistics['nectar']
+        return nectar
+
+    @property
+    def bee_count(self) -> int:
+        return int(self.hive_bee_counts.sum())
+
+    @property
+    def state_counts(self) -> np.ndarray:
+        return sum(statistics['state_counts'] for statistics in self.statistics)
+
+    @property
+    def forager_ratio(self) -> float:
+        counts = self.state_counts
+        foragers = counts[EXPLORING] + counts[FOLLOWING] + counts[CARRYING]
+        return foragers / max(counts.sum(), 1)
+
+    def record(self):
+        self.datacollector.collect(self)
+        self.hive_series['bee_count'].append(self.hive_bee_counts)
+        self.hive_series['nectar'].append(self.hive_nectar)
+
+    def get_hive_series(self, name: str) -> np.ndarray:
+        """(steps, hives) array of the bee count or the nectar stock of each hive."""
+        return np.array(self.hive_series[name])
@@ -1,13 +1,12 @@
 import numpy as np
-from random import shuffle
 from enum import Enum
 
 from .agents.BeeSwarm import BeeSwarm
 from .agents.Resource import Resource
 from .agents.Hive import Hive
+from .agents.BeeColony import BeeColony, ColonyHive, NumbaBeeColony
 
 from mesa import Model
-from mesa.datacollection import DataCollector
 from mesa.space import ContinuousSpace
 from mesa.time import BaseScheduler
 
@@ -17,7 +16,15 @@ from .config.HiveConfig import HiveConfig
 from .config.ResourceConfig import ResourceConfig
 from .config.VisualConfig import VisualConfig as VC
 
+from .util.Backend import Backend
+from .util.BeeState import BeeState
+from .util.StoppingCriterion import StoppingCriterion
 from .util.Weather import Weather
+from .util.RandomService import RandomService
+from .util.SpatialHash import SpatialHash
+from .util.Scent import create_scent, exploration_moves
+from .util.Contacts import resource_contacts, resolve_contacts
+from .util.Collector import Collector
 from .util.Analytics import *
 from .util.ModelBuilder import *
 
@@ -27,8 +34,13 @@ class RunMode(Enum):
     SENSITIVITY_ANALYSIS = 2
 
 class ForagerModel(Model):
+
+    # Reporters tested for steady state by the `StoppingCriterion.STEADY_STATE` criterion
+    STEADY_STATE_REPORTERS = ['Bee count 🐝', 'Hive stock 🍯', 'Foragers']
+
     def __init__(self, model_config=ModelConfig(), bee_config=BeeSwarmConfig(), hive_config=HiveConfig(), resource_config=ResourceConfig(),
-                 run_mode=RunMode.EXPERIMENTS, p_storm=None, storm_duration=None, n_resources=None, resource_dist=None):
+                 run_mode=RunMode.EXPERIMENTS, p_storm=None, storm_duration=None, n_resources=None, resource_dist=None, backend=Backend.AGENTS,
+                 seed=None, reporters=None, collect_every=1):
         super().__init__()
 
         if run_mode == RunMode.EXPERIMENTS:
@@ -45,6 +57,12 @@ class ForagerModel(Model):
             assert n_resources != None, "You are running the model in sensitivity analysis mode. Provide number of resources as direct parameter."
             assert resource_dist != None, "You are running the model in sensitivity analysis mode. Provide distance to resources as direct parameter."
 
+        # Configuration of global model parameters
+        self.model_config = model_config
+
+        # Representation of the bees: individual agents, or a colony of arrays advanced with NumPy or Numba kernels
+        self.backend = Backend(backend)
+
         # Side length of the square-shaped continuous space
         self.size = ModelConfig.SIZE
 
@@ -63,6 +81,14 @@ class ForagerModel(Model):
         # Configuration of parameters related to resource agents
         self.resource_config = resource_config
 
+        # Independent random streams derived from the seed, for the agents, the resource layout and the weather.
+        # With a common seed, runs of different parameters see the same layouts and storm draws even if their bees
+        # consume different amounts of random numbers, which keeps common random numbers in sync across a sweep.
+        agent_seed, layout_seed, weather_seed = np.random.SeedSequence(seed).spawn(3)
+        self.rng = RandomService(agent_seed)
+        self.layout_rng = RandomService(layout_seed)
+        self.weather_rng = RandomService(weather_seed)
+
         # Weather state
         self.weather = Weather.SUNNY
 
@@ -83,15 +109,42 @@ class ForagerModel(Model):
         # Time duration of storm event thus far
         self.storm_time_passed = 0
 
-        # Set up the data collector
-        self.setup_datacollector()
+        # Moves of exploring bees drawn in batch at the start of each step, see `plan_exploration`
+        self.exploration_moves = {}
+
+        # Scent landscape of all resources guiding exploring bees
+        self.scent = create_scent(model_config)
+
+        # Uniform-grid index of bee agents with cells of the size of a bee's field of view, for in-hive interactions
+        self.bee_index = SpatialHash(bee_config.FOV)
+
+        # Number of bees, per-state counts and sum of perceived nectar, maintained incrementally for the reporters
+        self.bee_count = 0
+        self.state_counts = {state: 0 for state in BeeState}
+        self.perceived_nectar_sum = 0.0
 
-        # One single hive in the center of the space
-        self.hive = self.create_agent(Hive, (self.size // 2, self.size // 2))
+        # Number of bees within the hive area, maintained as bees cross the hive boundary
+        self.bees_in_hive = 0
 
-        # Create bee agents
-        for _ in range(hive_config.N_BEES):
-            self.create_agent(BeeSwarm, self.hive.pos, hive=self.hive)
+        # Exploring and following bees, maintained on state changes, and the last step their resource contacts were resolved
+        self.foragers = {}
+        self.contacts_step = None
+
+        # Bees that died during the current step, removed from the space and the schedule at its end,
+        # and removed bees kept to be recycled for births
+        self.dead_bees = []
+        self.bee_pool = []
+
+        # Number of steps of the current `run`, criterion that stopped it early if any, and the number of steps run until then
+        self.n_steps = None
+        self.stopped_by = None
+        self.stopped_at = None
+
+        # Set up the data collector
+        self.setup_datacollector(reporters, collect_every)
+
+        # One single hive in the center of the space, together with its bees
+        self.setup_colony()
 
         # If running JS server visualization or sensitivity analysis, automatically spawn resources, otherwise use ModelBuilder class.
         if run_mode == RunMode.SERVER or run_mode == RunMode.SENSITIVITY_ANALYSIS:
@@ -106,6 +159,16 @@ class ForagerModel(Model):
     def is_raining(self):
         return self.weather == Weather.RAIN
     
+    @staticmethod
+    def as_position(pos):
+        """
+        Position as a compact pair of plain floats, reusing the given tuple if it already is one.
+        """
+        x, y = pos
+        if type(pos) is tuple and type(x) is float and type(y) is float:
+            return pos
+        return (float(x), float(y))
+
     @staticmethod
     def is_bee(agent):
         return isinstance(agent, BeeSwarm)
@@ -118,7 +181,11 @@ class ForagerModel(Model):
     def is_resource(agent):
         return isinstance(agent, Resource)
 
-    def setup_datacollector(self):
+    def setup_datacollector(self, reporters=None, collect_every=1):
+        """
+        Sets up the collection of the given model reporters every `collect_every` steps, of all of them by default.
+        Reporters tested by the steady-state stopping criterion are always collected.
+        """
 
         def get_weather(model):
             return get_bee_count(model) if model.weather == Weather.RAIN else 0
@@ -126,23 +193,66 @@ class ForagerModel(Model):
         model_reporters = {
             'Bee count 🐝': lambda mod: get_bee_count(mod),
             'Storm ⛈️': get_weather,
-            'resting 💤': lambda mod: bees_proportion(mod)["resting"],
-            'returning 🔙': lambda mod: bees_proportion(mod)["returning"],
-            'exploring 🗺️': lambda mod: bees_proportion(mod)["exploring"],
-            'carrying 🎒': lambda mod: bees_proportion(mod)["carrying"],
-            'dancing 🪩': lambda mod: bees_proportion(mod)["dancing"],
-            'following 🎯': lambda mod: bees_proportion(mod)["following"],
+            'resting 💤': lambda mod: state_proportion(mod, BeeState.RESTING),
+            'returning 🔙': lambda mod: state_proportion(mod, BeeState.RETURNING),
+            'exploring 🗺️': lambda mod: state_proportion(mod, BeeState.EXPLORING),
+            'carrying 🎒': lambda mod: state_proportion(mod, BeeState.CARRYING),
+            'dancing 🪩': lambda mod: state_proportion(mod, BeeState.DANCING),
+            'following 🎯': lambda mod: state_proportion(mod, BeeState.FOLLOWING),
             'Mean perceived nectar level': lambda mod: mean_perceived_nectar(mod),
-            'Hive stock 🍯': lambda mod: self.hive.nectar,
+            'Hive stock 🍯': lambda mod: mod.hive.nectar,
             'Foragers': lambda mod: forager_ratio(mod)
         }
 
-        agent_reporters = {}
+        if reporters is not None:
+            assert set(reporters) <= set(model_reporters), f"Unknown reporters {set(reporters) - set(model_reporters)}."
+            if StoppingCriterion.STEADY_STATE in map(StoppingCriterion, self.model_config.STOPPING_CRITERIA):
+                reporters = list(reporters) + [name for name in self.STEADY_STATE_REPORTERS if name not in reporters]
+            model_reporters = {name: model_reporters[name] for name in reporters}
+
+        self.datacollector = Collector(model_reporters, collect_every)
+
+    def register_bee(self, bee):
+        """
+        Adds a new bee to the incrementally maintained bee count, state counts and perceived nectar sum.
+        """
+        self.bee_count += 1
+        self.state_counts[bee.state] += 1
+        self.perceived_nectar_sum += bee.perceived_nectar
+
+    def unregister_bee(self, bee):
+        """
+        Removes a dead bee from the incrementally maintained bee count, state counts, perceived nectar sum and hive count.
+        """
+        self.bee_count -= 1
+        self.state_counts[bee.state] -= 1
+        self.perceived_nectar_sum -= bee.perceived_nectar
+
+        if bee.is_in_hive:
+            self.bees_in_hive -= 1
+
+        self.foragers.pop(bee, None)
+
+        # Drop the roundoff accumulated in the running sum once the colony is extinct
+        if self.bee_count == 0:
+            self.perceived_nectar_sum = 0.0
+
+    def setup_colony(self):
+        """
+        Creates the hive in the center of the space and its initial bees, as agents or as an array-backed colony.
+        """
+        if self.backend == Backend.AGENTS:
+            self.hive = self.create_agent(Hive, (self.size // 2, self.size // 2))
+
+            for _ in range(self.hive_config.N_BEES):
+                self.create_agent(BeeSwarm, self.hive.pos, hive=self.hive)
+        else:
+            self.hive = self.create_agent(ColonyHive, (self.size // 2, self.size // 2))
 
-        self.datacollector = DataCollector(
-            model_reporters=model_reporters,
-            agent_reporters=agent_reporters
-        )
+            # The colony is scheduled right after the hive and before any resource, as individual bees would be
+            colony_type = NumbaBeeColony if self.backend == Backend.NUMBA else BeeColony
+            self.colony = colony_type(self, self.hive, self.hive_config.N_BEES)
+            self.schedule.add(self.colony)
 
     def plot(self, ax):
         ax.set_xlim(self.space.x_min, self.space.x_max)
@@ -162,22 +272,170 @@ class ForagerModel(Model):
 
     def create_agent(self, agent_type, location, **kwargs):
         agent = agent_type(self, **kwargs)
+        return self.place_agent(agent, location)
 
+    def place_agent(self, agent, location):
         assert agent != None, f"Agent {agent} is None"
         assert agent.pos == None, f"Agent {agent} should have None position"
 
-        self.space.place_agent(agent, location)
+        self.space.place_agent(agent, self.as_position(location))
         self.schedule.add(agent)
 
+        if self.is_bee(agent):
+            self.bee_index.insert(agent)
+            agent.update_hive_membership()
+        elif self.is_resource(agent):
+            self.scent.add_resource(agent)
+
         return agent
 
+    def create_bee(self, hive):
+        """
+        Creates a new bee agent in the given hive, recycling a removed bee agent if there is one.
+        """
+        if not self.bee_pool:
+            return self.create_agent(BeeSwarm, hive.pos, hive=hive)
+
+        bee = self.bee_pool.pop()
+        bee.recycle(hive)
+        return self.place_agent(bee, hive.pos)
+
+    def remove_dead_bees(self):
+        """
+        Removes the bees that died during the step from the space, the schedule and the model once the step is
+        over, keeping them for recycling.
+
+        Each bee is still removed from each registry by its own call, but all of them are O(1) in Mesa 2.3:
+        dictionary deletions, with the space only dropping its cache of agent points, rebuilt once by the next
+        neighbor query rather than once per removed bee.
+        """
+        for bee in self.dead_bees:
+            self.space.remove_agent(bee)
+            self.schedule.remove(bee)
+            bee.remove()
+
+        self.bee_pool.extend(self.dead_bees)
+        self.dead_bees = []
+
+    def plan_exploration(self):
+        """
+        Draws the next move of all exploring bees at once, scoring their current and proposed positions on the
+        scent landscape in one batch. Each bee applies its move when stepped in `BeeSwarm.move_random_exploration`.
+        """
+        self.exploration_moves = {}
+
+        explorers = [bee for bee in self.get_agents_of_type(BeeSwarm) if bee.is_exploring]
+        if not explorers:
+            return
+
+        new_positions, accept = exploration_moves(self, [bee.pos for bee in explorers])
+
+        for bee, newpos, accepted in zip(explorers, new_positions, accept):
+            self.exploration_moves[bee] = tuple(newpos) if accepted else None
+
+    def resolve_resource_contacts(self):
+        """
+        Resolves the contacts of all foraging bees with all resources at once, when the first resource is stepped.
+
+        Resources serve nearby foragers in schedule order, and each resource serves them in order of placement,
+        as one `ContinuousSpace.get_neighbors` scan per resource would. Served foragers carry the nectar back to
+        the hive, the others return with empty hands.
+        """
+        # Contacts of an array-backed colony are resolved by the colony at the end of its step
+        if self.backend != Backend.AGENTS or self.contacts_step == self.schedule.steps:
+            return
+        self.contacts_step = self.schedule.steps
+
+        # Foragers in placement order, which is the order of their creation
+        foragers = sorted(self.foragers, key=lambda bee: bee.unique_id)
+        if not foragers:
+            return
+
+        # Resources in the order they were placed, aligned with the arrays of the scent landscape
+        resources = self.scent.resources
+        contact_resources, contact_foragers = resource_contacts([bee.pos for bee in foragers], self.scent.positions, RC.RADIUS)
+
+        quantities = self.scent.quantities.tolist()
+        carrying, sources, returning = resolve_contacts(contact_resources, contact_foragers, quantities, self.bee_config.CARRYING_CAPACITY)
+
+        for r in np.unique(sources).tolist():
+            resources[r].quantity = quantities[r]
+
+        for f, r in zip(carrying.tolist(), sources.tolist()):
+            foragers[f].state = BeeState.CARRYING
+            foragers[f].resource_destination = resources[r]
+
+        for f in returning.tolist():
+            foragers[f].state = BeeState.RETURNING
+
     def step(self):
+        self.plan_exploration()
         self.schedule.step()
+        self.remove_dead_bees()
         self.manage_weather_events()
 
-        # Record step variables in the DataCollector
+        # Record step variables in the collector
         self.datacollector.collect(self)
 
+        self.check_stopping_criteria()
+
+    def run(self, n_steps: int):
+        """
+        Runs the model for `n_steps` steps, or until one of the stopping criteria of the model config is met. Data of
+        the remaining steps is then padded with the last collected values, so the collected series always have
+        `n_steps` values.
+        """
+        self.n_steps = n_steps
+        self.datacollector.reserve(self.datacollector.records(n_steps))
+        while self.running and self.schedule.steps < n_steps:
+            self.step()
+
+        self.datacollector.pad(self.datacollector.records(n_steps))
+
+    def check_stopping_criteria(self):
+        """
+        Stops the model once any of its stopping criteria is met:
+        - extinction, no bees are left
+        - depletion, all resources are depleted and no bee is outside the hive, so no more nectar can reach the hive
+        - steady state, the linear trend of each of `STEADY_STATE_REPORTERS` over the last `STEADY_STATE_WINDOW` steps,
+          increased by twice its standard error, would change it by at most `STEADY_STATE_TOLERANCE` of its mean
+          until the end of the run
+
+        New bees keep emerging in an extinct colony and the hive stock keeps being consumed after depletion, so all
+        criteria approximate the rest of the run by its last state.
+        """
+        for criterion in self.model_config.STOPPING_CRITERIA:
+            if self.is_met(StoppingCriterion(criterion)):
+                self.running = False
+                self.stopped_by = StoppingCriterion(criterion)
+                self.stopped_at = self.schedule.steps
+                return
+
+    def is_met(self, criterion: StoppingCriterion) -> bool:
+        if criterion == StoppingCriterion.EXTINCTION:
+            return self.bee_count == 0
+
+        if criterion == StoppingCriterion.DEPLETION:
+            return not self.scent.quantities.any() and self.bees_in_hive == self.bee_count
+
+        # Records within the window, tested only when a new record was taken
+        collect_every = self.datacollector.collect_every
+        n_records = self.model_config.STEADY_STATE_WINDOW // collect_every
+        if self.schedule.steps % collect_every or n_records < 3 or self.datacollector.n_records < n_records:
+            return False
+
+        # Linear trend of each reporter over the window, extrapolated to the end of the run with twice its standard error
+        remaining = max(self.n_steps - self.schedule.steps, 0) if self.n_steps is not None else n_records * collect_every
+        time = (np.arange(n_records) - (n_records - 1) / 2) * collect_every
+        for reporter in self.STEADY_STATE_REPORTERS:
+            values = self.datacollector.get(reporter)[-n_records:]
+            slope = time @ values / (time @ time)
+            residuals = values - values.mean() - slope * time
+            standard_error = np.sqrt(residuals @ residuals / (n_records - 2) / (time @ time))
+            if (abs(slope) + 2 * standard_error) * remaining > self.model_config.STEADY_STATE_TOLERANCE * abs(values.mean()):
+                return False
+        return True
+
     def manage_weather_events(self):
         """
         Manages the weather. Turns rain on and off.
@@ -190,5 +448,5 @@ class ForagerModel(Model):
                 self.storm_time_passed = 0
 
         # Start raining
-        if np.random.random() < self.p_storm:
+        if self.weather_rng.random() < self.p_storm:
             self.weather = Weather.RAIN
\ No newline at end of file
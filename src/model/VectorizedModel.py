@@ -0,0 +1,16 @@
+from .Model import ForagerModel
+from .util.Backend import Backend
+
+class VectorizedForagerModel(ForagerModel):
+    """
+    ForagerModel whose bees are kept in a struct-of-arrays `BeeColony` instead of individual `BeeSwarm` agents.
+
+    Takes the same arguments and records the same outputs as `ForagerModel`, while advancing
+    all bees with batched array operations. Intended for large colonies in experiments, the JS server
+    visualization only draws the hive and resources of this model. Same as `ForagerModel(backend=Backend.NUMPY)`,
+    or with compiled per-bee kernels when given `backend=Backend.NUMBA`.
+    """
+
+    def __init__(self, *args, backend=Backend.NUMPY, **kwargs):
+        assert Backend(backend) != Backend.AGENTS, "The vectorized model keeps its bees in an array-backed colony."
+        super().__init__(*args, backend=backend, **kwargs)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from mesa import Agent, Model
+import numpy as np
+import warnings
+
+from .BeePopulation import BeePopulation, RESTING, RETURNING, EXPLORING, CARRYING, DANCING, FOLLOWING, NO_DESTINATION
+from .Hive import Hive
+from .Resource import Resource
+from ..util.BeeState import BeeState
+from ..util import Kernels
+from ..util.Scent import resource_arrays
+
+from ..config.HiveConfig import HiveConfig as HC
+from ..config.ResourceConfig import ResourceConfig as RC
+
+class BeeColony(Agent, BeePopulation):
+    """
+    Struct-of-arrays population of all bees belonging to a hive.
+
+    Instead of one `BeeSwarm` agent per bee, the colony keeps the state of every bee in NumPy arrays and advances
+    each state group with the batched handlers of `BeePopulation`, drawing from the model's random stream and
+    smelling the model's scent landscape.
+    """
+
+    def __init__(
+        self,
+        model: Model,  # model the colony belongs to
+        hive: Hive,  # the Hive the bees belong to
+        n_bees: int,  # initial number of bees
+    ):
+        super().__init__(model.next_id(), model)
+
+        # The hive the bees belong to
+        self.hive = hive
+
+        # The colony itself is not placed in space, bee positions are kept in `positions`
+        self.pos = None
+
+        self._allocate(max(n_bees, 16))
+        self.add_bees(n_bees)
+        self._n_active = self.n
+
+    @property
+    def hive_pos(self) -> np.ndarray:
+        return np.asarray(self.hive.pos, dtype=float)
+
+    @property
+    def rng(self):
+        return self.model.rng
+
+    @property
+    def bee_config(self):
+        return self.model.bee_config
+
+    @property
+    def raining(self) -> bool:
+        return self.model.is_raining
+
+    @property
+    def size(self) -> float:
+        return self.model.size
+
+    def home_positions(self, idx) -> np.ndarray:
+        return self.hive_pos
+
+    def home_nectar(self, idx):
+        return self.hive.nectar
+
+    def deposit(self, idx):
+        self.hive.nectar += len(idx) * self.bee_config.CARRYING_CAPACITY
+
+    def scent(self, positions) -> np.ndarray:
+        return self.model.scent.at(positions)
+
+    def publish_statistics(self):
+        """Updates the model's bee count, state counts, perceived nectar sum and count of bees in the hive, once per
+        step from all bees of the colony."""
+        counts = np.bincount(self.states[:self.n], minlength=len(BeeState))
+
+        self.model.bee_count = self.n
+        self.model.state_counts = {state: int(counts[state.code]) for state in BeeState}
+        self.model.perceived_nectar_sum = float(self.perceived_nectar[:self.n].sum())
+        self.model.bees_in_hive = self.count_in_hive()
+
+    def add_bees(self, n_bees: int):
+        """Adds new resting bees at the hive position, each inspecting the hive on creation.
+
+        Args:
+            n_bees (int): number of bees to add
+        """
+        if n_bees <= 0:
+            return
+
+        start = self.n
+        self._add_bees(n_bees, self.hive_pos)
+        self.count_new_bees(start)
+
+    def count_new_bees(self, start: int):
+        """Adds the resting bees appended from slot `start` on to the model's statistics, in time proportional to
+        their number rather than to the colony size. The full statistics are recomputed once per step."""
+        n_new = self.n - start
+        self.model.bee_count += n_new
+        self.model.state_counts[BeeState.RESTING] += n_new
+        self.model.perceived_nectar_sum += float(self.perceived_nectar[start:self.n].sum())
+        self.model.bees_in_hive += n_new
+
+    def _resources(self):
+        """Returns the resources of the model with an array of their positions."""
+        resources = list(self.model.get_agents_of_type(Resource))
+        return resources, resource_arrays(resources)[0]
+
+    def step(self):
+        """Advances all bees present at the start of the step, then resolves deaths and resource contacts."""
+        resources, res_positions = self._resources()
+
+        self.act(self._n_active, res_positions)
+        self.extract_resources(resources, res_positions)
+
+        self._n_active = self.n
+        self.publish_statistics()
+
+    def extract_resources(self, resources, res_positions):
+        """
+        Foragers within reach of a resource extract it, each resource serving nearby foragers in order.
+        """
+        quantities = [resource.quantity for resource in resources]
+        sources = self.forage(res_positions, quantities)
+
+        for r in np.unique(sources).tolist():
+            resources[r].quantity = quantities[r]
+
+class NumbaBeeColony(BeeColony):
+    """
+    `BeeColony` whose in-hive moves, resting, dancing and resource extraction run as per-bee kernels compiled with Numba.
+
+    Within these phases bees act one after another in colony order, as individual `BeeSwarm` agents would, each
+    seeing the changes made by the bees before it. Kernels draw from the model's own generator, so runs are reproducible
+    for a given seed whatever other models run in the same process.
+    Without Numba installed, the same kernels run as plain Python, which is correct but slow.
+    """
+
+    def __init__(
+        self,
+        model: Model,  # model the colony belongs to
+        hive: Hive,  # the Hive the bees belong to
+        n_bees: int,  # initial number of bees
+    ):
+        if not Kernels.HAS_NUMBA:
+            warnings.warn("Numba is not installed, the kernels of the Numba backend run as plain Python.")
+
+        # Grid of bee positions built by the resting bees and used by the dancers of the same step
+        self._grid = None
+
+        super().__init__(model, hive, n_bees)
+
+    def move_random_in_hive(self, idx):
+        hive_x, hive_y = self.hive_pos
+        return Kernels.move_in_hive(self.model.rng.generator, self.positions, idx, hive_x, hive_y, float(HC.RADIUS), float(self.model.bee_config.SPEED_IN_HIVE))
+
+    def handle_resting(self, idx):
+        bee_config = self.model.bee_config
+
+        self.move_random_in_hive(idx)
+        self._grid = Kernels.rest(self.model.rng.generator, idx, self.positions[:self.n], self.states, self.resting_times, self.perceived_nectar,
+                                  float(self.hive.nectar), float(bee_config.FOV), float(bee_config.FOV),
+                                  float(bee_config.P_NECTAR_INSPECTION), float(bee_config.P_NECTAR_COMMUNICATION),
+                                  float(bee_config.EXPLORING_INCENTIVE), EXPLORING)
+
+    def handle_dancing(self, idx):
+        bee_config = self.model.bee_config
+
+        Kernels.dance(self.model.rng.generator, idx, self.positions[:self.n], self.states, self.resting_times, self.destinations, self._grid,
+                      float(bee_config.FOV), float(bee_config.FOV), float(bee_config.P_FOLLOW_WAGGLE_DANCE),
+                      RESTING, FOLLOWING, bee_config.RESTING_PERIOD, NO_DESTINATION)
+
+    def extract_resources(self, resources, res_positions):
+        quantities = np.array([resource.quantity for resource in resources], dtype=float)
+        Kernels.extract(self.positions[:self.n], self.states[:self.n], self.destinations, res_positions.reshape(-1, 2), quantities,
+                        float(RC.RADIUS), float(self.model.bee_config.CARRYING_CAPACITY), EXPLORING, FOLLOWING, CARRYING, RETURNING)
+
+        for resource, quantity in zip(resources, quantities.tolist()):
+            if quantity != resource.quantity:
+                resource.quantity = quantity
+
+class ColonyHive(Hive):
+    """
+    Hive whose bees are held by a `BeeColony` rather than as individual agents.
+    """
+
+    def create_bee(self):
+        """
+        Adds a new adult bee to the colony.
+        """
+        self.model.colony.add_bees(1)
@@ -0,0 +1,377 @@
+import numpy as np
+
+from ..util.BeeState import BeeState
+from ..util.Contacts import resource_contacts, resolve_contacts
+from ..util.Scent import metropolis_moves
+from ..util.SpatialHash import CellList
+
+from ..config.HiveConfig import HiveConfig as HC
+from ..config.ResourceConfig import ResourceConfig as RC
+
+# Integer codes of the bee states as stored in BeePopulation.states
+RESTING = BeeState.RESTING.code
+RETURNING = BeeState.RETURNING.code
+EXPLORING = BeeState.EXPLORING.code
+CARRYING = BeeState.CARRYING.code
+DANCING = BeeState.DANCING.code
+FOLLOWING = BeeState.FOLLOWING.code
+
+# Destination index of a bee that has no resource communicated to it
+NO_DESTINATION = -1
+
+class BeePopulation:
+    """
+    Struct-of-arrays bees and the state machine advancing them, shared by the `BeeColony` of a hive and the tiles
+    of a `LandscapeModel`.
+
+    The state of every bee is kept in NumPy arrays (position, `BeeState` code, resting time, perceived nectar, index
+    of the destination resource and hive membership) and each state group is advanced with batched array operations.
+    The state machine is the one of `BeeSwarm`, but updates within a step are synchronous: every group is advanced
+    from the states at the start of the step, so a bee transitioned by another bee acts on its new state from the
+    next step.
+
+    Subclasses tell where the bees live: they provide `rng` (a `RandomService`), `bee_config`, `raining` and the
+    `size` of the space, and implement `home_positions`, `home_nectar`, `deposit` and `scent`. Populations whose
+    bees draw from several random streams or live under several skies override `rng_for` and `raining_over`.
+    """
+
+    # Per-bee arrays, with the dtype and the shape of one bee's row
+    FIELDS = {
+        'positions': (np.float64, (2,)),
+        'states': (np.int8, ()),
+        'resting_times': (np.int64, ()),
+        'perceived_nectar': (np.float64, ()),
+        'destinations': (np.int64, ()),
+        'inside': (bool, ())
+    }
+
+    def _allocate(self, capacity: int):
+        """Creates empty per-bee arrays of the given capacity."""
+        # Number of live bees, stored in the first `n` slots of each array
+        self.n = 0
+
+        # Number of bees that are advanced in the current step, bees born during the step are not
+        self._n_active = 0
+
+        # Arrays holding the state of each bee, grown geometrically on births
+        for name, (dtype, shape) in self.FIELDS.items():
+            setattr(self, name, np.empty((capacity,) + shape, dtype=dtype))
+
+    def _add_bees(self, n_bees: int, position, **fields):
+        """Adds new resting bees at a hive position, each inspecting its hive on creation.
+
+        Args:
+            n_bees (int): number of bees to add
+            position (Tuple[float, float]): position of their hive
+            **fields: values of other per-bee arrays for the new bees
+        """
+        start, end = self.n, self.n + n_bees
+        if end > len(self.states):
+            self._grow(end)
+
+        self.positions[start:end] = position
+        self.states[start:end] = RESTING
+        self.resting_times[start:end] = 0
+        self.destinations[start:end] = NO_DESTINATION
+        self.inside[start:end] = True
+        for name, value in fields.items():
+            getattr(self, name)[start:end] = value
+        self.n = end
+        self.inspect_hive(np.arange(start, end))
+
+    def _grow(self, min_capacity: int):
+        """Reallocates all state arrays to hold at least `min_capacity` bees."""
+        capacity = max(min_capacity, 2 * len(self.states))
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def _compact(self, alive: np.ndarray):
+        """Removes dead bees in one pass, keeping the order of the remaining bees.
+
+        Args:
+            alive (np.ndarray): boolean mask over the first `n` slots
+        """
+        n_alive = int(alive.sum())
+        if n_alive == self.n:
+            return
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[:n_alive] = array[:self.n][alive]
+        self.n = n_alive
+
+    # ---| Hives |---
+
+    def home_positions(self, idx) -> np.ndarray:
+        """Positions of the hives of the given bees, broadcastable to their (n, 2) positions."""
+        raise NotImplementedError
+
+    def home_nectar(self, idx):
+        """Nectar stock of the hives of the given bees, broadcastable to their number."""
+        raise NotImplementedError
+
+    def deposit(self, idx):
+        """The given carrying bees unload their nectar into their hives."""
+        raise NotImplementedError
+
+    def same_colony(self, senders, receivers):
+        """Mask of the pairs of bees belonging to the same hive, who share information in the hive."""
+        return True
+
+    def rng_for(self, idx):
+        """Random stream of the draws of the given bees, one value per bee in their order."""
+        return self.rng
+
+    def raining_over(self, idx):
+        """Whether it is raining over the given bees, broadcastable to their number."""
+        return self.raining
+
+    def cell_list(self) -> CellList:
+        """Cell list of all bees for the in-hive interactions of a step."""
+        return CellList(self.positions[:self.n], self.bee_config.FOV)
+
+    def resource_contacts(self, foragers, res_positions):
+        """Contacts of the given foragers with the resources, see `Contacts.resource_contacts`."""
+        return resource_contacts(self.positions[foragers], res_positions, RC.RADIUS)
+
+    def distance_to_hive(self, idx) -> np.ndarray:
+        deltas = self.positions[idx] - self.home_positions(idx)
+        return np.hypot(deltas[..., 0], deltas[..., 1])
+
+    def in_hive(self, idx) -> np.ndarray:
+        """Boolean mask of the given bees being within the hive area."""
+        return self.inside[idx]
+
+    def count_in_hive(self) -> int:
+        return int(np.count_nonzero(self.inside[:self.n]))
+
+    def update_hive_membership(self, idx):
+        """Recomputes whether the given bees are within the hive area after they moved out of it or towards it."""
+        self.inside[idx] = self.distance_to_hive(idx) <= HC.RADIUS
+
+    def inspect_hive(self, idx):
+        """
+        Given bees inspect the hive and sample their perceived nectar level.
+        """
+        # Same distribution as `BeeSwarm.inspect_hive`, i.e. scipy's uniform.rvs(-1, 1) on [-1, 0)
+        noise = self.rng_for(idx).uniform(-1, 0, size=len(idx))
+        self.perceived_nectar[idx] = np.maximum(self.home_nectar(idx) + noise, 0)
+
+    # ---| Movement |---
+
+    def scent(self, positions) -> np.ndarray:
+        """Scent strength of the resources at the given (n, 2) positions."""
+        raise NotImplementedError
+
+    def move_random_in_hive(self, idx):
+        """
+        Moves given bees in a random direction, redrawing the direction of those that would leave the hive.
+        Bees stay within the hive area, so their hive membership is left untouched.
+
+        Returns:
+            int: number of drawn positions, including those rejected for leaving the hive
+        """
+        speed = self.bee_config.SPEED_IN_HIVE
+        centers = np.broadcast_to(self.home_positions(idx), (len(idx), 2))
+
+        origin = self.positions[idx]
+        pending = np.arange(len(idx))
+        draws = 0
+
+        # Repeat until all new positions are within the hive
+        while len(pending):
+            draws += len(pending)
+            angle = self.rng_for(idx[pending]).uniform(0, 2 * np.pi, size=len(pending))
+            newx = origin[pending, 0] + speed * np.cos(angle)
+            newy = origin[pending, 1] + speed * np.sin(angle)
+
+            inside = np.hypot(newx - centers[pending, 0], newy - centers[pending, 1]) <= HC.RADIUS
+            moved = pending[inside]
+            self.positions[idx[moved], 0] = newx[inside]
+            self.positions[idx[moved], 1] = newy[inside]
+            pending = pending[~inside]
+
+        return draws
+
+    def move_random_exploration(self, idx):
+        """
+        Moves given bees in a random direction, accepting each move with the Metropolis rule on the scent landscape.
+        """
+        new_positions, accept = metropolis_moves(self.rng_for(idx), self.bee_config.SPEED_FORAGING, self.size, self.scent, self.positions[idx])
+        self.positions[idx[accept]] = new_positions[accept]
+        self.update_hive_membership(idx[accept])
+
+    def move_towards(self, idx, targets):
+        """
+        Moves given bees deterministically in straight lines towards their target locations.
+        """
+        speed = self.bee_config.SPEED_FORAGING
+
+        current = self.positions[idx]
+        targets = np.broadcast_to(targets, current.shape)
+        deltas = targets - current
+        distance = np.hypot(deltas[:, 0], deltas[:, 1])
+
+        # Bees further than one step away move by speed towards the target, others land on it
+        far = distance > speed
+        new = targets.copy()
+        new[far] = current[far] + speed * deltas[far] / distance[far, None]
+        self.positions[idx] = new
+        self.update_hive_membership(idx)
+
+    # ---| State handlers |---
+
+    def act(self, n: int, res_positions):
+        """Advances the first `n` bees from their states at the start of the step, then resolves their deaths.
+
+        Args:
+            n (int): number of bees present at the start of the step
+            res_positions (np.ndarray): (n_resources, 2) positions of the resources bees are recruited to
+        """
+        states = self.states[:n].copy()
+
+        self.handle_resting(np.flatnonzero(states == RESTING))
+        self.handle_returning(np.flatnonzero(states == RETURNING))
+        self.handle_exploring(np.flatnonzero(states == EXPLORING))
+        self.handle_carrying(np.flatnonzero(states == CARRYING))
+        self.handle_dancing(np.flatnonzero(states == DANCING))
+        self.handle_following(np.flatnonzero(states == FOLLOWING), res_positions)
+
+        self.manage_death(n)
+
+    def handle_resting(self, idx):
+        """
+        Handles the behaviour of bees resting in the hive.
+        """
+        bee_config = self.bee_config
+
+        self.move_random_in_hive(idx)
+
+        # Cell list of all bees for this step's in-hive interactions, built once resting bees moved.
+        # Dancers and the resting bees they recruit do not move again within the step.
+        self._cells = self.cell_list()
+
+        # Inspect hive resources with fixed probability, otherwise communicate with fixed probability
+        inspecting = self.rng_for(idx).random(len(idx)) < bee_config.P_NECTAR_INSPECTION
+        communicating = ~inspecting & (self.rng_for(idx).random(len(idx)) < bee_config.P_NECTAR_COMMUNICATION)
+        self.inspect_hive(idx[inspecting])
+
+        # Communicating bees share their perceived nectar with each nearby bee of their colony with fixed probability
+        senders, receivers = self._cells.pairs_within(idx[communicating], bee_config.FOV)
+        shared = (self.rng_for(senders).random(len(senders)) < bee_config.P_NECTAR_COMMUNICATION) & self.same_colony(senders, receivers)
+        self.perceived_nectar[receivers[shared]] = self.perceived_nectar[senders[shared]]
+
+        # Start exploring based on exponential distribution and self-perceived nectar
+        p_explore = self.rng.expon_pdf(self.perceived_nectar[idx], scale=bee_config.EXPLORING_INCENTIVE)
+        exploring = (self.resting_times[idx] == 0) & (self.rng_for(idx).random(len(idx)) < p_explore)
+
+        self.states[idx[exploring]] = EXPLORING
+        staying = idx[~exploring]
+        self.resting_times[staying] = np.maximum(self.resting_times[staying] - 1, 0)
+
+    def handle_returning(self, idx):
+        """
+        Handles the behaviour of bees returning to the hive without carrying resources.
+        """
+        arrived = self.in_hive(idx)
+        self.states[idx[arrived]] = RESTING
+        self.resting_times[idx[arrived]] = self.bee_config.RESTING_PERIOD
+
+        flying = idx[~arrived]
+        self.move_towards(flying, self.home_positions(flying))
+
+    def handle_exploring(self, idx):
+        """
+        Handles the behaviour of bees exploring the space for resources.
+        """
+        # Abort exploration with certain probability or when raining, otherwise continue exploring
+        aborting = self.rng_for(idx).random(len(idx)) < self.bee_config.P_ABORT
+        aborting |= self.raining_over(idx)
+
+        self.states[idx[aborting]] = RETURNING
+        self.move_random_exploration(idx[~aborting])
+
+    def handle_carrying(self, idx):
+        """
+        Handles the behaviour of bees carrying the resource back to the hive.
+        """
+        arrived = self.in_hive(idx)
+        self.deposit(idx[arrived])
+        self.states[idx[arrived]] = DANCING
+
+        flying = idx[~arrived]
+        self.move_towards(flying, self.home_positions(flying))
+
+    def handle_dancing(self, idx):
+        """
+        Handles the behaviour of waggle dancing bees.
+        """
+        bee_config = self.bee_config
+
+        # Find nearby resting bees and try to employ them with certain probability
+        dancers, candidates = self._cells.pairs_within(idx, bee_config.FOV)
+        eligible = (self.states[candidates] == RESTING) & (self.resting_times[candidates] == 0)
+        dancers, candidates = dancers[eligible], candidates[eligible]
+
+        follows = self.rng_for(candidates).random(len(candidates)) < bee_config.P_FOLLOW_WAGGLE_DANCE
+        dancers, candidates = dancers[follows], candidates[follows]
+
+        # A bee close to several dancers follows the first one it accepts
+        candidates, first = np.unique(candidates, return_index=True)
+        self.states[candidates] = FOLLOWING
+        self.destinations[candidates] = self.destinations[dancers[first]]
+
+        self.states[idx] = RESTING
+        self.resting_times[idx] = bee_config.RESTING_PERIOD
+        self.destinations[idx] = NO_DESTINATION
+
+    def handle_following(self, idx, res_positions):
+        """
+        Handles the behaviour of bees recruited through waggle dance.
+        """
+        # Abort recruitment with certain probability or when raining, otherwise continue moving towards the resource
+        aborting = self.rng_for(idx).random(len(idx)) < self.bee_config.P_ABORT
+        aborting |= self.raining_over(idx)
+
+        self.states[idx[aborting]] = RETURNING
+
+        flying = idx[~aborting]
+        self.move_towards(flying, res_positions[self.destinations[flying]])
+
+    def manage_death(self, n):
+        """Handles death of the first `n` bees, removing dead bees."""
+        in_hive = self.in_hive(slice(0, n))
+        draws = self.rng_for(slice(0, n)).random(n)
+
+        # Death by random outside risk or by hunger within the hive
+        p_hunger = 0.1 * self.rng.expon_pdf(self.home_nectar(slice(0, n)), scale=1)
+        dies = np.where(in_hive, draws < p_hunger, draws < self.bee_config.P_DEATH)
+
+        alive = np.ones(self.n, dtype=bool)
+        alive[:n] = ~dies
+        self._compact(alive)
+
+    def forage(self, res_positions, quantities, resource_ids=None):
+        """
+        Foragers within reach of a resource extract it, each resource serving nearby foragers in order.
+
+        Args:
+            res_positions (np.ndarray): (n_resources, 2) positions of the resources that can be extracted
+            quantities (List[float]): their quantities, reduced in place by the extracted nectar
+            resource_ids (np.ndarray, optional): destination index of each resource. Defaults to None, its position.
+
+        Returns:
+            np.ndarray: index into `quantities` of the resource each new carrying bee extracted
+        """
+        states = self.states[:self.n]
+        foragers = np.flatnonzero((states == EXPLORING) | (states == FOLLOWING))
+        contact_resources, contact_foragers = self.resource_contacts(foragers, res_positions)
+
+        carrying, sources, returning = resolve_contacts(contact_resources, contact_foragers, quantities, self.bee_config.CARRYING_CAPACITY)
+
+        self.states[foragers[carrying]] = CARRYING
+        self.destinations[foragers[carrying]] = sources if resource_ids is None else resource_ids[sources]
+        self.states[foragers[returning]] = RETURNING
+        return sources
@@ -5,14 +5,21 @@ from typing import Optional, Tuple
 from mesa import Agent, Model
 from math import atan2, cos, sin
 import numpy as np
-from numpy.random import random
-from scipy.stats import expon, uniform
 
 from .Resource import Resource
 from ..util.BeeState import BeeState
+from ..util.Scent import exploration_moves, resource_arrays, scent_strength
 
 from ..config.HiveConfig import HiveConfig as HC
 
+# Integer codes of the bee states as stored in BeeSwarm._state
+RESTING = BeeState.RESTING.code
+RETURNING = BeeState.RETURNING.code
+EXPLORING = BeeState.EXPLORING.code
+CARRYING = BeeState.CARRYING.code
+DANCING = BeeState.DANCING.code
+FOLLOWING = BeeState.FOLLOWING.code
+
 class BeeSwarm(Agent):
 
     def __init__(
@@ -28,8 +35,8 @@ class BeeSwarm(Agent):
         # Agent's position in space
         self.pos = None
 
-        # Agent's current activity
-        self.state: BeeState = BeeState.RESTING
+        # Agent's current activity, stored as the integer code of its BeeState
+        self._state = RESTING
 
         # Destination of resource communicated through waggle dance recruitment
         self.resource_destination: Optional[Tuple[float, float]] = None
@@ -38,34 +45,84 @@ class BeeSwarm(Agent):
         self.resting_time = 0
 
         # Agent's perceived amount of resources available in the hive
-        self.perceived_nectar = 0.0
+        self._perceived_nectar = 0.0
+
+        # Whether the agent is within the hive area, updated on moves that cross the hive boundary
+        self._in_hive = False
+
+        # Count the bee in the model's reporter statistics, kept in sync by the setters below
+        self.model.register_bee(self)
 
         # Inspect hive and change perceived nectar value
         self.inspect_hive()
 
+    def recycle(self, hive):
+        """
+        Brings a dead bee agent back as a newborn bee of the given hive, reusing the agent instead of allocating a new one.
+        The bee gets a fresh id and is registered with the model again, but still has to be placed in space.
+        """
+        self.unique_id = self.model.next_id()
+        self.model.agents_[type(self)][self] = None
+
+        self.hive = hive
+        self._state = RESTING
+        self.resource_destination = None
+        self.resting_time = 0
+        self._perceived_nectar = 0.0
+        self._in_hive = False
+
+        self.model.register_bee(self)
+        self.inspect_hive()
+
+    @property
+    def state(self) -> BeeState:
+        return BeeState.from_code(self._state)
+
+    @state.setter
+    def state(self, state: BeeState):
+        counts = self.model.state_counts
+        counts[BeeState.from_code(self._state)] -= 1
+        counts[state] += 1
+        self._state = state.code
+
+        # Keep the model's registry of foraging bees in sync for the resource contact phase
+        if state == BeeState.EXPLORING or state == BeeState.FOLLOWING:
+            self.model.foragers[self] = None
+        else:
+            self.model.foragers.pop(self, None)
+
+    @property
+    def perceived_nectar(self) -> float:
+        return self._perceived_nectar
+
+    @perceived_nectar.setter
+    def perceived_nectar(self, perceived_nectar: float):
+        self.model.perceived_nectar_sum += perceived_nectar - self._perceived_nectar
+        self._perceived_nectar = perceived_nectar
+
     @property
     def is_resting(self):
-        return self.state == BeeState.RESTING
+        return self._state == RESTING
 
     @property
     def is_returning(self):
-        return self.state == BeeState.RETURNING
+        return self._state == RETURNING
 
     @property
     def is_exploring(self):
-        return self.state == BeeState.EXPLORING
+        return self._state == EXPLORING
 
     @property
     def is_carrying(self):
-        return self.state == BeeState.CARRYING
+        return self._state == CARRYING
 
     @property
     def is_dancing(self):
-        return self.state == BeeState.DANCING
+        return self._state == DANCING
 
     @property
     def is_following(self):
-        return self.state == BeeState.FOLLOWING
+        return self._state == FOLLOWING
 
     def step(self):
         """Agent's step function required by Mesa package."""
@@ -83,39 +140,27 @@ class BeeSwarm(Agent):
         Returns:
             float: scent strength at the given position
         """
+        res_positions, res_quantities = resource_arrays(resources)
 
-        # Obtain positions and quantities of Resource agents
-        res_positions = [res.pos for res in resources]
-        res_quantities = [res.quantity for res in resources]
-
-        scent_intrigue = 0
-
-        # Iterate over all resources
-        for res_pos, res_quant in zip(res_positions, res_quantities):
-            
-            # Squared distance to the resource
-            res_distance = self.model.space.get_distance(pos, res_pos)
-            dist_squared = res_distance**2 + epsilon
-
-            # Scent is dependent on resource quantity and squared distance to that resource
-            scent = res_quant / dist_squared
-            scent_intrigue += scent
-
-        return scent_intrigue
+        return float(scent_strength([pos], res_positions, res_quantities, epsilon)[0])
     
     def inspect_hive(self):
         """
         Bee agent inspects the hive and samples perceived nectar level from Beta distribution.
         """
         # Mean of the Beta distribution, equal to normalized nectar level within hive
-        self.perceived_nectar = max(self.hive.nectar + uniform.rvs(-1, 1), 0)
+        # Noise is uniform on [-1, 0), as previously drawn by scipy's uniform.rvs(-1, 1) with loc=-1 and scale=1
+        self.perceived_nectar = max(self.hive.nectar + self.model.rng.uniform(-1, 0), 0)
 
     def move_random_in_hive(self):
         """
         Moves randomly in x and y in the interval [-distance, distance]
+
+        Returns:
+            int: number of drawn positions, including those rejected for leaving the hive
         """
         # Choose a random point with radius equivalent to speed times time step
-        angle = np.random.uniform(0, 2 * np.pi)
+        angle = self.model.rng.uniform(0, 2 * np.pi)
         dx = self.model.bee_config.SPEED_IN_HIVE * np.cos(angle)
         dy = self.model.bee_config.SPEED_IN_HIVE * np.sin(angle)
 
@@ -123,10 +168,12 @@ class BeeSwarm(Agent):
         newx = self.pos[0] + dx
         newy = self.pos[1] + dy
         newpos = (newx, newy)
+        draws = 1
         
         # Repeat untill the new position is within the hive
         while self.model.space.get_distance(self.hive.pos, newpos) > HC.RADIUS:
-            angle = np.random.uniform(0, 2 * np.pi)
+            draws += 1
+            angle = self.model.rng.uniform(0, 2 * np.pi)
             dx = self.model.bee_config.SPEED_IN_HIVE * np.cos(angle)
             dy = self.model.bee_config.SPEED_IN_HIVE * np.sin(angle)
 
@@ -135,50 +182,53 @@ class BeeSwarm(Agent):
             newy = self.pos[1] + dy
             newpos = (newx, newy)
 
-        self.model.space.move_agent(self, newpos)
+        self.move_to(newpos, in_hive=True)
+        return draws
 
-    def move_random_exploration(self, epsilon=1e-12):
+    def move_random_exploration(self):
         """
         Moves randomly in x and y in the interval [-max_movement,max_movement]
         """
-        # Distance the bee agent will cover in the simulation step
         # TODO: Add stochasticity to the distance covered.
 
-        # Choose a random point with radius equivalent to speed times time step
-        angle = np.random.uniform(0, 2 * np.pi)
-        dx = self.model.bee_config.SPEED_FORAGING * np.cos(angle)
-        dy = self.model.bee_config.SPEED_FORAGING * np.sin(angle)
+        # Moves of all exploring bees are drawn at once at the start of the model step, draw one if missing
+        if self not in self.model.exploration_moves:
+            new_positions, accept = exploration_moves(self.model, [self.pos])
+            self.model.exploration_moves[self] = tuple(new_positions[0]) if accept[0] else None
 
-        # Calculate the new position, taking the boundaries into account
-        newx = self.pos[0] + dx
-        newx = max(0, min(newx, self.model.size-epsilon))
-        newy = self.pos[1] + dy
-        newy = max(0, min(newy, self.model.size-epsilon))
-        newpos = (newx, newy)
+        newpos = self.model.exploration_moves.pop(self)
+        if newpos is not None:
+            self.move_to(newpos)
 
-        # Calculate resource attraction bias
-        resources = self.model.get_agents_of_type(Resource)
+    def move_to(self, newpos, in_hive=None):
+        """Moves the bee agent to a new position, keeping the model's bee index and hive membership up to date.
 
-        # Attraction level at current and new position
-        attraction_current = self.scent_strength_at_pos(self.pos, resources)
-        attraction_new = self.scent_strength_at_pos(newpos, resources)
+        Args:
+            newpos (Tuple[float, float]): new position of the agent
+            in_hive (bool, optional): whether the new position is known to be within the hive area. Defaults to None,
+                in which case it is determined from the distance to the hive.
+        """
+        self.model.space.move_agent(self, self.model.as_position(newpos))
+        self.model.bee_index.move(self)
+        self.update_hive_membership(in_hive)
 
-        # If all resources depleted, just move
-        if attraction_current == 0:
-            self.model.space.move_agent(self, newpos)
-        else:
-            ratio = attraction_new / (attraction_current * 10)
+    def update_hive_membership(self, in_hive=None):
+        """
+        Updates whether the bee agent is within the hive area, together with the model's count of bees in the hive.
+        """
+        if in_hive is None:
+            in_hive = self.is_close_to(self.hive, HC.RADIUS)
 
-            # Metropolis algorithm
-            if attraction_new > attraction_current or random() < ratio:
-                self.model.space.move_agent(self, newpos)
+        if in_hive != self._in_hive:
+            self._in_hive = in_hive
+            self.model.bees_in_hive += 1 if in_hive else -1
 
     @property
     def is_in_hive(self):
         """
-        Check if the bee agent is within hive area. Syntactic sugar.
+        Check if the bee agent is within hive area, as tracked on its moves. Syntactic sugar.
         """
-        return self.is_close_to(self.hive, HC.RADIUS)
+        return self._in_hive
     
     def is_close_to(self, agent, threshold):
         """Determines if bee agent is in close proximity to another agent.
@@ -225,26 +275,27 @@ class BeeSwarm(Agent):
             newpos = (new_x, new_y)
             assert newpos != None, f"New position for Bee agent {self} is equal to None"
 
-            self.model.space.move_agent(self, newpos)
+            self.move_to(newpos)
         else:
             newpos = (destination.pos[0], destination.pos[1])
             assert newpos != None, f"New position for Bee agent {self} is equal to None"
 
-            self.model.space.move_agent(self, newpos)
+            self.move_to(newpos)
 
     def step_by_activity(self):
         """Handles the bee's actions based on their current activity."""
-        if self.state == BeeState.RESTING:
+        state = self._state
+        if state == RESTING:
             return self.handle_resting()
-        elif self.state == BeeState.RETURNING:
+        elif state == RETURNING:
             return self.handle_returning()
-        elif self.state == BeeState.EXPLORING:
+        elif state == EXPLORING:
             return self.handle_exploring()
-        elif self.state == BeeState.CARRYING:
+        elif state == CARRYING:
             return self.handle_carrying()
-        elif self.state == BeeState.DANCING:
+        elif state == DANCING:
             return self.handle_dancing()
-        elif self.state == BeeState.FOLLOWING:
+        elif state == FOLLOWING:
             return self.handle_following()
 
     def handle_resting(self):
@@ -253,19 +304,19 @@ class BeeSwarm(Agent):
         """
         self.move_random_in_hive()
 
-        if random() < self.model.bee_config.P_NECTAR_INSPECTION:
+        if self.model.rng.random() < self.model.bee_config.P_NECTAR_INSPECTION:
             # Inspect hive resources with fixed probability
             self.inspect_hive()
-        elif random() < self.model.bee_config.P_NECTAR_COMMUNICATION:
+        elif self.model.rng.random() < self.model.bee_config.P_NECTAR_COMMUNICATION:
             # If not inspecting, communicate the information with all nearby bees
-            nearby_bees = self.model.space.get_neighbors(self.pos, self.model.bee_config.FOV, include_center=False)
+            nearby_bees = self.model.bee_index.neighbors(self.pos, self.model.bee_config.FOV)
 
             for bee in nearby_bees:
-                if isinstance(bee, BeeSwarm) and random() < self.model.bee_config.P_NECTAR_COMMUNICATION:
+                if self.model.rng.random() < self.model.bee_config.P_NECTAR_COMMUNICATION:
                     bee.perceived_nectar = self.perceived_nectar
 
         # Start exploring based on exponential distribution and self-perceived nectar
-        if self.resting_time == 0 and random() < expon.pdf(self.perceived_nectar, scale=self.model.bee_config.EXPLORING_INCENTIVE):
+        if self.resting_time == 0 and self.model.rng.random() < self.model.rng.expon_pdf(self.perceived_nectar, scale=self.model.bee_config.EXPLORING_INCENTIVE):
             self.state = BeeState.EXPLORING
         else:
             self.resting_time = max(self.resting_time - 1, 0)
@@ -285,7 +336,7 @@ class BeeSwarm(Agent):
         Handles the behaviour of bee exploring the space for resources.
         """
         # Abort exploration with certain probability, otherwise continue moving towards the resource
-        if self.model.is_raining or random() < self.model.bee_config.P_ABORT:
+        if self.model.is_raining or self.model.rng.random() < self.model.bee_config.P_ABORT:
             self.state = BeeState.RETURNING
         else:
             self.move_random_exploration()
@@ -309,11 +360,11 @@ class BeeSwarm(Agent):
         assert self.resource_destination != None
 
         # Find nearby resting bees and try to employ them with certain probability
-        nearby_resting_bees = self.model.space.get_neighbors(self.pos, self.model.bee_config.FOV, include_center=False)
-        nearby_resting_bees = list(filter(lambda bee : isinstance(bee, BeeSwarm) and bee.state == BeeState.RESTING, nearby_resting_bees))
+        nearby_resting_bees = self.model.bee_index.neighbors(self.pos, self.model.bee_config.FOV)
+        nearby_resting_bees = list(filter(lambda bee : bee.is_resting, nearby_resting_bees))
 
         for bee in nearby_resting_bees:
-            if bee.resting_time == 0 and random() < self.model.bee_config.P_FOLLOW_WAGGLE_DANCE:
+            if bee.resting_time == 0 and self.model.rng.random() < self.model.bee_config.P_FOLLOW_WAGGLE_DANCE:
                 bee.state = BeeState.FOLLOWING
                 bee.resource_destination = self.resource_destination
 
@@ -326,7 +377,7 @@ class BeeSwarm(Agent):
         Handles the behaviour of a bee recruited through waggle dance.
         """
         # Abort recruitment with certain probability, otherwise continue moving towards the resource
-        if self.model.is_raining or random() < self.model.bee_config.P_ABORT:
+        if self.model.is_raining or self.model.rng.random() < self.model.bee_config.P_ABORT:
             self.state = BeeState.RETURNING
         else:
             assert self.resource_destination != None
@@ -340,16 +391,18 @@ class BeeSwarm(Agent):
         if self.model.is_raining:
             death_factor *= self.model.bee_config.DEATH_STORM_FACTOR
     
-        if not self.is_in_hive and random() < self.model.bee_config.P_DEATH:
+        if not self.is_in_hive and self.model.rng.random() < self.model.bee_config.P_DEATH:
             # Death by random outside risk
             return self._remove_agent()
-        elif self.is_in_hive and random() < 0.1 * expon.pdf(self.hive.nectar, scale=1):
+        elif self.is_in_hive and self.model.rng.random() < 0.1 * self.model.rng.expon_pdf(self.hive.nectar, scale=1):
             # Death by hunger
             return self._remove_agent()
 
     def _remove_agent(self):
-        """Helper for removing agents."""
-        self.model.space.remove_agent(self)
-        self.model.schedule.remove(self)
-        self.model.agents.remove(self)
-        self.remove()
+        """
+        Helper for removing agents. The bee leaves the statistics and the bee index at once, and is marked dead
+        to be removed from the space and the schedule with the other dead bees at the end of the model step.
+        """
+        self.model.unregister_bee(self)
+        self.model.bee_index.remove(self)
+        self.model.dead_bees.append(self)
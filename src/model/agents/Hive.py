@@ -1,7 +1,6 @@
 from mesa import Agent, Model
 
 from typing import Tuple
-from numpy.random import random
 from .BeeSwarm import BeeSwarm
 
 from ..config.BeeSwarmConfig import BeeSwarmConfig as BSC
@@ -25,21 +24,20 @@ class Hive(Agent):
         """
         Feeds all bees within the hive.
         """
-        bees_in_hive = self.model.get_agents_of_type(BeeSwarm)
-        bees_in_hive = list(filter(lambda bee : isinstance(bee, BeeSwarm) and bee.is_in_hive, bees_in_hive))
+        bees_in_hive = self.model.bees_in_hive
 
-        self.nectar = max(0, self.nectar - len(bees_in_hive) * self.model.bee_config.FOOD_CONSUMPTION)
+        self.nectar = max(0, self.nectar - bees_in_hive * self.model.bee_config.FOOD_CONSUMPTION)
 
     def create_bee(self):
         """
         Creates a new adult bee agent.
         """
-        self.model.create_agent(BeeSwarm, self.pos, hive=self)
+        self.model.create_bee(self)
             
     def step(self):
         """Agent's step function required by Mesa package."""
         self.feed_bees()
         
-        if random() < self.model.bee_config.P_BIRTH:
+        if self.model.rng.random() < self.model.bee_config.P_BIRTH:
             self.create_bee()
         
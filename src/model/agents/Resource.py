@@ -5,7 +5,6 @@ import math
 
 from mesa import Agent, Model
 
-from ..util.BeeState import BeeState
 from ..config.ResourceConfig import ResourceConfig as RC
 
 class Resource(Agent):
@@ -28,19 +27,19 @@ class Resource(Agent):
             
         assert self.quantity // self.model.bee_config.CARRYING_CAPACITY
 
+    @property
+    def quantity(self) -> float:
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, quantity: float):
+        self._quantity = quantity
+
+        # Once placed, keep the model's scent landscape in sync with the quantity
+        if self.pos is not None:
+            self.model.scent.update_resource(self)
+
     def step(self):
         """Agent's step function required by Mesa package."""
-        nearby_foragers = self.model.space.get_neighbors(self.pos, RC.RADIUS, include_center=False)
-        nearby_foragers = list(filter(lambda agent : self.model.is_bee(agent), nearby_foragers))
-        nearby_foragers = list(filter(lambda bee : (bee.is_exploring or bee.is_following), nearby_foragers))
-
-        # Each nearby forager extracts the resource
-        for forager in nearby_foragers:
-            if (self.quantity == 0):
-                # If there is no resource to take, the bee returns with empty hands
-                forager.state = BeeState.RETURNING
-            else:
-                # Otherwise it grabs the resource and goes back to the hive with the information where the resource is
-                self.quantity = max(0, self.quantity - self.model.bee_config.CARRYING_CAPACITY)
-                forager.state = BeeState.CARRYING
-                forager.resource_destination = self
\ No newline at end of file
+        # Contacts with foragers are resolved for all resources at once, in their schedule order
+        self.model.resolve_resource_contacts()
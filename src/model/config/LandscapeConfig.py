@@ -0,0 +1,16 @@
+class LandscapeConfig:
+
+    def __init__(self, **kwargs):
+
+        # Side length of the square landscape holding all hives and resources
+        self.SIZE = kwargs.get('SIZE', 1200)
+
+        # Number of tiles along each side of the landscape, each tile stepped by its own worker process
+        self.N_TILES = kwargs.get('N_TILES', 2)
+
+        # Number of hives of the default landscape
+        self.N_HIVES = kwargs.get('N_HIVES', 24)
+
+        # Number of resources around each hive of the default landscape, and their distance from the hive
+        self.N_RESOURCES_PER_HIVE = kwargs.get('N_RESOURCES_PER_HIVE', 2)
+        self.RESOURCE_DISTANCE = kwargs.get('RESOURCE_DISTANCE', 50)
@@ -1,3 +1,5 @@
+from ..util.ScentMode import ScentMode
+
 class ModelConfig:
 
     # Side length of square continuous space where the bees can forage
@@ -17,3 +19,27 @@ class ModelConfig:
         # Distance from hive to resource in the default model setup
         self.RESOURCE_DISTANCE_DEFAULT = kwargs.get('RESOURCE_DISTANCE_DEFAULT', 50)
 
+        # ---| Scent landscape |---
+
+        # How resource scent is evaluated for exploring bees, exactly, through a cached raster or a quadtree approximation
+        self.SCENT_MODE = kwargs.get('SCENT_MODE', ScentMode.EXACT)
+
+        # Grid spacing of the cached scent raster, its error peaks just outside resources at about 0.4% for 0.5 and 1.1% for 1.0
+        self.SCENT_RESOLUTION = kwargs.get('SCENT_RESOLUTION', 0.5)
+
+        # Maximum relative error of the cached scent raster compared to the exact scent, verified outside resources
+        self.SCENT_TOLERANCE = kwargs.get('SCENT_TOLERANCE', 0.01)
+
+        # Accuracy of the quadtree approximation, nodes smaller than this fraction of their distance are aggregated
+        self.SCENT_THETA = kwargs.get('SCENT_THETA', 0.5)
+
+        # ---| Early termination |---
+
+        # Conditions on which `ForagerModel.run` stops before its last step, padding the collected data with its last values
+        self.STOPPING_CRITERIA = kwargs.get('STOPPING_CRITERIA', [])
+
+        # Number of last steps over which the trend of the reporters is tested for steady state
+        self.STEADY_STATE_WINDOW = kwargs.get('STEADY_STATE_WINDOW', 200)
+
+        # Largest change of the reporters until the end of the run extrapolated from their trend in steady state, relative to their mean
+        self.STEADY_STATE_TOLERANCE = kwargs.get('STEADY_STATE_TOLERANCE', 0.05)
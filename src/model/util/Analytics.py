@@ -9,16 +9,15 @@ from ..agents.Hive import Hive
 from ..agents.Resource import Resource
 
 def bees_proportion(model):
-    all_bees = model.get_agents_of_type(BeeSwarm)
-    if all_bees:
-        return {state.value: len([a for a in all_bees if a.state == state]) / len(all_bees) for state in BeeState}
-    else:
-        return {state.value: 0 for state in BeeState}
+    return {state.value: state_proportion(model, state) for state in BeeState}
 
-def forager_ratio(model):
-    bees_by_activity = bees_proportion(model)
+def state_proportion(model, state: BeeState) -> float:
+    """Proportion of bees in the given state, read from the model's incrementally maintained counts."""
+    bee_count = get_bee_count(model)
+    return model.state_counts[state] / bee_count if bee_count else 0
 
-    return bees_by_activity["exploring"] + bees_by_activity["following"]
+def forager_ratio(model):
+    return state_proportion(model, BeeState.EXPLORING) + state_proportion(model, BeeState.FOLLOWING)
 
 def nectar_in_hives(model):
     all_hives = model.get_agents_of_type(Hive)
@@ -35,14 +34,11 @@ def average_bee_fed(model):
         return 0
 
 def mean_perceived_nectar(model: Model):
-    all_bees = model.get_agents_of_type(BeeSwarm)
-    if all_bees:
-        return np.mean([b.perceived_nectar for b in all_bees])
-    else:
-        return 0
+    bee_count = get_bee_count(model)
+    return model.perceived_nectar_sum / bee_count if bee_count else 0
     
 def get_bee_count(model: Model) -> int:
-    return len(model.get_agents_of_type(BeeSwarm))
+    return model.bee_count
 
 def get_scent_scale(model: Model):
     all_bees = model.get_agents_of_type(BeeSwarm)
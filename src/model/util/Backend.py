@@ -0,0 +1,6 @@
+from enum import Enum
+
+class Backend(Enum):
+    AGENTS = "agents"
+    NUMPY = "numpy"
+    NUMBA = "numba"
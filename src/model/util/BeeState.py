@@ -6,4 +6,18 @@ class BeeState(Enum):
     EXPLORING = "exploring"
     CARRYING = "carrying"
     DANCING = "dancing"
-    FOLLOWING = "following"
\ No newline at end of file
+    FOLLOWING = "following"
+
+    @property
+    def code(self) -> int:
+        """Small integer code of the state, used by array-backed bee populations."""
+        return _STATE_CODES[self]
+
+    @staticmethod
+    def from_code(code: int) -> "BeeState":
+        """Inverse of `BeeState.code`."""
+        return _STATES[code]
+
+# Ordering of the states defines their integer codes
+_STATES = tuple(BeeState)
+_STATE_CODES = {state: code for code, state in enumerate(_STATES)}
@@ -0,0 +1,82 @@
+import numpy as np
+
+class Collector:
+    """
+    Columnar collector of model reporters, a lightweight replacement of Mesa's `DataCollector`.
+
+    Each reporter is recorded into its own preallocated NumPy column, every `collect_every` steps, and the
+    recorded values are returned as arrays. `model_vars` exposes the columns under the same name as Mesa's
+    collector, so Mesa's chart modules can read from it.
+    """
+
+    def __init__(self, reporters, collect_every=1, capacity=1024):
+        """
+        Args:
+            reporters (Dict[str, Callable[[Model], float]]): reporter functions of the recorded columns, by name
+            collect_every (int, optional): number of steps between records, a record is taken at every step
+                divisible by it. Defaults to 1.
+            capacity (int, optional): number of records allocated up front, grown geometrically. Defaults to 1024.
+        """
+        assert collect_every >= 1, "Records should be taken at least every step."
+
+        self.reporters = dict(reporters)
+        self.collect_every = collect_every
+
+        # Recorded values of each reporter and number of records taken
+        self._columns = {name: np.empty(capacity) for name in self.reporters}
+        self.n_records = 0
+
+        # Number of calls to `collect`, i.e. the number of model steps
+        self._steps = 0
+
+    def reserve(self, n_records: int):
+        """Allocates columns for at least `n_records` records, so that no column grows while recording them."""
+        capacity = len(next(iter(self._columns.values()))) if self._columns else 0
+        if n_records > capacity:
+            for name, column in self._columns.items():
+                grown = np.empty(n_records)
+                grown[:self.n_records] = column[:self.n_records]
+                self._columns[name] = grown
+
+    def collect(self, model):
+        """Records all reporters if the number of steps is divisible by `collect_every`, to be called once per step."""
+        self._steps += 1
+        if self._steps % self.collect_every:
+            return
+
+        if self._columns and self.n_records == len(next(iter(self._columns.values()))):
+            self.reserve(2 * self.n_records)
+
+        for name, reporter in self.reporters.items():
+            self._columns[name][self.n_records] = reporter(model)
+        self.n_records += 1
+
+    def records(self, n_steps: int) -> int:
+        """Number of records taken over `n_steps` steps."""
+        return n_steps // self.collect_every
+
+    def pad(self, n_records: int):
+        """Repeats the last record until there are `n_records` records."""
+        if self.n_records == 0 or n_records <= self.n_records:
+            return
+
+        self.reserve(n_records)
+        for column in self._columns.values():
+            column[self.n_records:n_records] = column[self.n_records - 1]
+        self.n_records = n_records
+
+    def get(self, name: str) -> np.ndarray:
+        """Recorded values of a reporter, as a view of its column."""
+        return self._columns[name][:self.n_records]
+
+    @property
+    def model_vars(self):
+        """Recorded values of all reporters by name."""
+        return {name: self.get(name) for name in self._columns}
+
+    def get_model_vars_dataframe(self):
+        """Recorded values as a pandas DataFrame indexed by step, for interactive use."""
+        import pandas as pd
+
+        steps = np.arange(1, self.n_records + 1) * self.collect_every
+        return pd.DataFrame(self.model_vars, index=pd.Index(steps, name='Step'))
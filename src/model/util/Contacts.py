@@ -0,0 +1,77 @@
+import numpy as np
+
+def resource_contacts(positions, res_positions, radius, chunk_size=2**20):
+    """Finds all foragers within `radius` of each resource, excluding foragers at the exact resource position.
+
+    Args:
+        positions (np.ndarray): positions of the foragers, of shape (n_foragers, 2)
+        res_positions (np.ndarray): positions of the resources, of shape (n_resources, 2)
+        radius (float): contact radius
+        chunk_size (int, optional): maximum number of forager-resource distances held in memory at once. Defaults to 2**20.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: indices of resources and of foragers in contact, ordered by resource
+            and by forager index within a resource
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+    res_positions = np.asarray(res_positions, dtype=float).reshape(-1, 2)
+
+    contact_resources, contact_foragers = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    if len(positions) == 0:
+        return contact_resources[0], contact_foragers[0]
+
+    # Same distance computation as `ContinuousSpace.get_neighbors`, chunked over resources
+    step = max(1, chunk_size // len(positions))
+    for start in range(0, len(res_positions), step):
+        deltas = positions[None, :, :] - res_positions[start:start + step, None, :]
+        dist_squared = deltas[..., 0] ** 2 + deltas[..., 1] ** 2
+        r, f = np.nonzero((dist_squared <= radius**2) & (dist_squared > 0))
+        contact_resources.append(r + start)
+        contact_foragers.append(f)
+
+    return np.concatenate(contact_resources), np.concatenate(contact_foragers)
+
+def resolve_contacts(contact_resources, contact_foragers, quantities, carrying_capacity):
+    """Resolves forager-resource contacts in resource order.
+
+    Each resource serves its foragers in order, every served forager taking up to the carrying capacity,
+    until the resource runs out. The remaining foragers return with empty hands. A forager in contact
+    with several resources is only served by the first of them, as it stops foraging once served.
+
+    Args:
+        contact_resources (np.ndarray): indices of resources in contact, ordered as returned by `resource_contacts`
+        contact_foragers (np.ndarray): indices of foragers in contact
+        quantities (List[float]): quantity of each resource, updated in place
+        carrying_capacity (float): quantity taken by each served forager
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: foragers that carry nectar, index of the resource each of them
+            carries from, and foragers that return with empty hands
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(contact_foragers) == 0:
+        return empty, empty, empty
+
+    # Keep only the first resource each forager is in contact with
+    _, first = np.unique(contact_foragers, return_index=True)
+    first = np.sort(first)
+    contact_resources, contact_foragers = contact_resources[first], contact_foragers[first]
+
+    carrying, sources, returning = [empty], [empty], [empty]
+    resources, starts = np.unique(contact_resources, return_index=True)
+    ends = np.append(starts[1:], len(contact_resources))
+
+    for r, start, end in zip(resources.tolist(), starts.tolist(), ends.tolist()):
+        # Foragers grab the resource until it runs out, the rest return with empty hands
+        n_carrying = 0
+        quantity = quantities[r]
+        while n_carrying < end - start and quantity != 0:
+            quantity = max(0, quantity - carrying_capacity)
+            n_carrying += 1
+        quantities[r] = quantity
+
+        carrying.append(contact_foragers[start:start + n_carrying])
+        sources.append(np.full(n_carrying, r, dtype=np.int64))
+        returning.append(contact_foragers[start + n_carrying:end])
+
+    return np.concatenate(carrying), np.concatenate(sources), np.concatenate(returning)
@@ -0,0 +1,185 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Whether the kernels below are compiled, otherwise they run as plain Python over the same arrays.
+# Kernels draw from the NumPy `Generator` passed to them, which Numba advances in place, so that every model
+# keeps its own seeded stream and compiled and plain kernels draw the same numbers.
+HAS_NUMBA = njit is not None
+
+def kernel(function):
+    """Compiles a per-bee kernel with Numba when it is installed, otherwise returns it unchanged."""
+    if HAS_NUMBA:
+        return njit(cache=True)(function)
+    return function
+
+@kernel
+def move_in_hive(rng, positions, idx, hive_x, hive_y, radius, speed):
+    """Moves given bees in a random direction, redrawing the direction of each bee until it stays within the hive.
+
+    Returns the number of drawn directions, including those rejected for leaving the hive.
+    """
+    draws = 0
+    for i in idx:
+        x, y = positions[i, 0], positions[i, 1]
+        newx, newy = x, y
+        inside = False
+        while not inside:
+            draws += 1
+            angle = rng.uniform(0.0, 2 * np.pi)
+            newx = x + speed * math.cos(angle)
+            newy = y + speed * math.sin(angle)
+            inside = math.hypot(newx - hive_x, newy - hive_y) <= radius
+        positions[i, 0] = newx
+        positions[i, 1] = newy
+    return draws
+
+@kernel
+def build_grid(positions, cell_size):
+    """Sorts positions by cell of a uniform grid, as a counting sort.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, int, int, int, int]: positions in cell order, first slot of each cell in that
+            order followed by the end, cell coordinates of the grid origin and number of cells along both axes
+    """
+    n = len(positions)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64), 0, 0, 0, 0
+
+    cx = np.empty(n, dtype=np.int64)
+    cy = np.empty(n, dtype=np.int64)
+    for i in range(n):
+        cx[i] = int(math.floor(positions[i, 0] / cell_size))
+        cy[i] = int(math.floor(positions[i, 1] / cell_size))
+    ox, oy = cx.min(), cy.min()
+    nx, ny = cx.max() - ox + 1, cy.max() - oy + 1
+
+    cells = (cx - ox) * ny + (cy - oy)
+    starts = np.zeros(nx * ny + 1, dtype=np.int64)
+    for i in range(n):
+        starts[cells[i] + 1] += 1
+    starts = np.cumsum(starts)
+
+    order = np.empty(n, dtype=np.int64)
+    fill = starts[:-1].copy()
+    for i in range(n):
+        order[fill[cells[i]]] = i
+        fill[cells[i]] += 1
+
+    return order, starts, ox, oy, nx, ny
+
+@kernel
+def neighbors(i, positions, radius, grid, cell_size, found):
+    """Finds positions within `radius` of position `i`, excluding positions at the exact same point.
+
+    Args:
+        i (int): index of the position to search around
+        positions (np.ndarray): positions indexed by `grid`
+        radius (float): search radius
+        grid (Tuple): grid of the positions, as returned by `build_grid`
+        cell_size (float): side length of the grid cells
+        found (np.ndarray): buffer of at least `len(positions)` slots receiving the neighbors, in index order
+
+    Returns:
+        int: number of neighbors found
+    """
+    order, starts, ox, oy, nx, ny = grid
+    x, y = positions[i, 0], positions[i, 1]
+    cx = int(math.floor(x / cell_size)) - ox
+    cy = int(math.floor(y / cell_size)) - oy
+    reach = max(1, int(math.ceil(radius / cell_size)))
+
+    count = 0
+    for gx in range(max(cx - reach, 0), min(cx + reach + 1, nx)):
+        for gy in range(max(cy - reach, 0), min(cy + reach + 1, ny)):
+            cell = gx * ny + gy
+            for slot in range(starts[cell], starts[cell + 1]):
+                j = order[slot]
+                dx = positions[j, 0] - x
+                dy = positions[j, 1] - y
+                dist_squared = dx * dx + dy * dy
+                if dist_squared <= radius * radius and dist_squared > 0:
+                    found[count] = j
+                    count += 1
+
+    found[:count] = np.sort(found[:count])
+    return count
+
+@kernel
+def rest(rng, idx, positions, states, resting_times, perceived_nectar, nectar, cell_size, fov,
+         p_inspection, p_communication, exploring_incentive, exploring):
+    """Resting bees inspect the hive or share their perceived nectar with nearby bees, then may start exploring.
+
+    Bees act one after another in order of `idx`. Returns the grid of all positions, for the dancers of the same step.
+    """
+    grid = build_grid(positions, cell_size)
+    found = np.empty(len(positions), dtype=np.int64)
+
+    for i in idx:
+        if rng.random() < p_inspection:
+            # Inspect hive resources with fixed probability
+            perceived_nectar[i] = max(nectar + rng.uniform(-1.0, 0.0), 0.0)
+        elif rng.random() < p_communication:
+            # If not inspecting, communicate the information with all nearby bees
+            count = neighbors(i, positions, fov, grid, cell_size, found)
+            for k in range(count):
+                if rng.random() < p_communication:
+                    perceived_nectar[found[k]] = perceived_nectar[i]
+
+        # Start exploring based on exponential distribution and self-perceived nectar
+        p_explore = math.exp(-perceived_nectar[i] / exploring_incentive) / exploring_incentive if perceived_nectar[i] >= 0 else 0.0
+        if resting_times[i] == 0 and rng.random() < p_explore:
+            states[i] = exploring
+        else:
+            resting_times[i] = max(resting_times[i] - 1, 0)
+
+    return grid
+
+@kernel
+def dance(rng, idx, positions, states, resting_times, destinations, grid, cell_size, fov, p_follow,
+          resting, following, resting_period, no_destination):
+    """Dancing bees recruit nearby resting bees to their resource, one dancer after another in order of `idx`."""
+    found = np.empty(len(positions), dtype=np.int64)
+
+    for i in idx:
+        count = neighbors(i, positions, fov, grid, cell_size, found)
+        for k in range(count):
+            j = found[k]
+            if states[j] == resting and resting_times[j] == 0 and rng.random() < p_follow:
+                states[j] = following
+                destinations[j] = destinations[i]
+
+        states[i] = resting
+        resting_times[i] = resting_period
+        destinations[i] = no_destination
+
+@kernel
+def extract(positions, states, destinations, res_positions, quantities, radius, carrying_capacity,
+            exploring, following, carrying, returning):
+    """Each resource in turn serves the foragers within `radius` in order, as `Resource.step` of every resource would."""
+    foragers = np.nonzero((states == exploring) | (states == following))[0]
+
+    for r in range(len(res_positions)):
+        for f in foragers:
+            # Foragers served by an earlier resource stopped foraging
+            if states[f] != exploring and states[f] != following:
+                continue
+
+            dx = positions[f, 0] - res_positions[r, 0]
+            dy = positions[f, 1] - res_positions[r, 1]
+            dist_squared = dx * dx + dy * dy
+            if dist_squared > radius * radius or dist_squared == 0:
+                continue
+
+            if quantities[r] == 0:
+                # If there is no resource to take, the bee returns with empty hands
+                states[f] = returning
+            else:
+                # Otherwise it grabs the resource and goes back to the hive with the information where the resource is
+                quantities[r] = max(0.0, quantities[r] - carrying_capacity)
+                states[f] = carrying
+                destinations[f] = r
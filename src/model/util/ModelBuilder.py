@@ -12,7 +12,7 @@ def add_random_resource(model, quantity=None):
     """
     x, y = model.hive.pos
     while model.space.get_distance((x,y), model.hive.pos) < (HC.RADIUS + RC.RADIUS):
-        x, y = np.random.uniform(0, model.size, size=2)
+        x, y = model.layout_rng.uniform(0, model.size, size=2)
     
     if quantity == None:
         model.create_agent(Resource, (x, y), quantity=model.resource_config.QUANTITY)
@@ -26,7 +26,7 @@ def add_resource_in_distance(model, distance: float, quantity=None):
     """
     assert distance > (HC.RADIUS + RC.RADIUS), "Resources should not overlap with the hive."
 
-    angle = np.random.uniform(0, 2 * np.pi)
+    angle = model.layout_rng.uniform(0, 2 * np.pi)
     dx = distance * np.cos(angle)
     dy = distance * np.sin(angle)
 
@@ -54,4 +54,12 @@ def add_n_resources_in_angle_range(model, distance: float, n_resources: float, m
         if quantity == None:
             model.create_agent(Resource, (x, y), quantity=model.resource_config.QUANTITY)
         else:
-            model.create_agent(Resource, (x, y), quantity=quantity)
\ No newline at end of file
+            model.create_agent(Resource, (x, y), quantity=quantity)
+
+@staticmethod
+def build_layout(model, layout):
+    """
+    Adds the resources of a layout, given as a list of calls to the functions above, e.g. [('add_resource_in_distance', 50)].
+    """
+    for name, *args in layout:
+        globals()[name](model, *args)
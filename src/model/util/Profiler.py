@@ -0,0 +1,194 @@
+import csv
+import time
+from collections import defaultdict
+from functools import wraps
+
+from ..agents.BeeSwarm import BeeSwarm
+from ..agents.BeeColony import BeeColony, NumbaBeeColony
+from ..agents.BeePopulation import BeePopulation
+from ..agents.Hive import Hive
+from ..agents.Resource import Resource
+from .BeeState import BeeState
+from .SpatialHash import SpatialHash, CellList
+
+# Timed methods of each agent class: the agent's step, the handler of each bee state and the costly moves.
+# Only methods defined by the class itself are wrapped, inherited ones are timed on their defining class.
+HANDLERS = [f'handle_{state.name.lower()}' for state in BeeState]
+AGENT_SECTIONS = {
+    BeeSwarm: ['step', *HANDLERS, 'move_random_in_hive', 'move_random_exploration', 'manage_death'],
+    BeePopulation: [*HANDLERS, 'move_random_in_hive', 'move_random_exploration', 'manage_death'],
+    BeeColony: ['step', 'extract_resources'],
+    NumbaBeeColony: ['handle_resting', 'handle_dancing', 'move_random_in_hive', 'extract_resources'],
+    Hive: ['step', 'feed_bees'],
+    Resource: ['step']
+}
+
+# Timed phases of a model step, methods of the model
+MODEL_SECTIONS = ['plan_exploration', 'resolve_resource_contacts', 'remove_dead_bees', 'manage_weather_events', 'check_stopping_criteria']
+
+class Profiler:
+    """
+    Opt-in instrumentation of `ForagerModel.step`, recording wall time and calls of each step phase, agent type
+    and bee state handler, and counting neighbor query results and rejected in-hive moves.
+
+    Used as a context manager around the profiled steps, `with Profiler(model) as profiler: model.run(100)`.
+    Methods are wrapped on entering and restored on exit, so models run without a profiler are not instrumented
+    at all. Times are inclusive, e.g. `BeeSwarm.step` includes the time of its handlers. Only one profiler can be
+    active at a time, and bees of other models stepped meanwhile are left out.
+    """
+
+    # Profiler currently attached, as agent classes are wrapped for all their instances
+    _active = None
+
+    def __init__(self, model):
+        self.model = model
+
+        # Wall time and number of calls of each section over all profiled steps
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+
+        # Counters, e.g. of neighbor query results, over all profiled steps
+        self.counts = defaultdict(int)
+
+        # Time of each section and counters of each profiled step, see `export_trace`
+        self.trace = []
+        self._step_times = defaultdict(float)
+        self._step_counts = defaultdict(int)
+
+        # Wrapped attributes, restored on exit
+        self._patched = []
+
+    # ---| Instrumentation |---
+
+    def __enter__(self):
+        assert Profiler._active is None, "Another profiler is already attached."
+        Profiler._active = self
+
+        for cls, names in AGENT_SECTIONS.items():
+            for name in names:
+                if name in vars(cls):
+                    self._patch(cls, name, self._timed(f'{cls.__name__}.{name}', getattr(cls, name), agent_method=True))
+
+        for name in MODEL_SECTIONS:
+            self._patch(self.model, name, self._timed(f'model.{name}', getattr(self.model, name)))
+        self._patch(self.model.schedule, 'step', self._timed('model.schedule', self.model.schedule.step))
+        self._patch(self.model.datacollector, 'collect', self._timed('model.collect', self.model.datacollector.collect))
+        self._patch(self.model, 'step', self._step(self.model.step))
+
+        self._patch(self.model.bee_index, 'neighbors', self._counted_neighbors(self.model.bee_index.neighbors))
+        self._patch(CellList, 'pairs_within', self._counted_pairs(CellList.pairs_within))
+        return self
+
+    def __exit__(self, *exc_info):
+        for owner, name, original in reversed(self._patched):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._patched = []
+        Profiler._active = None
+
+    def _patch(self, owner, name, wrapper):
+        # Instance attributes are deleted on exit, so that the class method shows through again
+        original = vars(owner).get(name) if isinstance(owner, type) else None
+        self._patched.append((owner, name, original))
+        setattr(owner, name, wrapper)
+
+    def _record(self, section, elapsed):
+        self.times[section] += elapsed
+        self.calls[section] += 1
+        self._step_times[section] += elapsed
+
+    def _count(self, counter, n):
+        self.counts[counter] += n
+        self._step_counts[counter] += n
+
+    def _timed(self, section, method, agent_method=False):
+        profiler = self
+        draws_counter = section.endswith('move_random_in_hive')
+
+        if agent_method:
+            @wraps(method)
+            def wrapper(agent, *args, **kwargs):
+                if getattr(agent, 'model', None) is not profiler.model:
+                    return method(agent, *args, **kwargs)
+                start = time.perf_counter()
+                result = method(agent, *args, **kwargs)
+                profiler._record(section, time.perf_counter() - start)
+
+                # In-hive moves return their number of drawn positions, one per bee is accepted
+                if draws_counter and result is not None:
+                    n_bees = len(args[0]) if args else 1
+                    profiler._count('in_hive_move.draws', result)
+                    profiler._count('in_hive_move.rejections', result - n_bees)
+                return result
+        else:
+            @wraps(method)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                result = method(*args, **kwargs)
+                profiler._record(section, time.perf_counter() - start)
+                return result
+        return wrapper
+
+    def _step(self, step):
+        @wraps(step)
+        def wrapper():
+            start = time.perf_counter()
+            step()
+            self._record('model.step', time.perf_counter() - start)
+
+            self.trace.append({'step': self.model.schedule.steps, **self._step_times, **self._step_counts})
+            self._step_times = defaultdict(float)
+            self._step_counts = defaultdict(int)
+        return wrapper
+
+    def _counted_neighbors(self, neighbors):
+        @wraps(neighbors)
+        def wrapper(*args, **kwargs):
+            result = neighbors(*args, **kwargs)
+            self._count('neighbors.queries', 1)
+            self._count('neighbors.results', len(result))
+            return result
+        return wrapper
+
+    def _counted_pairs(self, pairs_within):
+        profiler = self
+
+        @wraps(pairs_within)
+        def wrapper(cells, sources, radius):
+            result = pairs_within(cells, sources, radius)
+            profiler._count('neighbors.queries', len(sources))
+            profiler._count('neighbors.results', len(result[0]))
+            return result
+        return wrapper
+
+    # ---| Results |---
+
+    def summary(self):
+        """Calls, total and mean time of each section, and its share of the profiled step time, slowest first.
+
+        Returns:
+            Dict[str, Dict[str, float]]: 'calls', 'time_s', 'per_call_us' and 'share' of each section by name
+        """
+        total = self.times.get('model.step', 0.0) or 1.0
+        return {section: {'calls': self.calls[section], 'time_s': elapsed, 'per_call_us': 1e6 * elapsed / self.calls[section],
+                          'share': elapsed / total}
+                for section, elapsed in sorted(self.times.items(), key=lambda item: -item[1])}
+
+    def report(self) -> str:
+        """Summary and counters as a printable table."""
+        lines = [f"{'section':>36} {'calls':>10} {'time s':>10} {'us/call':>10} {'share':>7}"]
+        for section, row in self.summary().items():
+            lines.append(f"{section:>36} {row['calls']:>10} {row['time_s']:>10.3f} {row['per_call_us']:>10.2f} {row['share']:>7.1%}")
+        for counter, n in sorted(self.counts.items()):
+            lines.append(f"{counter:>36} {n:>10}")
+        return '\n'.join(lines)
+
+    def export_trace(self, path: str):
+        """Writes the time of each section in seconds and the counters of each profiled step as CSV, one row per step."""
+        columns = ['step'] + sorted({column for row in self.trace for column in row} - {'step'})
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=columns, restval=0)
+            writer.writeheader()
+            writer.writerows(self.trace)
@@ -0,0 +1,140 @@
+import math
+import numpy as np
+
+class RandomService:
+    """
+    Model-level source of random numbers for the per-bee draws of the hot paths, backed by a seeded NumPy `Generator`.
+
+    Scalar uniforms are served from large pre-filled blocks instead of one library call per draw, and
+    densities are evaluated in closed form. Array draws (`size` given) are taken from the generator directly.
+    """
+
+    def __init__(self, seed=None, block_size=8192):
+        """
+        Args:
+            seed (optional): seed of the generator, anything accepted by `np.random.default_rng`. Defaults to None, seeding from fresh entropy.
+            block_size (int, optional): number of uniforms drawn at once for scalar draws. Defaults to 8192.
+        """
+        # Generator all random numbers are drawn from
+        self.generator = np.random.default_rng(seed)
+
+        # Number of uniforms drawn at once when the current block runs out
+        self.block_size = block_size
+
+        # Current block of uniforms on [0, 1) and position of the next unused one
+        self._block = []
+        self._next = 0
+
+    def _refill(self):
+        self._block = self.generator.random(self.block_size).tolist()
+        self._next = 0
+
+    def random(self, size=None):
+        """Uniform random number(s) on [0, 1)."""
+        if size is not None:
+            return self.generator.random(size)
+
+        if self._next == len(self._block):
+            self._refill()
+
+        value = self._block[self._next]
+        self._next += 1
+        return value
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        """Uniform random number(s) on [low, high)."""
+        if size is not None:
+            return self.generator.uniform(low, high, size)
+
+        return low + (high - low) * self.random()
+
+    @staticmethod
+    def expon_pdf(x, scale=1.0):
+        """Density of the exponential distribution, same as `scipy.stats.expon.pdf(x, scale=scale)`."""
+        if isinstance(x, np.ndarray):
+            return np.where(x >= 0, np.exp(-np.maximum(x, 0) / scale) / scale, 0.0)
+
+        return math.exp(-x / scale) / scale if x >= 0 else 0.0
+
+
+class ReplicaRandomService:
+    """
+    Random streams of the replicas of an ensemble, one `RandomService` each, serving array draws for the bees of
+    several replicas at once.
+
+    Bound to the replica of each drawn value with `of`, a draw takes the values of each replica from that replica's
+    own stream, in the order its bees are given, so the values a replica gets do not depend on the other replicas.
+    """
+
+    def __init__(self, services, replicas=None):
+        """
+        Args:
+            services (List[RandomService]): random stream of each replica
+            replicas (np.ndarray, optional): replica of each drawn value. Defaults to None, unbound.
+        """
+        self.services = list(services)
+        self.replicas = replicas
+
+    def __getitem__(self, replica: int) -> RandomService:
+        return self.services[replica]
+
+    def of(self, replicas) -> 'ReplicaRandomService':
+        """Streams drawing one value for each of the given replicas, in their order."""
+        return ReplicaRandomService(self.services, np.asarray(replicas, dtype=np.int64))
+
+    def _draw(self, size, draw):
+        assert self.replicas is not None and size == len(self.replicas), "Draws should be bound to the replica of each value."
+
+        if size == 0:
+            return np.empty(0)
+
+        counts = np.bincount(self.replicas, minlength=len(self.services))
+        values = np.concatenate([draw(self.services[r].generator, n) for r, n in enumerate(counts.tolist()) if n])
+
+        # Values are drawn grouped by replica, bees of several replicas may come in any order
+        if np.any(self.replicas[1:] < self.replicas[:-1]):
+            grouped = values
+            values = np.empty(size)
+            values[np.argsort(self.replicas, kind='stable')] = grouped
+        return values
+
+    def random(self, size):
+        """Uniform random numbers on [0, 1), one for each bound replica."""
+        return self._draw(size, lambda generator, n: generator.random(n))
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        """Uniform random numbers on [low, high), one for each bound replica."""
+        return self._draw(size, lambda generator, n: generator.uniform(low, high, n))
+
+    expon_pdf = staticmethod(RandomService.expon_pdf)
+
+
+def replica_seeds(seed, n_replicas: int):
+    """Seeds of the replicas of an ensemble, one drawn from each child of `np.random.SeedSequence(seed).spawn(n_replicas)`.
+
+    Replicas get independent streams, and the seed of a replica does not depend on the number of replicas.
+
+    Args:
+        seed: seed of the ensemble, anything accepted by `np.random.SeedSequence`
+        n_replicas (int): number of replicas
+
+    Returns:
+        List[int]: seed of each replica
+    """
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(n_replicas)]
+
+
+def sweep_seed(index, common_random_numbers=True) -> int:
+    """Seed of a run of a sweep.
+
+    With common random numbers, the same repeat of every cell gets the same seed, so that the differences between
+    cells are not blurred by the noise of different random streams and need far fewer repeats to resolve. Otherwise
+    every run gets its own seed, derived from its whole index.
+
+    Args:
+        index (Tuple[int, ...]): index of the run in the grid of runs, the repeat last
+        common_random_numbers (bool, optional): whether cells share their seeds. Defaults to True.
+    """
+    if common_random_numbers:
+        return int(index[-1])
+    return int(np.random.SeedSequence([int(i) for i in index]).generate_state(1)[0])
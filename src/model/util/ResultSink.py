@@ -0,0 +1,173 @@
+import os
+import json
+import numpy as np
+
+from .RunCache import canonical
+
+class ResultSink:
+    """
+    Memory-mapped `.npy` outputs of an experiment sweep, written in place by the processes running it.
+
+    Each output is a `<directory>/<name>.npy` array of shape `cells + (n_steps,)`, e.g. (n_x, n_y, n_repeats, n_steps),
+    allocated on disk up front and filled with NaN if it holds floats. A run writes its time series into its slice
+    and then sets its completion marker in `<directory>/completed.npy`, so the parent holds no results in memory and
+    an interrupted sweep keeps every finished run and can be resumed. The sink only holds paths and shapes, so it can
+    be sent to pool workers.
+
+    The boolean `completed` mask of shape `cells` tells which runs were written. Runs that are not completed, those
+    of an interrupted sweep or the repeats an adaptive sweep did not need, keep their initial values, NaN for float
+    outputs, so analyses should select the completed runs, e.g. `np.where(completed, output[..., -1], 0)`, or use
+    NaN-aware reductions such as `np.nanmean`.
+
+    Next to the mask, `<directory>/keys.npy` holds the run cache key of each completed run (see `RunCache.key`), so
+    that runs whose parameters, seed or model code changed since they were written can be told apart and run again.
+    The definition of the sweep that wrote the outputs is kept in `<directory>/definition.json`, and outputs written
+    by a differently defined sweep are discarded when the sink is opened.
+    """
+
+    # Name of the array of completion markers, one per run
+    COMPLETED = 'completed'
+
+    # Name of the array of run cache keys, one per run
+    KEYS = 'keys'
+
+    # Name of the file holding the definition of the sweep that wrote the outputs
+    DEFINITION = 'definition.json'
+
+    def __init__(self, directory: str, names, cells, n_steps: int, dtype=float, definition=None):
+        """Opens the outputs of a sweep, creating them if they do not exist yet or if they were written by a
+        sweep of another definition.
+
+        Args:
+            directory (str): directory of the output files
+            names (Iterable[str]): names of the recorded time series, one file each
+            cells (Tuple[int, ...]): shape of the grid of runs, including the repeats axis
+            n_steps (int): length of each time series
+            dtype (optional): data type of the outputs. Defaults to float.
+            definition (Dict[str, Any], optional): description of the sweep that determines what its outputs hold,
+                see `Sweep.definition`. Defaults to None, outputs of any sweep of the same shapes are kept.
+        """
+        self.directory = directory
+        self.names = list(names)
+        self.cells = tuple(cells)
+        self.n_steps = n_steps
+        self.dtype = np.dtype(dtype)
+
+        # Memory maps opened lazily in each process
+        self._arrays = {}
+
+        os.makedirs(directory, exist_ok=True)
+        reset = definition is not None and self._definition() != json.dumps(canonical(definition), sort_keys=True)
+        for name in self.names:
+            self._create(name, self.cells + (n_steps,), self.dtype, reset)
+        self._create(self.COMPLETED, self.cells, np.dtype(bool), reset)
+        self._create(self.KEYS, self.cells, np.dtype('S64'), reset)
+
+        # Written once the outputs are allocated, so an interrupted reset is reset again
+        if reset:
+            with open(os.path.join(directory, self.DEFINITION), 'w') as file:
+                file.write(json.dumps(canonical(definition), sort_keys=True))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_arrays'] = {}
+        return state
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f'{name}.npy')
+
+    def _definition(self):
+        """Definition of the sweep that wrote the outputs, as stored, or None."""
+        path = os.path.join(self.directory, self.DEFINITION)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return file.read()
+
+    def _create(self, name, shape, dtype, reset=False):
+        """Allocates an output filled with NaN, or zeros or empty strings if it does not hold floats, keeping an
+        existing one of the same shape and type unless `reset`."""
+        path = self.path(name)
+        if os.path.exists(path) and not reset:
+            existing = np.load(path, mmap_mode='r')
+            if existing.shape == shape and existing.dtype == dtype:
+                return
+            del existing
+
+        array = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+        if dtype.kind == 'f':
+            array[...] = np.nan
+        array.flush()
+        del array
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.path(name), mmap_mode='r+')
+        return self._arrays[name]
+
+    def write(self, index, key: str = '', **series):
+        """Writes the time series of one run and marks it completed.
+
+        Args:
+            index (Tuple[int, ...]): index of the run in the grid of runs
+            key (str, optional): run cache key of the run. Defaults to '', a run that `discard_stale` always discards.
+            **series (np.ndarray): time series of the run by output name
+        """
+        assert set(series) == set(self.names), f"Expected time series {self.names}, got {list(series)}."
+
+        for name, values in series.items():
+            array = self._array(name)
+            array[index] = values
+            array.flush()
+
+        keys = self._array(self.KEYS)
+        keys[index] = key.encode()
+        keys.flush()
+
+        # Marked only once all outputs of the run are on disk
+        completed = self._array(self.COMPLETED)
+        completed[index] = True
+        completed.flush()
+
+    def is_completed(self, index) -> bool:
+        return bool(self._array(self.COMPLETED)[index])
+
+    def discard_stale(self, run_key) -> int:
+        """Marks the completed runs whose stored key differs from their current key as not completed, and resets
+        their outputs, so that they are looked up in the run cache or run again.
+
+        Args:
+            run_key (Callable[[Tuple[int, ...]], str]): current run cache key of the run at an index of the grid
+
+        Returns:
+            int: number of discarded runs
+        """
+        completed = self._array(self.COMPLETED)
+        keys = self._array(self.KEYS)
+        indices = [tuple(int(i) for i in index) for index in np.argwhere(completed)]
+        stale = [index for index in indices if keys[index].decode() != run_key(index)]
+
+        for index in stale:
+            completed[index] = False
+        completed.flush()
+
+        for name in self.names:
+            array = self._array(name)
+            if array.dtype.kind == 'f':
+                for index in stale:
+                    array[index] = np.nan
+                array.flush()
+        return len(stale)
+
+    def pending(self):
+        """Indices of the runs not completed yet, in grid order."""
+        completed = np.load(self.path(self.COMPLETED), mmap_mode='r')
+        return [tuple(int(i) for i in index) for index in np.argwhere(~completed)]
+
+    def completed_cells(self) -> np.ndarray:
+        """Boolean mask over the grid without the repeats axis, of the cells whose runs are all completed."""
+        return np.load(self.path(self.COMPLETED), mmap_mode='r').all(axis=-1)
+
+    def load(self, name: str) -> np.ndarray:
+        """Read-only view of an output, usable while the sweep is still running."""
+        return np.load(self.path(name), mmap_mode='r')
@@ -0,0 +1,145 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from enum import Enum
+from functools import lru_cache
+
+# Root of the model sources, whose contents make up the code version of cached runs
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sources that do not change the outcome of a run, so that editing them keeps the cache
+UNVERSIONED = {'SensitivityAnalysisConfig.py', 'VisualConfig.py'}
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Hash of the contents of all model source files, so that cached runs are invalidated by any change of the model."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(MODEL_DIR):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py') and name not in UNVERSIONED:
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, MODEL_DIR).encode())
+                with open(path, 'rb') as file:
+                    digest.update(file.read())
+    return digest.hexdigest()
+
+def config_params(config) -> dict:
+    """Parameters of a config object, including the constants of its class."""
+    params = {name: value for name, value in vars(type(config)).items() if name.isupper()}
+    params.update(vars(config))
+    return params
+
+def canonical(value):
+    """Converts a value to plain JSON types, so that equal parameters always hash the same."""
+    if isinstance(value, Enum):
+        return canonical(value.value)
+    if isinstance(value, np.generic):
+        return canonical(value.item())
+    if isinstance(value, np.ndarray):
+        return canonical(value.tolist())
+    if isinstance(value, dict):
+        return {str(k): canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonical(v) for v in value]
+    if isinstance(value, float):
+        # Whole numbers hash as integers, e.g. a distance of 50.0 from `np.linspace` is the default distance of 50,
+        # others by their exact round-trip representation, which also covers inf and nan
+        return int(value) if value.is_integer() else repr(value)
+    return value
+
+class RunCache:
+    """
+    Content-addressed store of the time series of single model runs.
+
+    A run is identified by a hash of everything that determines its outcome: the model, bee, hive and resource
+    configs, the resource layout, the number of steps, the seed and the code version of the model. Runs with
+    the same key are never recomputed, whichever experiment asks for them, e.g. the default cell of a sweep
+    reuses the baseline runs and a sweep whose parameters were edited only runs the cells that changed.
+    Each run is stored compressed as `<directory>/<key[:2]>/<key>.npz`, written atomically.
+    """
+
+    def __init__(self, directory: str = os.path.join('data', 'cache')):
+        """
+        Args:
+            directory (str, optional): directory of the cached runs. Defaults to data/cache.
+        """
+        self.directory = directory
+
+    def key(self, model_config, bee_config, hive_config, resource_config, layout, n_steps: int, seed: int, **options) -> str:
+        """Stable hash identifying a run.
+
+        Args:
+            model_config (ModelConfig): global model parameters
+            bee_config (BeeSwarmConfig): bee parameters
+            hive_config (HiveConfig): hive parameters
+            resource_config (ResourceConfig): resource parameters
+            layout (List[Tuple]): resource layout as `ModelBuilder` calls, see `ModelBuilder.build_layout`
+            n_steps (int): number of model steps
+            seed (int): seed of the run
+            **options: any other argument of the run that changes its outcome, e.g. the backend
+
+        Returns:
+            str: hexadecimal key of the run
+        """
+        description = {
+            'model_config': config_params(model_config),
+            'bee_config': config_params(bee_config),
+            'hive_config': config_params(hive_config),
+            'resource_config': config_params(resource_config),
+            'layout': layout,
+            'n_steps': n_steps,
+            'seed': seed,
+            'options': options,
+            'code_version': code_version()
+        }
+        encoded = json.dumps(canonical(description), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.npz')
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def get(self, key: str):
+        """Time series of a cached run by name, or None if the run is not cached."""
+        if key not in self:
+            return None
+
+        with np.load(self.path(key)) as data:
+            return {name: data[name] for name in data.files}
+
+    def put(self, key: str, **series):
+        """Stores the time series of a run. Writes go to a temporary file first, so an interrupted write leaves no entry."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                np.savez_compressed(file, **series)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def run(self, key: str, simulate, names=None):
+        """Looks a run up in the cache, running `simulate` and storing its time series only if it is not cached yet.
+
+        Args:
+            key (str): key of the run, see `key`
+            simulate (Callable[[], Dict[str, np.ndarray]]): runs the model and returns its time series by name
+            names (Iterable[str], optional): names of the needed time series. If a cached run lacks any of them, it
+                is run again and the time series are added to its entry. Defaults to None, any cached time series.
+
+        Returns:
+            Dict[str, np.ndarray]: time series of the run by name
+        """
+        series = self.get(key)
+        if series is None or (names is not None and not set(names) <= set(series)):
+            series = {**(series or {}), **simulate()}
+            self.put(key, **series)
+        return series
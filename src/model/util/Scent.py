@@ -0,0 +1,419 @@
+import numpy as np
+
+from .ScentMode import ScentMode
+from ..config.ResourceConfig import ResourceConfig as RC
+
+def resource_arrays(resources):
+    """Collects positions and quantities of Resource agents into arrays.
+
+    Args:
+        resources (Iterable[Resource]): resources to collect
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (m, 2) array of positions and (m,) array of quantities
+    """
+    resources = list(resources)
+    res_positions = np.array([res.pos for res in resources], dtype=float).reshape(-1, 2)
+    res_quantities = np.array([res.quantity for res in resources], dtype=float)
+    return res_positions, res_quantities
+
+def scent_strength(positions, res_positions, res_quantities, epsilon=1e-24, chunk_size=2**20):
+    """Calculates scent (attraction) of all resources at many positions at once, as one positions x resources computation.
+
+    Args:
+        positions (np.ndarray): (n, 2) array of positions at which attraction is calculated
+        res_positions (np.ndarray): (m, 2) array of resource positions
+        res_quantities (np.ndarray): (m,) array of resource quantities
+        epsilon (float, optional): small number to handle edge cases. Defaults to 1e-24.
+        chunk_size (int, optional): maximum number of position-resource pairs evaluated at once. Defaults to 2**20.
+
+    Returns:
+        np.ndarray: (n,) array of scent strength at each of the given positions
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+    scent = np.empty(len(positions))
+
+    # Positions are processed in chunks to bound the memory of the positions x resources arrays
+    chunk = max(1, chunk_size // max(1, len(res_positions)))
+    for start in range(0, len(positions), chunk):
+        # Scent is dependent on resource quantity and squared distance to that resource
+        deltas = positions[start:start + chunk, None, :] - res_positions[None, :, :]
+        dist_squared = np.einsum('ijk,ijk->ij', deltas, deltas) + epsilon
+        scent[start:start + chunk] = (res_quantities / dist_squared).sum(axis=1)
+
+    return scent
+
+def exploration_moves(model, positions, epsilon=1e-12):
+    """Proposes a random step for each exploring bee of a model and accepts it with the Metropolis rule on its scent landscape.
+
+    Args:
+        model (ForagerModel): model the bees belong to
+        positions (np.ndarray): (n, 2) array of current positions of exploring bees
+        epsilon (float, optional): margin keeping new positions within the space. Defaults to 1e-12.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n, 2) array of proposed positions and (n,) boolean mask of accepted moves
+    """
+    return metropolis_moves(model.rng, model.bee_config.SPEED_FORAGING, model.size, model.scent.at, positions, epsilon)
+
+def metropolis_moves(rng, speed, size, scent, positions, epsilon=1e-12):
+    """Proposes a random step for each exploring bee and accepts it with the Metropolis rule on a scent landscape.
+
+    Args:
+        rng (RandomService): random stream of the bees
+        speed (float): length of the proposed steps
+        size (float): side length of the square space
+        scent (Callable[[np.ndarray], np.ndarray]): scent strength at (n, 2) positions
+        positions (np.ndarray): (n, 2) array of current positions of exploring bees
+        epsilon (float, optional): margin keeping new positions within the space. Defaults to 1e-12.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n, 2) array of proposed positions and (n,) boolean mask of accepted moves
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+
+    # Choose a random point with radius equivalent to speed times time step, taking the boundaries into account
+    angle = rng.uniform(0, 2 * np.pi, size=len(positions))
+    new_positions = np.empty_like(positions)
+    new_positions[:, 0] = np.clip(positions[:, 0] + speed * np.cos(angle), 0, size - epsilon)
+    new_positions[:, 1] = np.clip(positions[:, 1] + speed * np.sin(angle), 0, size - epsilon)
+
+    # Attraction level at current and new positions, scored in one batch
+    attraction = scent(np.concatenate((positions, new_positions)))
+    attraction_current, attraction_new = attraction[:len(positions)], attraction[len(positions):]
+
+    # Metropolis algorithm, if all resources depleted just move
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = attraction_new / (attraction_current * 10)
+    accept = (attraction_current == 0) | (attraction_new > attraction_current) | (rng.random(len(positions)) < ratio)
+
+    return new_positions, accept
+
+def create_scent(model_config):
+    """Creates the scent landscape selected by `ModelConfig.SCENT_MODE`."""
+    if model_config.SCENT_MODE == ScentMode.RASTER:
+        return RasterScent(model_config.SIZE, model_config.SCENT_RESOLUTION, model_config.SCENT_TOLERANCE)
+    elif model_config.SCENT_MODE == ScentMode.QUADTREE:
+        return QuadtreeScent(model_config.SCENT_THETA)
+    return ExactScent()
+
+class ExactScent:
+    """
+    Exact scent landscape, summing the inverse-square scent of every resource at each query.
+
+    Keeps positions and quantities of all resources in arrays, updated as resources are added or extracted.
+    """
+
+    def __init__(self, epsilon=1e-24):
+        # Small number to handle edge cases in the inverse-square scent
+        self.epsilon = epsilon
+
+        # Resources in the order they were added, with their index in the arrays below
+        self.resources = []
+        self._index = {}
+
+        # Positions and last known quantities of resources, grown geometrically
+        self._positions = np.empty((16, 2))
+        self._quantities = np.empty(16)
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[:len(self.resources)]
+
+    @property
+    def quantities(self) -> np.ndarray:
+        return self._quantities[:len(self.resources)]
+
+    def add_resource(self, resource):
+        """Registers a placed Resource agent in the landscape."""
+        i = len(self.resources)
+        if i == len(self._quantities):
+            self._positions = np.concatenate((self._positions, np.empty_like(self._positions)))
+            self._quantities = np.concatenate((self._quantities, np.empty_like(self._quantities)))
+
+        self._index[resource] = i
+        self.resources.append(resource)
+        self._positions[i] = resource.pos
+        self._quantities[i] = resource.quantity
+
+    def update_resource(self, resource):
+        """Updates the landscape after the quantity of a registered resource changed."""
+        self._quantities[self._index[resource]] = resource.quantity
+
+    def exact_at(self, positions) -> np.ndarray:
+        """Exact scent strength at the given (n, 2) positions."""
+        return scent_strength(positions, self.positions, self.quantities, self.epsilon)
+
+    def at(self, positions) -> np.ndarray:
+        """Scent strength at the given (n, 2) positions."""
+        return self.exact_at(positions)
+
+class RasterScent(ExactScent):
+    """
+    Scent landscape precomputed on a regular grid over the space and looked up with interpolation.
+
+    The raster is the sum of the contribution of each resource, so when the quantity of a single resource
+    changes only that resource's contribution is subtracted or re-added. Lookups interpolate the logarithm
+    of the scent bilinearly, which follows its inverse-square falloff closely, making query cost independent
+    of the number of resources. The relative error is checked against the exact scent outside the resources
+    whenever resources are added or depleted.
+
+    Scent within a resource is irrelevant, as bees there extract it, so contributions are capped at nodes closer
+    than one cell diagonal inside the resource. Uncapped, a node at a resource would hold a near-infinite value,
+    which breaks the interpolation around it and cancels out catastrophically when the resource is depleted.
+    Interpolation at positions outside resources only uses uncapped nodes.
+    """
+
+    def __init__(self, size, resolution=0.5, tolerance=0.01, epsilon=1e-24, n_samples=256):
+        super().__init__(epsilon)
+
+        # Maximum relative error against the exact scent, verified on `n_samples` random positions outside resources
+        self.tolerance = tolerance
+        self.n_samples = n_samples
+
+        # Grid nodes covering the [0, size] x [0, size] space with the given spacing
+        self.n_nodes = int(np.ceil(size / resolution)) + 1
+        self.resolution = size / (self.n_nodes - 1)
+        self.size = size
+        self._nodes = np.arange(self.n_nodes) * self.resolution
+
+        # Squared distance below which the contribution of a resource is capped, at least half a cell
+        self.cap_squared = max(RC.RADIUS - np.sqrt(2) * self.resolution, self.resolution / 2)**2
+
+        # Scent at each grid node, indexed as [x, y]
+        self.field = np.zeros((self.n_nodes, self.n_nodes))
+
+        # Whether the raster was verified since the last resource was added or depleted, and the last error found
+        self._verified = True
+        self.max_error = 0.0
+
+    def _add_contribution(self, pos, quantity):
+        """Adds the scent of `quantity` at `pos` to each grid node, capped close to the resource, in place."""
+        dist_squared = (self._nodes - pos[0])[:, None]**2 + (self._nodes - pos[1])[None, :]**2
+        np.maximum(dist_squared, self.cap_squared, out=dist_squared)
+        np.divide(quantity, dist_squared, out=dist_squared)
+        self.field += dist_squared
+
+    def add_resource(self, resource):
+        super().add_resource(resource)
+        self._add_contribution(resource.pos, resource.quantity)
+        self._verified = False
+
+    def update_resource(self, resource):
+        i = self._index[resource]
+        delta = resource.quantity - self._quantities[i]
+        if delta != 0:
+            self._add_contribution(self._positions[i], delta)
+            self._quantities[i] = resource.quantity
+
+            # Depletion removes the whole contribution of the resource, the largest change of the field's shape
+            if resource.quantity == 0:
+                self._verified = False
+
+    def at(self, positions) -> np.ndarray:
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+
+        # All resources depleted, there is no scent left
+        if not self.quantities.any():
+            return np.zeros(len(positions))
+
+        if not self._verified:
+            self.verify()
+
+        return self.interpolate(positions)
+
+    def interpolate(self, positions) -> np.ndarray:
+        """Bilinear interpolation of the logarithm of the raster at the given (n, 2) positions."""
+        cell = np.clip(positions / self.resolution, 0, self.n_nodes - 1)
+        i = np.minimum(cell[:, 0].astype(np.int64), self.n_nodes - 2)
+        j = np.minimum(cell[:, 1].astype(np.int64), self.n_nodes - 2)
+        fx = (cell[:, 0] - i)
+        fy = (cell[:, 1] - j)
+
+        # Roundoff of incremental updates may leave tiny negative values where scent vanished
+        log_field = [np.log(np.maximum(self.field[i + dx, j + dy], np.finfo(float).tiny)) for dx in (0, 1) for dy in (0, 1)]
+
+        log_scent = ((1 - fx) * (1 - fy) * log_field[0] + (1 - fx) * fy * log_field[1]
+                     + fx * (1 - fy) * log_field[2] + fx * fy * log_field[3])
+        return np.exp(log_scent)
+
+    def verify(self) -> float:
+        """Checks the raster against the exact scent on random positions outside resources.
+
+        Returns:
+            float: maximum relative error found
+        """
+        # Sampling uses its own generator so that verification does not disturb the model's random stream
+        rng = np.random.default_rng(len(self.resources))
+        samples = rng.uniform(0, self.size, size=(self.n_samples, 2))
+
+        # Scent within a resource is irrelevant, bees there extract the resource
+        deltas = samples[:, None, :] - self.positions[None, :, :]
+        outside = (np.einsum('ijk,ijk->ij', deltas, deltas) > RC.RADIUS**2).all(axis=1)
+        samples = samples[outside]
+
+        exact = self.exact_at(samples)
+        relevant = exact > 0
+        error = np.abs(self.interpolate(samples[relevant]) - exact[relevant]) / exact[relevant]
+        max_error = float(error.max()) if len(error) else 0.0
+
+        assert max_error <= self.tolerance, f"Scent raster error {max_error:.3g} exceeds tolerance {self.tolerance}, decrease SCENT_RESOLUTION"
+        self._verified = True
+        self.max_error = max_error
+
+        return max_error
+
+class QuadtreeScent(ExactScent):
+    """
+    Barnes-Hut approximation of the scent landscape for landscapes with many resources.
+
+    Resources are organised in a quadtree whose nodes aggregate the total quantity and the quantity-weighted
+    centroid of the resources below them. Queries descend the tree for all positions at once and use the
+    aggregate of a node whenever its side length is smaller than `theta` times the distance to its centroid,
+    summing resources exactly only in nearby leaves. This brings the cost of a query down to about O(log m).
+    Changes of a resource quantity update only the aggregates on the path from its leaf to the root.
+    """
+
+    def __init__(self, theta=0.5, leaf_size=8, epsilon=1e-24):
+        super().__init__(epsilon)
+
+        # Accuracy parameter, smaller values open more nodes and approach the exact scent
+        self.theta = theta
+
+        # Maximum number of resources in a leaf node
+        self.leaf_size = leaf_size
+
+        # The tree is (re)built lazily at the first query after resources were added
+        self._built = False
+
+    def add_resource(self, resource):
+        super().add_resource(resource)
+        self._built = False
+
+    def update_resource(self, resource):
+        super().update_resource(resource)
+        if not self._built:
+            return
+
+        # Refresh aggregates from the resource's leaf up to the root, recomputing from children to avoid drift
+        node = self._leaf_of[self._index[resource]]
+        self._aggregate_leaf(node)
+        node = self._parent[node]
+        while node >= 0:
+            children = self._children[node][self._children[node] >= 0]
+            self._quantity[node] = self._quantity[children].sum()
+            self._moment[node] = self._moment[children].sum(axis=0)
+            node = self._parent[node]
+
+    def _aggregate_leaf(self, node):
+        members = self._order[self._start[node]:self._end[node]]
+        quantities = self.quantities[members]
+        self._quantity[node] = quantities.sum()
+        self._moment[node] = quantities @ self.positions[members]
+
+    def build(self):
+        """Builds the quadtree over the current resources and computes the aggregates of all nodes."""
+        positions = self.positions
+        low, high = positions.min(axis=0), positions.max(axis=0)
+
+        centers, half_sizes, parents, children, starts, ends = [], [], [], [], [], []
+        order = []
+
+        # Nodes are created in depth-first order, so every parent precedes its children
+        stack = [(np.arange(len(positions)), (low + high) / 2, max((high - low).max() / 2, 1e-9), -1, 0)]
+        while stack:
+            members, center, half_size, parent, quadrant = stack.pop()
+
+            node = len(centers)
+            centers.append(center)
+            half_sizes.append(half_size)
+            parents.append(parent)
+            children.append([-1, -1, -1, -1])
+            if parent >= 0:
+                children[parent][quadrant] = node
+
+            # Small groups of resources, or resources at a single point, make a leaf
+            if len(members) <= self.leaf_size or half_size < 1e-9:
+                starts.append(len(order))
+                order.extend(members)
+                ends.append(len(order))
+                continue
+
+            starts.append(-1)
+            ends.append(-1)
+            quadrants = (positions[members, 0] >= center[0]) + 2 * (positions[members, 1] >= center[1])
+            for q in range(4):
+                sub = members[quadrants == q]
+                if len(sub):
+                    offset = np.array((1 if q & 1 else -1, 1 if q & 2 else -1)) * half_size / 2
+                    stack.append((sub, center + offset, half_size / 2, node, q))
+
+        self._half_size = np.array(half_sizes)
+        self._parent = np.array(parents, dtype=np.int64)
+        self._children = np.array(children, dtype=np.int64)
+        self._start = np.array(starts, dtype=np.int64)
+        self._end = np.array(ends, dtype=np.int64)
+        self._order = np.array(order, dtype=np.int64)
+        self._is_leaf = self._start >= 0
+
+        self._leaf_of = np.empty(len(positions), dtype=np.int64)
+        for node in np.flatnonzero(self._is_leaf):
+            self._leaf_of[self._order[self._start[node]:self._end[node]]] = node
+
+        # Total quantity and quantity-weighted position sum of each node, aggregated bottom-up
+        self._quantity = np.zeros(len(centers))
+        self._moment = np.zeros((len(centers), 2))
+        for node in range(len(centers) - 1, -1, -1):
+            if self._is_leaf[node]:
+                self._aggregate_leaf(node)
+            else:
+                node_children = self._children[node][self._children[node] >= 0]
+                self._quantity[node] = self._quantity[node_children].sum()
+                self._moment[node] = self._moment[node_children].sum(axis=0)
+
+        self._built = True
+
+    def at(self, positions) -> np.ndarray:
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        scent = np.zeros(len(positions))
+        if len(self.resources) == 0:
+            return scent
+
+        if not self._built:
+            self.build()
+
+        # Frontier of (position, node) pairs still to be evaluated, starting at the root
+        queries = np.arange(len(positions))
+        nodes = np.zeros(len(positions), dtype=np.int64)
+        while len(queries):
+            # Depleted branches carry no scent
+            quantity = self._quantity[nodes]
+            live = quantity > 0
+            queries, nodes, quantity = queries[live], nodes[live], quantity[live]
+
+            centroids = self._moment[nodes] / quantity[:, None]
+            deltas = positions[queries] - centroids
+            dist_squared = np.einsum('ij,ij->i', deltas, deltas)
+
+            # Nodes small enough as seen from the position are replaced by their aggregate
+            far = (2 * self._half_size[nodes])**2 < self.theta**2 * dist_squared
+            scent += np.bincount(queries[far], quantity[far] / (dist_squared[far] + self.epsilon), minlength=len(positions))
+
+            # Nearby leaves are summed exactly
+            near_leaf = ~far & self._is_leaf[nodes]
+            leaf_queries, leaves = queries[near_leaf], nodes[near_leaf]
+            counts = self._end[leaves] - self._start[leaves]
+            pair_queries = np.repeat(leaf_queries, counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            members = self._order[np.repeat(self._start[leaves], counts) + offsets]
+            deltas = positions[pair_queries] - self.positions[members]
+            contributions = self.quantities[members] / (np.einsum('ij,ij->i', deltas, deltas) + self.epsilon)
+            scent += np.bincount(pair_queries, contributions, minlength=len(positions))
+
+            # Nearby internal nodes are opened into their children
+            opened = ~far & ~self._is_leaf[nodes]
+            children = self._children[nodes[opened]]
+            queries = np.repeat(queries[opened], 4)[children.ravel() >= 0]
+            nodes = children.ravel()[children.ravel() >= 0]
+
+        return scent
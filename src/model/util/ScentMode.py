@@ -0,0 +1,6 @@
+from enum import Enum
+
+class ScentMode(Enum):
+    EXACT = "exact"
+    RASTER = "raster"
+    QUADTREE = "quadtree"
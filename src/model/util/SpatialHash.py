@@ -0,0 +1,149 @@
+import math
+import numpy as np
+
+class SpatialHash:
+    """
+    Uniform-grid index of agents, updated incrementally as agents move.
+
+    Agents are bucketed in square cells of side `cell_size`, so a neighbor query with a radius up to the cell size
+    only inspects the 3x3 block of cells around the query position instead of all agents in the space.
+    Cells keep insertion order, so query results are deterministic.
+    """
+
+    def __init__(self, cell_size: float):
+        # Side length of the square cells, queries are cheapest for radii up to this length
+        self.cell_size = cell_size
+
+        # Agents in each non-empty cell, and the cell each agent is currently in
+        self._cells = {}
+        self._cell_of = {}
+
+    def _cell(self, pos):
+        return (math.floor(pos[0] / self.cell_size), math.floor(pos[1] / self.cell_size))
+
+    def insert(self, agent):
+        """Adds a placed agent to the index."""
+        cell = self._cell(agent.pos)
+        self._cells.setdefault(cell, {})[agent] = None
+        self._cell_of[agent] = cell
+
+    def remove(self, agent):
+        """Removes an agent from the index."""
+        cell = self._cell_of.pop(agent)
+        members = self._cells[cell]
+        del members[agent]
+        if not members:
+            del self._cells[cell]
+
+    def move(self, agent):
+        """Updates the index after the agent moved, touching the cells only if it crossed a cell border."""
+        if self._cell(agent.pos) != self._cell_of[agent]:
+            self.remove(agent)
+            self.insert(agent)
+
+    def neighbors(self, pos, radius, include_center=False):
+        """Finds all indexed agents within `radius` of a position.
+
+        Args:
+            pos (Tuple[float, float]): center of the search
+            radius (float): search radius
+            include_center (bool, optional): whether to include agents at the exact position, as in
+                `ContinuousSpace.get_neighbors`. Defaults to False.
+
+        Returns:
+            List[Agent]: agents within the radius
+        """
+        x, y = pos
+        cx, cy = self._cell(pos)
+        reach = max(1, math.ceil(radius / self.cell_size))
+        radius_squared = radius * radius
+
+        neighbors = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for agent in self._cells.get((i, j), ()):
+                    dx = agent.pos[0] - x
+                    dy = agent.pos[1] - y
+                    dist_squared = dx * dx + dy * dy
+                    if dist_squared <= radius_squared and (include_center or dist_squared > 0):
+                        neighbors.append(agent)
+
+        return neighbors
+
+class CellList:
+    """
+    Uniform-grid cell list over an array of positions, built once and queried in batch.
+
+    Positions are sorted by cell, so all pairs within a radius up to the cell size are found by matching each
+    source against the 3x3 block of cells around it, with cost linear in the number of pairs found. Positions may
+    be split into groups, e.g. the replicas of an ensemble sharing one space, whose members are never paired with
+    members of other groups.
+    """
+
+    def __init__(self, positions: np.ndarray, cell_size: float, groups=None):
+        # Snapshot of the indexed positions
+        self.positions = np.array(positions, dtype=float)
+        self.cell_size = cell_size
+
+        # Group of each position, each group having its own range of cell keys
+        self._groups = None if groups is None else np.asarray(groups, dtype=np.int64)
+
+        # Integer cell coordinates, offset so that neighboring cells of any position are non-negative
+        cells = np.floor(positions / cell_size).astype(np.int64)
+        self._origin = cells.min(axis=0) - 1 if len(cells) else np.zeros(2, dtype=np.int64)
+        self._stride = int(cells[:, 1].max() - self._origin[1] + 2) if len(cells) else 1
+        self._group_stride = int(cells[:, 0].max() - self._origin[0] + 2) * self._stride if len(cells) else 1
+        self._cells = cells
+        keys = self._keys(cells, self._groups)
+
+        # Positions sorted by cell key, with the first slot and size of each non-empty cell
+        self._order = np.argsort(keys, kind='stable')
+        self._keys_present, self._starts, self._counts = np.unique(keys[self._order], return_index=True, return_counts=True)
+
+    def _keys(self, cells, groups=None):
+        keys = (cells[:, 0] - self._origin[0]) * self._stride + (cells[:, 1] - self._origin[1])
+        return keys if groups is None else keys + groups * self._group_stride
+
+    def pairs_within(self, sources: np.ndarray, radius: float):
+        """Finds all (source, neighbor) pairs of the same group within `radius`, excluding positions at the exact same point.
+
+        Args:
+            sources (np.ndarray): indices of positions to search around
+            radius (float): search radius, at most the cell size
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: indices of sources and of their neighbors, grouped by source in order of `sources`
+        """
+        assert radius <= self.cell_size, "Search radius should not exceed the cell size."
+
+        empty = np.empty(0, dtype=np.int64)
+        if len(sources) == 0 or len(self._keys_present) == 0:
+            return empty, empty
+
+        pair_sources, pair_neighbors = [empty], [empty]
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keys = self._keys(self._cells[sources] + np.array((dx, dy)), None if self._groups is None else self._groups[sources])
+                slot = np.minimum(np.searchsorted(self._keys_present, keys), len(self._keys_present) - 1)
+                found = np.flatnonzero(self._keys_present[slot] == keys)
+
+                # Expand each source into one pair per position in the matching cell
+                counts = self._counts[slot[found]]
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                pair_sources.append(np.repeat(sources[found], counts))
+                pair_neighbors.append(self._order[np.repeat(self._starts[slot[found]], counts) + offsets])
+
+        pair_sources = np.concatenate(pair_sources)
+        pair_neighbors = np.concatenate(pair_neighbors)
+
+        # Keep pairs within the radius, skipping positions at the exact same point as `get_neighbors` does
+        deltas = self.positions[pair_neighbors] - self.positions[pair_sources]
+        dist_squared = np.einsum('ij,ij->i', deltas, deltas)
+        keep = (dist_squared <= radius**2) & (dist_squared > 0)
+        pair_sources, pair_neighbors = pair_sources[keep], pair_neighbors[keep]
+
+        # Group pairs by source in the order sources were given, neighbors in index order within a source
+        rank = np.empty(len(self.positions), dtype=np.int64)
+        rank[sources] = np.arange(len(sources))
+        grouping = np.lexsort((pair_neighbors, rank[pair_sources]))
+        return pair_sources[grouping], pair_neighbors[grouping]
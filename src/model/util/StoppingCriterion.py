@@ -0,0 +1,6 @@
+from enum import Enum
+
+class StoppingCriterion(Enum):
+    EXTINCTION = "extinction"
+    DEPLETION = "depletion"
+    STEADY_STATE = "steady_state"
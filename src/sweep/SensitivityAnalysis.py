@@ -0,0 +1,114 @@
+import os
+import numpy as np
+from SALib.sample import sobol as sobol_sample, morris as morris_sample
+from SALib.analyze import sobol as sobol_analyze, morris as morris_analyze
+
+from .Sweep import Sweep
+from .SensitivityMethod import SensitivityMethod
+
+def problem(bounds, params) -> dict:
+    """SALib problem of the given parameters, over their `<PARAM>_MIN` and `<PARAM>_MAX` bounds."""
+    return {
+        'num_vars': len(params),
+        'names': list(params),
+        'bounds': [[getattr(bounds, f'{param}_MIN'), getattr(bounds, f'{param}_MAX')] for param in params]
+    }
+
+def integer_values(values, low, high) -> np.ndarray:
+    """Integers from `low` to `high` for values over [low, high], each integer taking an equal share of the range."""
+    unit = (np.asarray(values, dtype=float) - low) / (high - low)
+    return np.clip(np.floor(unit * (high - low + 1)) + low, low, high)
+
+class SensitivityAnalysis:
+    """
+    Global sensitivity analysis of the final model outputs over the bounds of `SensitivityAnalysisConfig`.
+
+    The design of the chosen method, Saltelli's sampling of Sobol indices or Morris trajectories, is run as a design
+    `Sweep`, so it goes through the parallel sweep runner and the run cache, and only the final step of each run is
+    collected. Each sample is run `n_repeats` times with common random numbers and its outputs are averaged over the
+    repeats before computing the indices, with bootstrap confidence intervals over the samples. Given a
+    `target_precision`, the repeats of each sample are adaptive, see `Sweep`.
+    """
+
+    def __init__(self, name: str, bounds, params, integer_params=(), method=SensitivityMethod.SOBOL, n_base=128,
+                 n_repeats=4, n_steps=1000, outputs=('bee_count', 'nectar', 'foragers'), n_resamples=1000,
+                 conf_level=0.95, seed=0, directory=None, **sweep_kwargs):
+        """
+        Args:
+            name (str): name of the analysis
+            bounds (type): bounds of the parameters, e.g. `SensitivityAnalysisConfig.BeeParamBounds`
+            params (List[str]): analysed parameters, named as in the configs
+            integer_params (Iterable[str], optional): parameters taking integer values, each integer within their
+                bounds equally likely, see `integer_values`. Defaults to none.
+            method (SensitivityMethod, optional): sampling and analysis method. Defaults to SensitivityMethod.SOBOL.
+            n_base (int, optional): base number of samples, a power of two for Sobol, giving n_base * (n_params + 2)
+                samples, or the number of Morris trajectories, giving n_base * (n_params + 1) samples. Defaults to 128.
+            n_repeats (int, optional): number of runs of each sample. Defaults to 4.
+            n_steps (int, optional): number of steps of each run. Defaults to 1000.
+            outputs (Sequence[str], optional): analysed final outputs, see `REPORTERS`. Defaults to the colony size,
+                hive stock and forager ratio.
+            n_resamples (int, optional): number of bootstrap resamples of the confidence intervals. Defaults to 1000.
+            conf_level (float, optional): level of the confidence intervals. Defaults to 0.95.
+            seed (int, optional): seed of the design and of the bootstrap. Defaults to 0.
+            directory (str, optional): directory of the outputs and indices. Defaults to data/<name>.
+            **sweep_kwargs: any other argument of the sweep, e.g. fixed `params` or the `backend`
+        """
+        self.name = name
+        self.method = SensitivityMethod(method)
+        self.problem = problem(bounds, params)
+        self.n_resamples = n_resamples
+        self.conf_level = conf_level
+        self.seed = seed
+
+        # Design as sampled by SALib over the bounds
+        if self.method == SensitivityMethod.SOBOL:
+            assert n_base & (n_base - 1) == 0, "Sobol sequences are balanced for a power of two base samples."
+            self.samples = sobol_sample.sample(self.problem, n_base, calc_second_order=False, seed=seed)
+        else:
+            self.samples = morris_sample.sample(self.problem, n_base, seed=seed)
+
+        # Design as run, with the integer parameters rounded, from which the Morris elementary effects are computed
+        self.design = self.samples.copy()
+        for i, param in enumerate(params):
+            if param in integer_params:
+                self.design[:, i] = integer_values(self.samples[:, i], *self.problem['bounds'][i])
+
+        axes = {param: self.design[:, i].astype(int) if param in integer_params else self.design[:, i]
+                for i, param in enumerate(params)}
+        self.sweep = Sweep(name, axes=axes, n_repeats=n_repeats, n_steps=n_steps, outputs=outputs, design=True,
+                           final_only=True, directory=directory, **sweep_kwargs)
+
+    def path(self, output: str) -> str:
+        return os.path.join(self.sweep.directory, f'{output}_indices.npz')
+
+    def analyze(self, sink):
+        """Sensitivity indices of each output, from the completed runs of the design.
+
+        Args:
+            sink (ResultSink): outputs of the design sweep
+
+        Returns:
+            Dict[str, Dict[str, np.ndarray]]: by output, the SALib indices of each parameter and their confidence
+                intervals, 'S1', 'S1_conf', 'ST' and 'ST_conf' for Sobol, 'mu', 'mu_star', 'sigma' and 'mu_star_conf'
+                for Morris
+        """
+        assert self.sweep.is_done(sink), "All runs of the design should be completed."
+
+        # Outputs of each sample are averaged over its completed runs, all of them unless the design is adaptive
+        completed = sink.load(sink.COMPLETED)
+        indices = {}
+        for output in self.sweep.outputs:
+            y = np.where(completed, sink.load(output)[..., -1], 0).sum(axis=-1) / completed.sum(axis=-1)
+            if self.method == SensitivityMethod.SOBOL:
+                result = sobol_analyze.analyze(self.problem, y, calc_second_order=False, num_resamples=self.n_resamples,
+                                               conf_level=self.conf_level, seed=self.seed)
+            else:
+                result = morris_analyze.analyze(self.problem, self.design, y, num_resamples=self.n_resamples,
+                                                conf_level=self.conf_level, seed=self.seed)
+            indices[output] = {key: np.asarray(value) for key, value in result.items() if key != 'names'}
+        return indices
+
+    def save(self, indices):
+        """Saves the indices of each output as `<directory>/<output>_indices.npz`, with the parameter names."""
+        for output, result in indices.items():
+            np.savez(self.path(output), names=np.array(self.problem['names']), **result)
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class SensitivityMethod(Enum):
+    SOBOL = "sobol"
+    MORRIS = "morris"
@@ -0,0 +1,203 @@
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+from scipy.optimize import minimize
+
+from .Sweep import SUMMARIES
+from .SensitivityAnalysis import integer_values
+
+class Surrogate:
+    """
+    Gaussian-process emulator of the expected summary of an output over model parameters, fitted on stored sweeps.
+
+    Each cell of a sweep with completed runs is one observation: its parameter values, the mean of the summary over
+    its runs and the variance of that mean, which is the known noise of the observation. Parameters are scaled to
+    the unit cube over the given bounds and the summary is standardized. The kernel is a squared exponential with
+    one length scale per parameter, whose hyperparameters maximize the marginal likelihood. Predictions take a few
+    milliseconds, and `propose` picks the configurations the emulator is least certain about to simulate next.
+    """
+
+    def __init__(self, bounds, integer_params=(), n_restarts=4, seed=0):
+        """
+        Args:
+            bounds (Dict[str, Tuple[float, float]]): lower and upper bound of each input parameter, named as in the
+                configs
+            integer_params (Iterable[str], optional): parameters taking integer values, proposed as integers within
+                their bounds. Defaults to none.
+            n_restarts (int, optional): number of random restarts of the hyperparameter optimization. Defaults to 4.
+            seed (int, optional): seed of the restarts and of the candidates of `propose`. Defaults to 0.
+        """
+        self.params = list(bounds)
+        self.lower = np.array([bounds[param][0] for param in self.params], dtype=float)
+        self.upper = np.array([bounds[param][1] for param in self.params], dtype=float)
+        self.integer_params = [param for param in self.params if param in integer_params]
+        self.n_restarts = n_restarts
+        self.rng = np.random.default_rng(seed)
+
+    # ---| Training data |---
+
+    @staticmethod
+    def observations(sweeps, sinks, params, output: str, summary='final'):
+        """Observations of the summary of an output in all cells of the given sweeps with completed runs.
+
+        Parameters a sweep does not set take their values from its configs, so that sweeps over different axes
+        share one parameter space, e.g. the weather sweep at the default resource distance.
+
+        Args:
+            sweeps (List[Sweep]): full-factorial or design sweeps
+            sinks (List[ResultSink]): output files of each sweep
+            params (List[str]): input parameters
+            output (str): output, see `REPORTERS`
+            summary (str, optional): summary of the output, see `SUMMARIES`. Defaults to 'final'.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: parameter values, mean summaries, variances of
+                the sample of summaries and numbers of runs, one row per cell
+        """
+        x, means, variances, counts = [], [], [], []
+        for sweep, sink in zip(sweeps, sinks):
+            assert not sweep.one_at_a_time, "One-at-a-time sweeps are not supported."
+            completed = np.asarray(sink.load(sink.COMPLETED))
+            values = SUMMARIES[summary](sink.load(output))
+
+            for cell in np.ndindex(completed.shape[:-1]):
+                runs = values[cell][completed[cell]]
+                if len(runs) == 0:
+                    continue
+
+                cell_params = sweep.params(cell + (0,))
+                configs = sweep.configs(cell_params)[:-1]
+                x.append([cell_params[param] if param in cell_params else
+                          next(getattr(config, param) for config in configs if hasattr(config, param))
+                          for param in params])
+                means.append(runs.mean())
+                variances.append(runs.var(ddof=1) if len(runs) > 1 else np.nan)
+                counts.append(len(runs))
+
+        return np.array(x, dtype=float), np.array(means), np.array(variances), np.array(counts)
+
+    @classmethod
+    def from_sweeps(cls, sweeps, sinks, bounds, output: str, summary='final', **kwargs):
+        """Surrogate fitted on the cells of the given sweeps, see `observations`."""
+        surrogate = cls(bounds, **kwargs)
+        x, means, variances, counts = cls.observations(sweeps, sinks, surrogate.params, output, summary)
+        surrogate.fit(x, means, variances, counts)
+        return surrogate
+
+    # ---| Fit |---
+
+    def scale(self, x) -> np.ndarray:
+        return (np.asarray(x, dtype=float) - self.lower) / (self.upper - self.lower)
+
+    def kernel(self, a, b) -> np.ndarray:
+        distances = ((a[:, None, :] - b[None, :, :]) / self.length_scales) ** 2
+        return self.signal_variance * np.exp(-0.5 * distances.sum(axis=-1))
+
+    def fit(self, x, means, variances, counts):
+        """Fits the emulator on observed cells.
+
+        Args:
+            x (np.ndarray): (n_cells, n_params) parameter values
+            means (np.ndarray): mean summary of each cell
+            variances (np.ndarray): variance of the summary over the runs of each cell, nan for single runs, which
+                take the median variance of the others
+            counts (np.ndarray): number of runs of each cell
+        """
+        assert len(means) >= 2, "At least two observed cells are needed."
+
+        variances = np.where(np.isnan(variances), np.nanmedian(variances) if np.isfinite(variances).any() else 0, variances)
+        self.y_mean, self.y_std = means.mean(), means.std() or 1.0
+        self.x = self.scale(x)
+        self.y = (means - self.y_mean) / self.y_std
+
+        # Noise of each observation is the variance of its mean
+        self.noise = variances / counts / self.y_std ** 2
+
+        # Log length scales, signal variance and nugget, from the default and random starts
+        n_params = len(self.params)
+        starts = [np.r_[np.log(np.full(n_params, 0.5)), 0.0, np.log(1e-4)]]
+        starts += [np.r_[self.rng.uniform(np.log(0.05), np.log(2.0), n_params), self.rng.uniform(-1, 1), self.rng.uniform(np.log(1e-6), np.log(1e-2))]
+                   for _ in range(self.n_restarts)]
+        box = [(np.log(0.01), np.log(10.0))] * n_params + [(np.log(1e-2), np.log(1e2)), (np.log(1e-8), np.log(1.0))]
+
+        best = min((minimize(self.negative_log_likelihood, start, method='L-BFGS-B', bounds=box) for start in starts),
+                   key=lambda result: result.fun)
+        self.set_hyperparameters(best.x)
+        return self
+
+    def set_hyperparameters(self, theta):
+        n_params = len(self.params)
+        self.length_scales = np.exp(theta[:n_params])
+        self.signal_variance = np.exp(theta[n_params])
+        self.nugget = np.exp(theta[n_params + 1])
+
+        covariance = self.kernel(self.x, self.x) + np.diag(self.noise + self.nugget + 1e-10)
+        self.factor = cho_factor(covariance, lower=True)
+        self.alpha = cho_solve(self.factor, self.y)
+
+    def negative_log_likelihood(self, theta) -> float:
+        try:
+            self.set_hyperparameters(theta)
+        except np.linalg.LinAlgError:
+            return np.inf
+        return 0.5 * self.y @ self.alpha + np.log(np.diag(self.factor[0])).sum()
+
+    # ---| Queries |---
+
+    def predict(self, x):
+        """Expected summary at the given parameter values and its standard deviation.
+
+        Args:
+            x (np.ndarray): (n, n_params) parameter values, or a dict of values of each parameter
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: mean and standard deviation of the expected summary at each point
+        """
+        if isinstance(x, dict):
+            x = np.column_stack([np.atleast_1d(x[param]) for param in self.params])
+        x = self.scale(np.atleast_2d(x))
+
+        cross = self.kernel(x, self.x)
+        mean = cross @ self.alpha
+        v = solve_triangular(self.factor[0], cross.T, lower=True)
+        variance = np.maximum(self.signal_variance - (v ** 2).sum(axis=0), 0)
+        return self.y_mean + self.y_std * mean, self.y_std * np.sqrt(variance)
+
+    def propose(self, n: int, n_candidates=4096):
+        """Configurations to simulate next, where the emulator is least certain.
+
+        Candidates are drawn uniformly within the bounds, with integer parameters rounded so that each integer is
+        equally likely, and picked one at a time by largest predictive variance, each pick conditioning the variance
+        of the next ones, which does not depend on their outcome.
+
+        Args:
+            n (int): number of proposed configurations
+            n_candidates (int, optional): number of random candidates. Defaults to 4096.
+
+        Returns:
+            Dict[str, np.ndarray]: values of each parameter, the axes of a design `Sweep`
+        """
+        points = self.lower + self.rng.uniform(size=(n_candidates, len(self.params))) * (self.upper - self.lower)
+        for j, param in enumerate(self.params):
+            if param in self.integer_params:
+                points[:, j] = integer_values(points[:, j], self.lower[j], self.upper[j])
+        candidates = self.scale(points)
+
+        # Posterior covariance of the candidates with each other is only needed for the picked rows
+        v = solve_triangular(self.factor[0], self.kernel(candidates, self.x).T, lower=True)
+        variance = self.signal_variance - (v ** 2).sum(axis=0)
+        picked, basis = [], []
+        for _ in range(n):
+            i = int(np.argmax(variance))
+            picked.append(i)
+
+            # Conditioning on a noiseless pick at candidate i shrinks the variance of the others
+            covariance = self.kernel(candidates, candidates[i:i + 1])[:, 0] - v.T @ v[:, i]
+            for b in basis:
+                covariance -= b * b[i]
+            b = covariance / np.sqrt(max(covariance[i], 1e-12))
+            basis.append(b)
+            variance = variance - b ** 2
+            variance[picked] = -np.inf
+
+        return {param: points[picked, j].astype(int) if param in self.integer_params else points[picked, j]
+                for j, param in enumerate(self.params)}
@@ -0,0 +1,222 @@
+import os
+import numpy as np
+from scipy import stats
+
+from ..model.config.ModelConfig import ModelConfig
+from ..model.config.BeeSwarmConfig import BeeSwarmConfig
+from ..model.config.HiveConfig import HiveConfig
+from ..model.config.ResourceConfig import ResourceConfig
+from ..model.util.Backend import Backend
+
+# Config classes whose parameters can be swept, in the order they are passed to the model
+CONFIG_TYPES = [ModelConfig, BeeSwarmConfig, HiveConfig, ResourceConfig]
+
+# Time series recorded by the model's data collector, by output name
+REPORTERS = {
+    'bee_count': 'Bee count 🐝',
+    'storm': 'Storm ⛈️',
+    'resting': 'resting 💤',
+    'returning': 'returning 🔙',
+    'explorers': 'exploring 🗺️',
+    'carrying': 'carrying 🎒',
+    'dancing': 'dancing 🪩',
+    'recruited': 'following 🎯',
+    'perceived_nectar': 'Mean perceived nectar level',
+    'nectar': 'Hive stock 🍯',
+    'foragers': 'Foragers'
+}
+
+# Summaries of the time series of a run, over its last axis, by name
+SUMMARIES = {
+    'final': lambda series: series[..., -1],
+    'mean': lambda series: series.mean(axis=-1)
+}
+
+def default_layout(model_config):
+    """Default number of resources at the default distance from the hive, in random directions."""
+    return [('add_resource_in_distance', model_config.RESOURCE_DISTANCE_DEFAULT)] * model_config.N_RESOURCES_DEFAULT
+
+def clustered_layout(model_config, max_angle, distance, n_resources=6):
+    """Resources spread evenly over an angle range at a given distance from the hive."""
+    return [('add_n_resources_in_angle_range', distance, n_resources, max_angle)]
+
+class Sweep:
+    """
+    Declarative description of a parameter sweep: which parameters vary over which values, how many repeats and
+    steps each run takes, and which outputs are kept.
+
+    Swept parameters are named as in the configs, e.g. 'P_STORM' of `ModelConfig` or 'FOV' of `BeeSwarmConfig`,
+    and the parameters in lower case are passed to the layout function instead. By default the grid of runs is the
+    full factorial of all axes, of shape (len(values) for each axis) + (n_repeats,). One-at-a-time sweeps vary each
+    parameter separately with all others at their defaults, over a grid of shape (n_parameters, n_values, n_repeats).
+    Design sweeps run given samples of all parameters at once, e.g. a sensitivity analysis design, over a grid of
+    shape (n_samples, n_repeats).
+
+    Adaptive sweeps, given a `target_precision`, run the repeats of each cell in waves of `min_repeats` and stop
+    a cell once the confidence intervals of its summaries are tight enough, or once it ran `n_repeats` runs.
+    Repeats that were not run are left not completed in the output files.
+    """
+
+    # Confidence level of the intervals of adaptive sweeps
+    CONF_LEVEL = 0.95
+
+    def __init__(self, name: str, axes=None, params=None, n_repeats=32, n_steps=1000, layout=default_layout,
+                 outputs=('bee_count', 'nectar', 'recruited', 'explorers'), one_at_a_time=False, design=False, final_only=False,
+                 collect_every=1, target_precision=None, min_repeats=8, summaries=(('bee_count', 'final'), ('nectar', 'mean')),
+                 common_random_numbers=True, backend=Backend.AGENTS, directory=None):
+        """
+        Args:
+            name (str): name of the sweep
+            axes (Dict[str, Sequence], optional): values of each swept parameter. Defaults to None, a single cell.
+            params (Dict[str, Any], optional): values of parameters fixed for all runs. Defaults to None.
+            n_repeats (int, optional): number of runs of each cell, the maximum of adaptive sweeps. Defaults to 32.
+            n_steps (int, optional): number of steps of each run. Defaults to 1000.
+            layout (Callable, optional): resource layout of a run as `ModelBuilder` calls, given the model config
+                and the swept layout parameters. Defaults to `default_layout`.
+            outputs (Sequence[str], optional): kept outputs, see `REPORTERS`. Defaults to the experiment time series.
+            one_at_a_time (bool, optional): whether parameters vary one at a time. Defaults to False.
+            design (bool, optional): whether the i-th values of all axes make up the i-th sample. Defaults to False.
+            final_only (bool, optional): whether only the last value of each output is kept. Defaults to False.
+            collect_every (int, optional): number of steps between the kept values. Runs are simulated and cached
+                at every step whatever its value. Defaults to 1.
+            target_precision (float, optional): target half-width of the confidence intervals of the summaries,
+                relative to their mean. Defaults to None, all cells run `n_repeats` runs.
+            min_repeats (int, optional): number of runs of each cell before its precision is tested, and of each
+                further wave, for adaptive sweeps. Defaults to 8.
+            summaries (Sequence[Tuple[str, str]], optional): kept outputs and their summaries, see `SUMMARIES`,
+                whose precision is tested. Defaults to the final bee count and the mean hive stock.
+            common_random_numbers (bool, optional): whether cells share the seeds of their repeats. Defaults to True.
+            backend (Backend, optional): representation of the bees. Defaults to Backend.AGENTS.
+            directory (str, optional): directory of the output files. Defaults to data/<name>.
+        """
+        self.name = name
+        self.axes = {parameter: list(values) for parameter, values in (axes or {}).items()}
+        self.fixed_params = dict(params or {})
+        self.n_repeats = n_repeats
+        self.n_steps = n_steps
+        self.layout = layout
+        self.outputs = list(outputs)
+        self.one_at_a_time = one_at_a_time
+        self.design = design
+        self.final_only = final_only
+        self.collect_every = collect_every
+        self.target_precision = target_precision
+        self.min_repeats = min_repeats
+        self.summaries = list(summaries)
+        self.common_random_numbers = common_random_numbers
+        self.backend = Backend(backend)
+        self.directory = directory or os.path.join('data', name)
+
+        assert set(self.outputs) <= set(REPORTERS), f"Unknown outputs {set(self.outputs) - set(REPORTERS)}."
+        assert not (one_at_a_time and design), "A sweep is either one-at-a-time or a design."
+        if self.adaptive:
+            assert {output for output, _ in self.summaries} <= set(self.outputs), "Summaries should be of kept outputs."
+            assert all(summary in SUMMARIES for _, summary in self.summaries), f"Summaries should be among {list(SUMMARIES)}."
+        if one_at_a_time or design:
+            assert len({len(values) for values in self.axes.values()}) == 1, "One-at-a-time and design axes should have equally many values."
+
+    @property
+    def cells(self):
+        """Shape of the grid of runs, including the repeats axis."""
+        if self.one_at_a_time:
+            return (len(self.axes), len(next(iter(self.axes.values()))), self.n_repeats)
+        if self.design:
+            return (len(next(iter(self.axes.values()))), self.n_repeats)
+        return tuple(len(values) for values in self.axes.values()) + (self.n_repeats,)
+
+    @property
+    def adaptive(self) -> bool:
+        return self.target_precision is not None
+
+    @property
+    def definition(self) -> dict:
+        """What the outputs of the sweep hold beyond their shapes: the axes, the kept outputs and steps and the
+        seeding of the runs. Output files written by a sweep of another definition are reset when it is run."""
+        return {
+            'axes': self.axes,
+            'n_repeats': self.n_repeats,
+            'n_steps': self.n_steps,
+            'outputs': self.outputs,
+            'one_at_a_time': self.one_at_a_time,
+            'design': self.design,
+            'final_only': self.final_only,
+            'collect_every': self.collect_every,
+            'common_random_numbers': self.common_random_numbers
+        }
+
+    @property
+    def output_steps(self) -> int:
+        """Length of each kept time series."""
+        return 1 if self.final_only else self.n_steps // self.collect_every
+
+    def decimate(self, series) -> np.ndarray:
+        """Kept values of a time series recorded at every step: every `collect_every`-th value, or only the last one."""
+        return series[self.collect_every - 1::self.collect_every][-self.output_steps:]
+
+    def path(self, output: str) -> str:
+        return os.path.join(self.directory, f'{output}.npy')
+
+    def params(self, index):
+        """Fixed and swept parameter values of the run at the given index of the grid."""
+        params = dict(self.fixed_params)
+        if self.one_at_a_time:
+            parameter = list(self.axes)[index[0]]
+            params[parameter] = self.axes[parameter][index[1]]
+        elif self.design:
+            params.update({parameter: values[index[0]] for parameter, values in self.axes.items()})
+        else:
+            params.update({parameter: values[i] for (parameter, values), i in zip(self.axes.items(), index)})
+        return params
+
+    def configs(self, params):
+        """Model, bee, hive and resource configs of a run and its resource layout, given its parameter values."""
+        configs = []
+        for config_type in CONFIG_TYPES:
+            defaults = config_type()
+            configs.append(config_type(**{p: v for p, v in params.items() if p.isupper() and hasattr(defaults, p)}))
+
+        unknown = [p for p in params if p.isupper() and not any(hasattr(config, p) for config in configs)]
+        assert not unknown, f"Parameters {unknown} are not defined by any config."
+
+        layout = self.layout(configs[0], **{p: v for p, v in params.items() if not p.isupper()})
+        return (*configs, layout)
+
+    def converged(self, sink) -> np.ndarray:
+        """Boolean mask over the grid without the repeats axis, of the cells whose completed runs give confidence
+        intervals of all summaries within the target precision."""
+        completed = sink.load(sink.COMPLETED)
+        n = completed.sum(axis=-1)
+        df = np.maximum(n - 1, 1)
+        t = stats.t.ppf((1 + self.CONF_LEVEL) / 2, df)
+
+        converged = n >= 2
+        for output, summary in self.summaries:
+            values = np.where(completed, SUMMARIES[summary](sink.load(output)), 0)
+            mean = values.sum(axis=-1) / np.maximum(n, 1)
+            variance = (np.where(completed, values - mean[..., None], 0) ** 2).sum(axis=-1) / df
+            converged &= t * np.sqrt(variance / np.maximum(n, 1)) <= self.target_precision * np.abs(mean)
+        return converged
+
+    def next_runs(self, sink):
+        """Indices of the runs to submit next, in grid order: all pending runs, or the next wave of adaptive sweeps."""
+        if not self.adaptive:
+            return sink.pending()
+
+        # Cells get at least `min_repeats` runs, then one more wave until converged or all runs are completed
+        completed = np.asarray(sink.load(sink.COMPLETED))
+        n = completed.sum(axis=-1)
+        target = np.where(n < self.min_repeats, self.min_repeats, np.where(self.converged(sink), 0, n + self.min_repeats))
+        runs = ~completed & (np.arange(self.n_repeats) < np.minimum(target, self.n_repeats)[..., None])
+        return [tuple(int(i) for i in index) for index in np.argwhere(runs)]
+
+    def is_done(self, sink) -> bool:
+        return not self.next_runs(sink)
+
+    def ofat_table(self, sink, parameter: str) -> np.ndarray:
+        """Final outputs of a one-at-a-time parameter as rows of the parameter value followed by the outputs, one row per completed run."""
+        assert self.one_at_a_time, "Tables are only defined for one-at-a-time sweeps."
+        i = list(self.axes).index(parameter)
+        completed = sink.load(sink.COMPLETED)[i].reshape(-1)
+        values = np.repeat(self.axes[parameter], self.n_repeats)
+        columns = [sink.load(output)[i, ..., -1].reshape(-1) for output in self.outputs]
+        return np.column_stack([values] + columns)[completed]
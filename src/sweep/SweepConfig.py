@@ -0,0 +1,103 @@
+import os
+import numpy as np
+
+from ..model.config.SensitivityAnalysisConfig import SensitivityAnalysisConfig as SAC
+from .Sweep import Sweep, clustered_layout
+from .SensitivityAnalysis import SensitivityAnalysis
+from .SensitivityMethod import SensitivityMethod
+
+# ---| Experiments |---
+
+# Number of runs of each cell and of steps of each run
+N_REPEATS = 32
+N_STEPS = 1000
+
+# Baseline dynamics of the default model
+BASELINE_DYNAMICS = Sweep('baseline_dynamics', n_repeats=256, n_steps=N_STEPS)
+
+# Resource scarcity, over the number of resources and their distance from the hive
+N_RESOURCES = [1, 2, 3, 4, 5, 6]
+DIST_RESOURCES = np.linspace(30, 80, 6)
+
+RESOURCE_SCARCITY = Sweep('resource_scarcity',
+                          axes={'N_RESOURCES_DEFAULT': N_RESOURCES, 'RESOURCE_DISTANCE_DEFAULT': DIST_RESOURCES},
+                          n_repeats=N_REPEATS, n_steps=N_STEPS)
+
+# Resource clustering, over the angle range the resources are spread over and their distance from the hive
+N_RESOURCE = 6
+MAX_ANGLES = np.arange(2*np.pi / 6, 2*np.pi, 2*np.pi / 6)
+
+RESOURCE_CLUSTERING = Sweep('resource_clustering',
+                            axes={'max_angle': MAX_ANGLES, 'distance': DIST_RESOURCES},
+                            n_repeats=N_REPEATS, n_steps=N_STEPS, layout=clustered_layout)
+
+# Weather effects, over the probability and the duration of storms
+P_STORMS = [0.0, 0.0025, 0.005, 0.0075, 0.01]
+STORM_DURATIONS = [5, 10, 15, 20, 25, 30, 35]
+
+WEATHER_EFFECTS = Sweep('weather_effects',
+                        axes={'P_STORM': P_STORMS, 'STORM_DURATION': STORM_DURATIONS},
+                        n_repeats=N_REPEATS, n_steps=N_STEPS)
+
+# ---| One-at-a-time sensitivity analysis |---
+
+# Number of distinct values of each parameter
+N_SAMPLES = 8
+
+# Outputs of the sensitivity analysis, final values of the colony size, hive stock and forager ratio
+OFAT_OUTPUTS = ['bee_count', 'nectar', 'foragers']
+
+def ofat_axes(bounds, params, integer_params):
+    """`N_SAMPLES` values of each parameter evenly spread over its bounds, rounded down for integer parameters."""
+    return {param: np.linspace(getattr(bounds, f'{param}_MIN'), getattr(bounds, f'{param}_MAX'), num=N_SAMPLES,
+                               dtype=int if param in integer_params else float)
+            for param in params}
+
+# Bee parameters, by group
+GENERAL_PARAMS = ['FOV', 'FOOD_CONSUMPTION']
+MOVEMENT_PARAMS = ['SPEED_IN_HIVE', 'SPEED_FORAGING']
+IN_HIVE_BEHAVIOUR_PARAMS = ['RESTING_PERIOD', 'P_NECTAR_INSPECTION', 'P_NECTAR_COMMUNICATION']
+EXPLORATION_AND_RECRUITMENT_PARAMS = ['P_FOLLOW_WAGGLE_DANCE', 'EXPLORING_INCENTIVE', 'CARRYING_CAPACITY', 'P_ABORT']
+BIRTH_AND_DEATH_PARAMS = ['P_BIRTH', 'P_DEATH', 'DEATH_STORM_FACTOR']
+BEE_PARAMS = GENERAL_PARAMS + MOVEMENT_PARAMS + IN_HIVE_BEHAVIOUR_PARAMS + EXPLORATION_AND_RECRUITMENT_PARAMS + BIRTH_AND_DEATH_PARAMS
+
+OFAT_BEE_PARAMETERS = Sweep('ofat_bee_parameters',
+                            axes=ofat_axes(SAC.BeeParamBounds, BEE_PARAMS, ['RESTING_PERIOD', 'EXPLORING_INCENTIVE']),
+                            n_repeats=N_REPEATS, n_steps=N_STEPS, outputs=OFAT_OUTPUTS, one_at_a_time=True, final_only=True,
+                            directory=os.path.join('data', 'sensitivity_analysis', 'bee_parameters'))
+
+# Initial conditions of the hive
+INITIAL_CONDITION_PARAMS = ['DEFAULT_INIT_NECTAR', 'N_BEES']
+
+OFAT_INITIAL_CONDITIONS = Sweep('ofat_initial_conditions',
+                                axes=ofat_axes(SAC.HiveParamBounds, INITIAL_CONDITION_PARAMS, ['N_BEES']),
+                                n_repeats=N_REPEATS, n_steps=N_STEPS, outputs=OFAT_OUTPUTS, one_at_a_time=True, final_only=True,
+                                directory=os.path.join('data', 'sensitivity_analysis', 'initial_conditions'))
+
+# ---| Global sensitivity analysis |---
+
+# Number of runs of each sample of a design, averaged before computing the indices
+N_SA_REPEATS = 4
+
+# Sobol indices of the bee parameters, 128 * (14 + 2) samples
+SOBOL_BEE_PARAMETERS = SensitivityAnalysis('sobol_bee_parameters', SAC.BeeParamBounds, BEE_PARAMS, ['RESTING_PERIOD', 'EXPLORING_INCENTIVE'],
+                                           method=SensitivityMethod.SOBOL, n_base=128, n_repeats=N_SA_REPEATS, n_steps=N_STEPS, outputs=OFAT_OUTPUTS,
+                                           directory=os.path.join('data', 'sensitivity_analysis', 'sobol_bee_parameters'))
+
+# Morris screening of the bee parameters, 32 trajectories of 14 + 1 samples
+MORRIS_BEE_PARAMETERS = SensitivityAnalysis('morris_bee_parameters', SAC.BeeParamBounds, BEE_PARAMS, ['RESTING_PERIOD', 'EXPLORING_INCENTIVE'],
+                                            method=SensitivityMethod.MORRIS, n_base=32, n_repeats=N_SA_REPEATS, n_steps=N_STEPS, outputs=OFAT_OUTPUTS,
+                                            directory=os.path.join('data', 'sensitivity_analysis', 'morris_bee_parameters'))
+
+# Sobol indices of the initial conditions, 256 * (2 + 2) samples
+SOBOL_INITIAL_CONDITIONS = SensitivityAnalysis('sobol_initial_conditions', SAC.HiveParamBounds, INITIAL_CONDITION_PARAMS, ['N_BEES'],
+                                               method=SensitivityMethod.SOBOL, n_base=256, n_repeats=N_SA_REPEATS, n_steps=N_STEPS, outputs=OFAT_OUTPUTS,
+                                               directory=os.path.join('data', 'sensitivity_analysis', 'sobol_initial_conditions'))
+
+# All sensitivity analyses by name
+SENSITIVITY_ANALYSES = {analysis.name: analysis for analysis in [SOBOL_BEE_PARAMETERS, MORRIS_BEE_PARAMETERS, SOBOL_INITIAL_CONDITIONS]}
+
+# All sweeps by name, including the designs of the sensitivity analyses
+SWEEPS = {sweep.name: sweep for sweep in [BASELINE_DYNAMICS, RESOURCE_SCARCITY, RESOURCE_CLUSTERING, WEATHER_EFFECTS,
+                                          OFAT_BEE_PARAMETERS, OFAT_INITIAL_CONDITIONS]
+                                         + [analysis.sweep for analysis in SENSITIVITY_ANALYSES.values()]}
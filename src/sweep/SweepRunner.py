@@ -0,0 +1,98 @@
+import os
+import numpy as np
+from multiprocess.pool import Pool
+from tqdm import tqdm
+
+from ..model.Model import ForagerModel
+from ..model.util import ModelBuilder
+from ..model.util.RandomService import sweep_seed
+from ..model.util.ResultSink import ResultSink
+from ..model.util.RunCache import RunCache
+from .Sweep import REPORTERS
+
+def available_cores() -> int:
+    """Number of cores this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def open_sink(sweep) -> ResultSink:
+    return ResultSink(sweep.directory, sweep.outputs, sweep.cells, sweep.output_steps, definition=sweep.definition)
+
+def run_key(sweep, index, cache) -> str:
+    """Run cache key of the run at the given index of the grid of a sweep."""
+    model_config, bee_config, hive_config, resource_config, layout = sweep.configs(sweep.params(index))
+    seed = sweep_seed(index, sweep.common_random_numbers)
+    return cache.key(model_config, bee_config, hive_config, resource_config, layout, sweep.n_steps, seed, backend=sweep.backend)
+
+def run_task(task):
+    """Runs one run of a sweep, or looks it up in the run cache, and writes its outputs to the sweep's output files."""
+    sweep, index, sink, cache = task
+
+    model_config, bee_config, hive_config, resource_config, layout = sweep.configs(sweep.params(index))
+    seed = sweep_seed(index, sweep.common_random_numbers)
+    key = run_key(sweep, index, cache)
+
+    # Runs record all outputs at every step, so that any sweep can reuse them whichever outputs and steps it keeps
+    def simulate():
+        model = ForagerModel(model_config=model_config, bee_config=bee_config, hive_config=hive_config,
+                             resource_config=resource_config, backend=sweep.backend, seed=seed,
+                             reporters=list(REPORTERS.values()))
+        ModelBuilder.build_layout(model, layout)
+
+        # Runs stopped early by a stopping criterion are padded to the full number of steps
+        model.run(sweep.n_steps)
+
+        return {output: model.datacollector.get(column) for output, column in REPORTERS.items()}
+
+    # Cached runs lacking some of the outputs are run again, adding them to the cache
+    series = cache.run(key, simulate, sweep.outputs)
+    sink.write(index, key=key, **{output: sweep.decimate(series[output]) for output in sweep.outputs})
+
+def run_sweeps(sweeps, processes=None, chunksize=None, cache=None):
+    """Runs the pending runs of the given sweeps on one process pool.
+
+    Runs of all sweeps are submitted at once as one stream of tasks, in chunks, and are collected in order of
+    completion, so no core waits for the last runs of a cell or of a sweep while others are pending. Workers write
+    the outputs of their runs straight into the memory-mapped output files of the sweep, which are shared with the
+    parent, instead of sending them back. Completed runs of interrupted sweeps and runs found in the run cache are
+    not recomputed, but completed runs whose run cache key changed since they were written, e.g. because an axis
+    value of the sweep was edited, are run again or looked up in the cache. Adaptive sweeps are run in waves, each submitting the next runs of the cells that have not
+    converged yet, together with the other sweeps' runs.
+
+    Args:
+        sweeps (List[Sweep]): sweeps to run
+        processes (int, optional): number of worker processes. Defaults to None, one per available core.
+        chunksize (int, optional): number of runs submitted to a worker at once. Defaults to None, so that each
+            worker gets about 16 chunks.
+        cache (RunCache, optional): run cache. Defaults to None, the cache in data/cache.
+
+    Returns:
+        List[ResultSink]: output files of each sweep
+    """
+    processes = processes or available_cores()
+    cache = cache or RunCache()
+
+    sinks = [open_sink(sweep) for sweep in sweeps]
+    for sweep, sink in zip(sweeps, sinks):
+        sink.discard_stale(lambda index: run_key(sweep, index, cache))
+
+    def next_tasks():
+        return [(sweep, index, sink, cache) for sweep, sink in zip(sweeps, sinks) for index in sweep.next_runs(sink)]
+
+    tasks = next_tasks()
+    if tasks:
+        with Pool(processes) as pool:
+            while tasks:
+                wave_chunksize = chunksize or max(1, len(tasks) // (16 * processes))
+                for _ in tqdm(pool.imap_unordered(run_task, tasks, chunksize=wave_chunksize), total=len(tasks), desc=', '.join(sweep.name for sweep in sweeps)):
+                    pass
+                tasks = next_tasks()
+
+    # One-at-a-time sweeps are also saved as one table per parameter, the format of the sensitivity analysis data
+    for sweep, sink in zip(sweeps, sinks):
+        if sweep.one_at_a_time and sweep.is_done(sink):
+            for parameter in sweep.axes:
+                np.save(os.path.join(sweep.directory, f'{parameter}.npy'), sweep.ofat_table(sink, parameter))
+
+    return sinks
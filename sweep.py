@@ -0,0 +1,19 @@
+import argparse
+
+from src.sweep.SweepConfig import SWEEPS, SENSITIVITY_ANALYSES
+from src.sweep.SweepRunner import run_sweeps
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs the pending runs of parameter sweeps declared in src/sweep/SweepConfig.py.')
+    parser.add_argument('sweeps', nargs='+', choices=list(SWEEPS), help='names of the sweeps to run')
+    parser.add_argument('--processes', type=int, default=None, help='number of worker processes, one per available core by default')
+    parser.add_argument('--chunksize', type=int, default=None, help='number of runs submitted to a worker at once')
+    args = parser.parse_args()
+
+    sinks = run_sweeps([SWEEPS[name] for name in args.sweeps], processes=args.processes, chunksize=args.chunksize)
+
+    # Sensitivity indices of the completed sensitivity analyses
+    for name, sink in zip(args.sweeps, sinks):
+        if name in SENSITIVITY_ANALYSES and SWEEPS[name].is_done(sink):
+            analysis = SENSITIVITY_ANALYSES[name]
+            analysis.save(analysis.analyze(sink))
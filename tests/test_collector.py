@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.model.util.Backend import Backend
+from src.model.util.Collector import Collector
+from src.model.config.ModelConfig import ModelConfig
+from src.model.config.BeeSwarmConfig import BeeSwarmConfig
+from src.model.config.HiveConfig import HiveConfig
+from src.model.util.StoppingCriterion import StoppingCriterion
+from .util import build_model
+
+N_STEPS = 400
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+def test_collects_every_n_steps_and_grows():
+    counter = Counter()
+    collector = Collector({'value': lambda model: model.value}, collect_every=3, capacity=2)
+
+    for step in range(1, 31):
+        counter.value = step
+        collector.collect(counter)
+
+    assert collector.records(30) == 10
+    np.testing.assert_array_equal(collector.get('value'), np.arange(3, 31, 3))
+    np.testing.assert_array_equal(collector.model_vars['value'], np.arange(3, 31, 3))
+
+def test_pad_repeats_last_record():
+    counter = Counter()
+    collector = Collector({'value': lambda model: model.value})
+    for step in range(4):
+        counter.value = step
+        collector.collect(counter)
+
+    collector.pad(7)
+    np.testing.assert_array_equal(collector.get('value'), [0, 1, 2, 3, 3, 3, 3])
+
+def test_stopped_run_is_padded_to_full_length():
+    # A starving colony without births dies out
+    model = build_model(Backend.NUMPY, 0, model_config=ModelConfig(STOPPING_CRITERIA=['extinction']), bee_config=BeeSwarmConfig(P_BIRTH=0),
+                        hive_config=HiveConfig(N_BEES=20, DEFAULT_INIT_NECTAR=0), collect_every=2)
+    model.run(N_STEPS)
+
+    assert model.stopped_by == StoppingCriterion.EXTINCTION and model.stopped_at < N_STEPS
+    series = model.datacollector.get('Bee count 🐝')
+    assert len(series) == N_STEPS // 2
+    # Records are taken every second step, the ones after the stop repeat the last one taken
+    last = model.stopped_at // 2 - 1
+    assert last < len(series) - 1
+    assert (series[last + 1:] == series[last]).all()
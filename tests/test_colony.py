@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.model.config.HiveConfig import HiveConfig as HC
+from src.model.util.Backend import Backend
+from src.model.util.BeeState import BeeState
+from .util import build_model, run_model
+
+N_SEEDS = 8
+N_STEPS = 200
+
+# Summaries of the runs whose means are compared between the agent and array-backed models
+SUMMARIES = {
+    'final bee count': lambda series: series['Bee count 🐝'][-1],
+    'final hive stock': lambda series: series['Hive stock 🍯'][-1],
+    'mean foragers': lambda series: series['Foragers'].mean(),
+    'mean resting': lambda series: series['resting 💤'].mean(),
+    'mean perceived nectar': lambda series: series['Mean perceived nectar level'].mean()
+}
+
+@pytest.fixture(scope='module')
+def summaries():
+    """Summaries of seeded runs of each backend, one row per seed."""
+    return {backend: {name: np.array([summary(run_model(backend, seed, N_STEPS)) for seed in range(N_SEEDS)])
+                      for name, summary in SUMMARIES.items()}
+            for backend in (Backend.AGENTS, Backend.NUMPY)}
+
+@pytest.mark.parametrize('name', SUMMARIES)
+def test_colony_matches_agents_in_distribution(summaries, name):
+    agents, colony = summaries[Backend.AGENTS][name], summaries[Backend.NUMPY][name]
+    standard_error = np.sqrt(agents.var(ddof=1) / N_SEEDS + colony.var(ddof=1) / N_SEEDS)
+    assert abs(agents.mean() - colony.mean()) <= 4 * standard_error + 1e-9
+
+def test_colony_records_same_outputs_as_agents():
+    agents = run_model(Backend.AGENTS, 0, 20)
+    colony = run_model(Backend.NUMPY, 0, 20)
+
+    assert agents.keys() == colony.keys()
+    for name in agents:
+        assert agents[name].shape == colony[name].shape == (20,)
+
+def test_colony_state_counts_match_arrays():
+    model = build_model(Backend.NUMPY, 0)
+    for _ in range(50):
+        model.step()
+
+    colony = model.colony
+    assert model.bee_count == colony.n
+    assert sum(model.state_counts.values()) == colony.n
+    for state in BeeState:
+        assert model.state_counts[state] == np.count_nonzero(colony.states[:colony.n] == state.code)
+    np.testing.assert_array_equal(colony.inside[:colony.n], colony.distance_to_hive(slice(0, colony.n)) <= HC.RADIUS)
+    assert model.bees_in_hive == np.count_nonzero(colony.inside[:colony.n])
+
+def test_births_update_statistics_incrementally(monkeypatch):
+    model = build_model(Backend.NUMPY, 0)
+    model.run(50)
+
+    # Births must not recount the whole colony
+    monkeypatch.setattr(model.colony, 'publish_statistics', lambda: pytest.fail("Births recounted the colony."))
+    for _ in range(5):
+        model.hive.create_bee()
+    incremental = (model.bee_count, dict(model.state_counts), model.perceived_nectar_sum, model.bees_in_hive)
+
+    monkeypatch.undo()
+    model.colony.publish_statistics()
+    assert incremental[0] == model.bee_count
+    assert incremental[1] == model.state_counts
+    assert incremental[2] == pytest.approx(model.perceived_nectar_sum)
+    assert incremental[3] == model.bees_in_hive
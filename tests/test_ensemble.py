@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from src.model.EnsembleModel import EnsembleForagerModel
+from src.model.config.ModelConfig import ModelConfig
+from src.model.util.Backend import Backend
+from src.sweep.Sweep import REPORTERS, default_layout
+from tests.util import build_model
+
+# Storms frequent enough to hit every replica within the run
+STORMY = ModelConfig(P_STORM=0.02)
+
+N_STEPS = 200
+
+def run_ensemble(n_replicas, seed=3):
+    model = EnsembleForagerModel(n_replicas, model_config=STORMY, layout=default_layout(STORMY), seed=seed)
+    model.run(N_STEPS)
+    return model
+
+@pytest.fixture(scope='module')
+def ensemble():
+    return run_ensemble(4)
+
+def test_series_have_a_row_per_replica(ensemble):
+    for name in EnsembleForagerModel.SERIES:
+        assert ensemble.get_series(name).shape == (4, N_STEPS)
+    assert len(set(ensemble.get_series('bee_count')[:, -1].tolist())) > 1
+
+def test_replicas_do_not_depend_on_ensemble_size(ensemble):
+    smaller = run_ensemble(2)
+    for name in EnsembleForagerModel.SERIES:
+        np.testing.assert_array_equal(smaller.get_series(name), ensemble.get_series(name)[:2], err_msg=name)
+
+@pytest.mark.parametrize('replica', [0, 3])
+def test_replicas_reproduce_single_runs(ensemble, replica):
+    model = build_model(Backend.NUMPY, ensemble.seeds[replica], model_config=STORMY)
+    model.run(N_STEPS)
+    for name in EnsembleForagerModel.SERIES:
+        np.testing.assert_array_equal(model.datacollector.get(REPORTERS[name]), ensemble.get_series(name)[replica], err_msg=name)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.model.LandscapeModel import LandscapeModel, Tile
+from src.model.config.BeeSwarmConfig import BeeSwarmConfig
+from src.model.config.HiveConfig import HiveConfig as HC
+from src.model.config.LandscapeConfig import LandscapeConfig
+
+# Small landscape of 3 x 3 tiles, whose bees cross tile borders hundreds of times within the run
+SMALL = LandscapeConfig(SIZE=240, N_TILES=3, N_HIVES=5, RESOURCE_DISTANCE=30)
+
+N_STEPS = 100
+
+def run_landscape(processes, seed=1):
+    with LandscapeModel(SMALL, seed=seed, processes=processes) as model:
+        model.build_default_layout()
+        model.run(N_STEPS)
+        return {name: model.get_hive_series(name) for name in ('bee_count', 'nectar')}
+
+@pytest.fixture(scope='module')
+def serial():
+    return run_landscape(0)
+
+@pytest.mark.parametrize('processes', [1, 2, 9])
+def test_workers_reproduce_serial_run(serial, processes):
+    parallel = run_landscape(processes)
+    for name in serial:
+        np.testing.assert_array_equal(serial[name], parallel[name], err_msg=name)
+
+def test_bees_cross_tiles(monkeypatch):
+    crossings = []
+    emigrate = Tile.emigrate
+
+    def counted(tile):
+        emigrants = emigrate(tile)
+        crossings.extend(len(bees['states']) for bees in emigrants.values())
+        return emigrants
+
+    monkeypatch.setattr(Tile, 'emigrate', counted)
+    run_landscape(0)
+    assert sum(crossings) > 0
+
+def test_processes_capped_at_tiles():
+    assert LandscapeModel(SMALL, processes=32).processes == SMALL.N_TILES ** 2
+    assert LandscapeModel(SMALL, processes=0).processes == 0
+
+def test_random_hives_are_apart():
+    model = LandscapeModel(SMALL, seed=0, processes=0)
+    model.add_random_hives(SMALL.N_HIVES)
+
+    positions = np.array(model.hive_positions)
+    distances = np.hypot(*(positions[:, None] - positions[None]).T)
+    np.fill_diagonal(distances, np.inf)
+    assert distances.min() > 2 * HC.RADIUS + model.bee_config.FOV
+
+def test_random_hives_need_wide_tiles():
+    # Tiles of width 12 cannot hold a hive of radius 5 with a field of view of 1 on both sides
+    model = LandscapeModel(LandscapeConfig(SIZE=24, N_TILES=2), bee_config=BeeSwarmConfig(SPEED_FORAGING=1), processes=0)
+    with pytest.raises(AssertionError):
+        model.add_random_hives(1)
+
+def test_random_hives_stop_when_full():
+    model = LandscapeModel(SMALL, seed=0, processes=0)
+    with pytest.raises(AssertionError):
+        model.add_random_hives(1000, max_attempts=2000)
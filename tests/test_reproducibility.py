@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from src.model.util.Backend import Backend
+from .util import build_model
+
+BACKENDS = [Backend.AGENTS, Backend.NUMPY, Backend.NUMBA]
+
+N_STEPS = 100
+
+# The Numba backend warns when its kernels run as plain Python
+pytestmark = pytest.mark.filterwarnings('ignore:Numba is not installed')
+
+def records(model):
+    return {name: model.datacollector.get(name).copy() for name in model.datacollector.reporters}
+
+def assert_same_records(a, b):
+    assert a.keys() == b.keys()
+    for name in a:
+        np.testing.assert_array_equal(a[name], b[name], err_msg=name)
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_same_seed_reproduces_run(backend):
+    first, second = build_model(backend, 5), build_model(backend, 5)
+    first.run(N_STEPS)
+    second.run(N_STEPS)
+    assert_same_records(records(first), records(second))
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_run_does_not_depend_on_interleaved_models(backend):
+    alone = build_model(backend, 1)
+    alone.run(N_STEPS)
+
+    # Models built and stepped in between must not change the random streams of each other
+    interleaved, other = build_model(backend, 1), build_model(backend, 2)
+    for _ in range(N_STEPS):
+        interleaved.step()
+        other.step()
+
+    assert_same_records(records(alone), records(interleaved))
+
+def test_plain_python_kernels_are_reproducible(monkeypatch):
+    from src.model.util import Kernels
+    if not Kernels.HAS_NUMBA:
+        pytest.skip("Kernels already run as plain Python.")
+
+    # Kernels call each other through the module, so replacing all of them runs every kernel uncompiled
+    for name in ('move_in_hive', 'build_grid', 'neighbors', 'rest', 'dance', 'extract'):
+        monkeypatch.setattr(Kernels, name, getattr(Kernels, name).py_func)
+
+    alone = build_model(Backend.NUMBA, 5)
+    alone.run(20)
+
+    interleaved, other = build_model(Backend.NUMBA, 5), build_model(Backend.NUMBA, 6)
+    for _ in range(20):
+        interleaved.step()
+        other.step()
+
+    assert_same_records(records(alone), records(interleaved))
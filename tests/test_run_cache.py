@@ -0,0 +1,64 @@
+import numpy as np
+
+from src.model.config.ModelConfig import ModelConfig
+from src.model.config.BeeSwarmConfig import BeeSwarmConfig
+from src.model.config.HiveConfig import HiveConfig
+from src.model.config.ResourceConfig import ResourceConfig
+from src.model.util.RunCache import RunCache
+from src.sweep.Sweep import default_layout
+
+def key(cache, model_config=None, bee_config=None, n_steps=100, seed=0, **options):
+    model_config = model_config or ModelConfig()
+    return cache.key(model_config, bee_config or BeeSwarmConfig(), HiveConfig(), ResourceConfig(),
+                     default_layout(model_config), n_steps, seed, **options)
+
+def test_key_is_stable_and_identifies_the_run(tmp_path):
+    cache = RunCache(str(tmp_path))
+
+    assert key(cache) == key(cache)
+    assert key(cache) == key(cache, model_config=ModelConfig(P_STORM=0.005))
+    assert key(cache, model_config=ModelConfig(RESOURCE_DISTANCE_DEFAULT=50.0)) == key(cache, model_config=ModelConfig(RESOURCE_DISTANCE_DEFAULT=50))
+
+    assert key(cache) != key(cache, seed=1)
+    assert key(cache) != key(cache, n_steps=101)
+    assert key(cache) != key(cache, bee_config=BeeSwarmConfig(P_DEATH=0.002))
+    assert key(cache) != key(cache, backend='numpy')
+
+def test_put_get_round_trip(tmp_path):
+    cache = RunCache(str(tmp_path))
+    series = {'bee_count': np.arange(10.0), 'nectar': np.linspace(5, 4, 10)}
+
+    assert cache.get('ab' * 32) is None
+    cache.put('ab' * 32, **series)
+
+    assert 'ab' * 32 in cache
+    cached = cache.get('ab' * 32)
+    assert cached.keys() == series.keys()
+    for name in series:
+        np.testing.assert_array_equal(cached[name], series[name])
+
+    # No temporary files are left next to the entry
+    assert [path.name for path in (tmp_path / 'ab').iterdir()] == ['ab' * 32 + '.npz']
+
+def test_run_simulates_once(tmp_path):
+    cache = RunCache(str(tmp_path))
+    calls = []
+
+    def simulate():
+        calls.append(1)
+        return {'bee_count': np.ones(5)}
+
+    first = cache.run(key(cache), simulate)
+    second = cache.run(key(cache), simulate)
+
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first['bee_count'], second['bee_count'])
+
+def test_run_adds_missing_outputs(tmp_path):
+    cache = RunCache(str(tmp_path))
+    cache.run(key(cache), lambda: {'bee_count': np.ones(5)})
+
+    series = cache.run(key(cache), lambda: {'bee_count': np.ones(5), 'nectar': np.zeros(5)}, names=['bee_count', 'nectar'])
+
+    assert set(series) == {'bee_count', 'nectar'}
+    assert set(cache.get(key(cache))) == {'bee_count', 'nectar'}
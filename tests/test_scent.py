@@ -0,0 +1,70 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from src.model.Model import ForagerModel
+from src.model.agents.Resource import Resource
+from src.model.config.ModelConfig import ModelConfig
+from src.model.config.ResourceConfig import ResourceConfig as RC
+from src.model.util import ModelBuilder
+from src.model.util.ScentMode import ScentMode
+
+def build_model(scent_mode, **kwargs):
+    """Model with a cluster of resources, the first on a raster node, and random resources around it."""
+    model = ForagerModel(model_config=ModelConfig(SCENT_MODE=scent_mode, **kwargs), seed=0)
+    ModelBuilder.build_layout(model, [('add_n_resources_in_angle_range', 50, 6, 90)])
+    for _ in range(20):
+        ModelBuilder.add_random_resource(model, quantity=model.layout_rng.uniform(1, 10))
+    return model
+
+def positions_outside_resources(model, n=20000):
+    positions = np.random.default_rng(0).uniform(0, model.size, size=(n, 2))
+    deltas = positions[:, None, :] - model.scent.positions[None, :, :]
+    return positions[(np.einsum('ijk,ijk->ij', deltas, deltas) > RC.RADIUS**2).all(axis=1)]
+
+def relative_error(model, positions):
+    exact = model.scent.exact_at(positions)
+    return np.abs(model.scent.at(positions) - exact) / exact
+
+def test_raster_within_tolerance_before_and_after_depletion():
+    model = build_model(ScentMode.RASTER)
+    resources = list(model.get_agents_of_type(Resource))
+    assert resources[0].pos == (200.0, 150.0)
+
+    positions = positions_outside_resources(model)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert relative_error(model, positions).max() <= model.model_config.SCENT_TOLERANCE
+
+        # Depleting the resource on a node leaves the scent of the others around it
+        for resource in resources[::2]:
+            resource.quantity = 0
+        assert relative_error(model, positions).max() <= model.model_config.SCENT_TOLERANCE
+        assert np.isfinite(model.scent.at([resources[0].pos])).all()
+
+def test_raster_is_bounded_at_resources():
+    model = build_model(ScentMode.RASTER)
+    assert model.scent.field.max() < 1e3
+
+def test_raster_is_verified_after_depletion():
+    model = build_model(ScentMode.RASTER)
+    model.scent.at([(10.0, 10.0)])
+
+    resource = next(iter(model.get_agents_of_type(Resource)))
+    resource.quantity = resource.quantity / 2
+    assert model.scent._verified
+
+    resource.quantity = 0
+    assert not model.scent._verified
+    model.scent.at([(10.0, 10.0)])
+    assert model.scent._verified
+
+def test_coarse_raster_fails_verification():
+    model = build_model(ScentMode.RASTER, SCENT_RESOLUTION=4.0)
+    with pytest.raises(AssertionError, match='exceeds tolerance'):
+        model.scent.at([(10.0, 10.0)])
+
+def test_quadtree_close_to_exact():
+    model = build_model(ScentMode.QUADTREE)
+    assert relative_error(model, positions_outside_resources(model)).max() <= 0.05
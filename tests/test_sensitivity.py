@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.model.config.SensitivityAnalysisConfig import SensitivityAnalysisConfig as SAC
+from src.sweep import SensitivityAnalysis as sensitivity
+from src.sweep.SensitivityAnalysis import SensitivityAnalysis, integer_values
+from src.sweep.SensitivityMethod import SensitivityMethod
+from src.sweep.SweepRunner import open_sink
+
+def morris_analysis(directory):
+    return SensitivityAnalysis('test', SAC.BeeParamBounds, ['RESTING_PERIOD', 'P_ABORT'], ['RESTING_PERIOD'],
+                               method=SensitivityMethod.MORRIS, n_base=8, n_repeats=1, n_steps=10, outputs=('bee_count',),
+                               directory=str(directory))
+
+def test_integer_values_are_equally_likely():
+    values = integer_values(np.linspace(1, 15, 15001), 1, 15)
+    counts = np.bincount(values.astype(int))[1:]
+    assert len(counts) == 15
+    assert counts.max() - counts.min() <= 2
+
+def test_integer_parameters_reach_both_bounds(tmp_path):
+    analysis = morris_analysis(tmp_path)
+    values = np.array(analysis.sweep.axes['RESTING_PERIOD'])
+
+    assert values.min() == SAC.BeeParamBounds.RESTING_PERIOD_MIN
+    assert values.max() == SAC.BeeParamBounds.RESTING_PERIOD_MAX
+    np.testing.assert_array_equal(values, analysis.design[:, 0])
+
+def test_morris_analysis_uses_design_as_run(tmp_path, monkeypatch):
+    analysis = morris_analysis(tmp_path)
+    sink = open_sink(analysis.sweep)
+    for index in sink.pending():
+        sink.write(index, bee_count=np.array([analysis.design[index[0], 0]]))
+
+    inputs = []
+    analyze = sensitivity.morris_analyze.analyze
+    monkeypatch.setattr(sensitivity.morris_analyze, 'analyze', lambda problem, X, Y, **kwargs: inputs.append(X) or analyze(problem, X, Y, **kwargs))
+    indices = analysis.analyze(sink)
+
+    np.testing.assert_array_equal(inputs[0], analysis.design)
+    assert indices['bee_count']['mu_star'][0] > 0
+    assert indices['bee_count']['mu_star'][1] == 0
@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.sweep.Surrogate import Surrogate
+
+BOUNDS = {'P_STORM': (0, 0.01), 'STORM_DURATION': (5, 35)}
+
+def fitted_surrogate():
+    rng = np.random.default_rng(0)
+    x = np.column_stack((rng.uniform(0, 0.01, 20), rng.integers(5, 36, 20)))
+    means = 100 - 2000 * x[:, 0] - x[:, 1]
+    surrogate = Surrogate(BOUNDS, integer_params=['STORM_DURATION'], n_restarts=1)
+    return surrogate.fit(x, means, np.full(20, 4.0), np.full(20, 8))
+
+def test_integer_parameters_are_proposed_as_integers():
+    proposal = fitted_surrogate().propose(16)
+    durations = proposal['STORM_DURATION']
+
+    assert durations.dtype.kind == 'i'
+    assert ((durations >= 5) & (durations <= 35)).all()
+    assert proposal['P_STORM'].dtype.kind == 'f'
+    assert len(np.unique(proposal['P_STORM'])) == 16
+
+def test_proposals_are_predicted_where_run():
+    surrogate = fitted_surrogate()
+    proposal = surrogate.propose(4)
+    mean, std = surrogate.predict(proposal)
+    assert mean.shape == std.shape == (4,)
+    assert (std > 0).all()
@@ -0,0 +1,134 @@
+import numpy as np
+
+from src.model.util.RunCache import RunCache
+from src.sweep.Sweep import Sweep
+from src.sweep.SweepRunner import open_sink, run_key, run_sweeps, run_task
+
+N_STEPS = 20
+
+def small_sweep(directory):
+    return Sweep('test', axes={'P_STORM': [0.0, 0.05]}, n_repeats=2, n_steps=N_STEPS, outputs=('bee_count', 'nectar'),
+                 directory=str(directory))
+
+def test_sweep_writes_all_runs(tmp_path):
+    sweep = small_sweep(tmp_path / 'sweep')
+    sink, = run_sweeps([sweep], processes=1, cache=RunCache(str(tmp_path / 'cache')))
+
+    assert sink.load(sink.COMPLETED).all()
+    assert sink.load('bee_count').shape == (2, 2, N_STEPS)
+    assert (sink.load('bee_count') > 0).all()
+
+def test_cached_runs_are_reused(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    first, = run_sweeps([small_sweep(tmp_path / 'first')], processes=1, cache=cache)
+    n_entries = len(list((tmp_path / 'cache').rglob('*.npz')))
+
+    second, = run_sweeps([small_sweep(tmp_path / 'second')], processes=1, cache=cache)
+
+    assert len(list((tmp_path / 'cache').rglob('*.npz'))) == n_entries == 4
+    np.testing.assert_array_equal(first.load('bee_count'), second.load('bee_count'))
+
+def test_resume_runs_only_pending_runs(tmp_path):
+    reference, = run_sweeps([small_sweep(tmp_path / 'reference')], processes=1, cache=RunCache(str(tmp_path / 'reference_cache')))
+
+    # An interrupted sweep that completed a single run, whose outputs are marked to tell whether it is run again
+    sweep = small_sweep(tmp_path / 'resumed')
+    cache = RunCache(str(tmp_path / 'cache'))
+    sink = open_sink(sweep)
+    marker = np.full(N_STEPS, -1.0)
+    sink.write((0, 0), key=run_key(sweep, (0, 0), cache), bee_count=marker, nectar=marker)
+    assert len(sink.pending()) == 3
+
+    resumed, = run_sweeps([sweep], processes=1, cache=cache)
+
+    assert not resumed.pending()
+    np.testing.assert_array_equal(resumed.load('bee_count')[0, 0], marker)
+    np.testing.assert_array_equal(resumed.load('bee_count')[1], reference.load('bee_count')[1])
+    np.testing.assert_array_equal(resumed.load('bee_count')[0, 1], reference.load('bee_count')[0, 1])
+    assert len(list((tmp_path / 'cache').rglob('*.npz'))) == 3
+
+def test_edited_axis_reruns_only_edited_cells(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    run_sweeps([small_sweep(tmp_path / 'sweep')], processes=1, cache=cache)
+    first = open_sink(small_sweep(tmp_path / 'sweep')).load('bee_count').copy()
+
+    # Same directory and shapes, with the second storm probability edited
+    edited = Sweep('test', axes={'P_STORM': [0.0, 0.5]}, n_repeats=2, n_steps=N_STEPS, outputs=('bee_count', 'nectar'),
+                   directory=str(tmp_path / 'sweep'))
+    sink, = run_sweeps([edited], processes=1, cache=cache)
+
+    # Only the two repeats of the edited cell are simulated, and its outputs are those of a fresh sweep
+    assert len(list((tmp_path / 'cache').rglob('*.npz'))) == 6
+    np.testing.assert_array_equal(sink.load('bee_count')[0], first[0])
+    fresh = Sweep('fresh', axes={'P_STORM': [0.5]}, n_repeats=2, n_steps=N_STEPS, outputs=('bee_count', 'nectar'),
+                  directory=str(tmp_path / 'fresh'))
+    fresh_sink, = run_sweeps([fresh], processes=1, cache=RunCache(str(tmp_path / 'fresh_cache')))
+    np.testing.assert_array_equal(sink.load('nectar')[1], fresh_sink.load('nectar')[0])
+
+def test_redefined_sweep_resets_outputs(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    run_sweeps([small_sweep(tmp_path / 'sweep')], processes=1, cache=cache)
+
+    # Outputs of the same shapes, but decimated from runs twice as long
+    decimated = Sweep('test', axes={'P_STORM': [0.0, 0.05]}, n_repeats=2, n_steps=2 * N_STEPS, outputs=('bee_count', 'nectar'),
+                      collect_every=2, directory=str(tmp_path / 'sweep'))
+    sink = open_sink(decimated)
+    assert len(sink.pending()) == 4
+    assert np.isnan(sink.load('bee_count')).all()
+
+    # A sweep that keeps one more output gets it for all runs, from the cached runs
+    widened = Sweep('test', axes={'P_STORM': [0.0, 0.05]}, n_repeats=2, n_steps=N_STEPS, outputs=('bee_count', 'nectar', 'explorers'),
+                    directory=str(tmp_path / 'widened'))
+    run_sweeps([small_sweep(tmp_path / 'widened')], processes=1, cache=cache)
+    sink, = run_sweeps([widened], processes=1, cache=cache)
+    assert not np.isnan(sink.load('explorers')).any()
+    assert len(list((tmp_path / 'cache').rglob('*.npz'))) == 4
+
+def test_run_task_matches_sweep_outputs(tmp_path):
+    sweep = small_sweep(tmp_path / 'sweep')
+    sink, = run_sweeps([sweep], processes=1, cache=RunCache(str(tmp_path / 'cache')))
+
+    # Same run through an empty cache
+    other = small_sweep(tmp_path / 'other')
+    other_sink = open_sink(other)
+    run_task((other, (1, 1), other_sink, RunCache(str(tmp_path / 'other_cache'))))
+
+    np.testing.assert_array_equal(other_sink.load('nectar')[1, 1], sink.load('nectar')[1, 1])
+
+def test_decimated_and_final_sweeps_reuse_full_runs(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    full, = run_sweeps([small_sweep(tmp_path / 'full')], processes=1, cache=cache)
+
+    decimated = Sweep('decimated', axes={'P_STORM': [0.0, 0.05]}, n_repeats=2, n_steps=N_STEPS, outputs=('bee_count',),
+                      collect_every=5, directory=str(tmp_path / 'decimated'))
+    final = Sweep('final', axes={'P_STORM': [0.0, 0.05]}, n_repeats=2, n_steps=N_STEPS, outputs=('bee_count', 'foragers'),
+                  final_only=True, directory=str(tmp_path / 'final'))
+    decimated_sink, final_sink = run_sweeps([decimated, final], processes=1, cache=cache)
+
+    # No run is simulated again, the cached runs hold all outputs at every step
+    assert len(list((tmp_path / 'cache').rglob('*.npz'))) == 4
+    np.testing.assert_array_equal(decimated_sink.load('bee_count'), full.load('bee_count')[..., 4::5])
+    np.testing.assert_array_equal(final_sink.load('bee_count')[..., 0], full.load('bee_count')[..., -1])
+
+def test_one_at_a_time_default_cells_reuse_baseline_runs(tmp_path):
+    cache = RunCache(str(tmp_path / 'cache'))
+    baseline, = run_sweeps([Sweep('baseline', n_repeats=2, n_steps=N_STEPS, directory=str(tmp_path / 'baseline'))], processes=1, cache=cache)
+
+    ofat = Sweep('ofat', axes={'P_STORM': [0.005, 0.01]}, n_repeats=2, n_steps=N_STEPS, outputs=('bee_count',),
+                 one_at_a_time=True, final_only=True, directory=str(tmp_path / 'ofat'))
+    sink, = run_sweeps([ofat], processes=1, cache=cache)
+
+    # Only the cell off the default storm probability is simulated
+    assert len(list((tmp_path / 'cache').rglob('*.npz'))) == 4
+    np.testing.assert_array_equal(sink.load('bee_count')[0, 0, :, 0], baseline.load('bee_count')[:, -1])
+
+def test_unrun_repeats_are_nan(tmp_path):
+    # A precision target any two runs meet, so that every cell stops after its first wave of two repeats
+    sweep = Sweep('test', axes={'P_STORM': [0.0, 0.05]}, n_repeats=4, n_steps=N_STEPS, outputs=('bee_count', 'nectar'),
+                  target_precision=100.0, min_repeats=2, directory=str(tmp_path / 'sweep'))
+    sink, = run_sweeps([sweep], processes=1, cache=RunCache(str(tmp_path / 'cache')))
+
+    completed = sink.load(sink.COMPLETED)
+    np.testing.assert_array_equal(completed, [[True, True, False, False]] * 2)
+    assert np.isnan(sink.load('bee_count')[~completed]).all()
+    assert not np.isnan(sink.load('bee_count')[completed]).any()
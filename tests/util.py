@@ -0,0 +1,17 @@
+from src.model.Model import ForagerModel
+from src.model.config.ModelConfig import ModelConfig
+from src.model.util import ModelBuilder
+from src.sweep.Sweep import default_layout
+
+def build_model(backend, seed, model_config=None, **kwargs):
+    """Model of the default configuration and resource layout, as run by the sweeps."""
+    model_config = model_config or ModelConfig()
+    model = ForagerModel(model_config=model_config, backend=backend, seed=seed, **kwargs)
+    ModelBuilder.build_layout(model, default_layout(model_config))
+    return model
+
+def run_model(backend, seed, n_steps, **kwargs):
+    """Collected time series of a model run, by reporter name."""
+    model = build_model(backend, seed, **kwargs)
+    model.run(n_steps)
+    return {name: model.datacollector.get(name).copy() for name in model.datacollector.reporters}